@@ -0,0 +1,142 @@
+"""
+Модуль размещения рабочих процессов по ядрам и узлам NUMA (Linux).
+
+На многопроцессорных узлах планировщик ОС переносит рабочие процессы пула между ядрами
+и сокетами, и гистограмма процесса оказывается в памяти чужого узла NUMA. Модуль читает
+топологию узлов из /sys/devices/system/node и закрепляет процессы за ядрами (os.sched_setaffinity).
+Память в Linux выделяется на узле того потока, который первым записал в страницу, поэтому
+гистограммы, созданные закреплённым процессом после закрепления, размещаются на его узле.
+
+Режимы размещения:
+    "none" — без закрепления;
+    "core" — каждый процесс закрепляется за одним ядром;
+    "node" — каждый процесс закрепляется за всеми ядрами своего узла NUMA.
+Процессы распределяются по узлам поочерёдно, чтобы нагрузка на память узлов была равномерной.
+На системах без os.sched_setaffinity закрепление не выполняется.
+"""
+import os
+from pathlib import Path
+
+AFFINITY_MODES = ("none", "core", "node")
+
+NODE_DIR = Path("/sys/devices/system/node")
+
+
+def parse_cpulist(text: str) -> set[int]:
+    """
+    Разбирает список процессоров в формате ядра Linux, например "0-3,8-11,16".
+
+    Параметры:
+        text (str): Список номеров и диапазонов через запятую.
+
+    Returns:
+        set[int]: Номера процессоров.
+
+    Exceptions:
+        ValueError: Если строка не является списком процессоров.
+    """
+    cpus = set()
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def allowed_cpus() -> set[int]:
+    """
+    Возвращает процессоры, доступные текущему процессу.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return set(os.sched_getaffinity(0))
+    return set(range(os.cpu_count() or 1))
+
+
+def numa_nodes(node_dir: Path = NODE_DIR) -> list[frozenset[int]]:
+    """
+    Возвращает процессоры каждого узла NUMA, доступные текущему процессу.
+
+    Если топология недоступна (не Linux, контейнер без /sys), все доступные процессоры
+    считаются одним узлом. Узлы без доступных процессоров пропускаются.
+
+    Параметры:
+        node_dir (Path): Каталог описания узлов (по умолчанию /sys/devices/system/node).
+
+    Returns:
+        list[frozenset[int]]: Процессоры узлов в порядке номеров узлов.
+    """
+    allowed = allowed_cpus()
+    nodes = []
+    try:
+        paths = sorted(node_dir.glob("node[0-9]*"), key=lambda path: int(path.name[4:]))
+        for path in paths:
+            cpus = parse_cpulist((path / "cpulist").read_text()) & allowed
+            if cpus:
+                nodes.append(frozenset(cpus))
+    except (OSError, ValueError):
+        nodes = []
+    return nodes or [frozenset(allowed)]
+
+
+def plan_placement(workers: int, mode: str = "none",
+                   nodes: list[frozenset[int]] | None = None) -> list[tuple[int, frozenset[int]]]:
+    """
+    Распределяет рабочие процессы по узлам NUMA и ядрам.
+
+    Процесс i размещается на узле i mod n; в режиме "core" внутри узла процессы занимают ядра
+    по порядку, а если процессов больше, чем ядер, ядра используются повторно.
+
+    Параметры:
+        workers (int): Число рабочих процессов.
+        mode (str): Режим размещения: "none", "core" или "node" (по умолчанию "none").
+        nodes (list[frozenset[int]] | None): Процессоры узлов (по умолчанию — numa_nodes()).
+
+    Returns:
+        list[tuple[int, frozenset[int]]]: Номер узла и множество процессоров для каждого процесса;
+                                          пустой список для режима "none".
+
+    Exceptions:
+        ValueError: Если режим неизвестен.
+    """
+    if mode not in AFFINITY_MODES:
+        raise ValueError(f"Неизвестный режим размещения процессов: {mode}. Допустимые: {', '.join(AFFINITY_MODES)}")
+    if mode == "none":
+        return []
+    nodes = nodes if nodes is not None else numa_nodes()
+    placement = []
+    for worker in range(workers):
+        node = worker % len(nodes)
+        cpus = sorted(nodes[node])
+        if mode == "core":
+            placement.append((node, frozenset([cpus[(worker // len(nodes)) % len(cpus)]])))
+        else:
+            placement.append((node, nodes[node]))
+    return placement
+
+
+def pin_current(cpus) -> bool:
+    """
+    Закрепляет текущий процесс (в Linux — текущий поток) за процессорами cpus.
+
+    Returns:
+        bool: True, если закрепление выполнено.
+    """
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return False
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError:
+        return False
+    return True
+
+
+def describe_placement(placement: list[tuple[int, frozenset[int]]]) -> str:
+    """
+    Возвращает описание плана размещения для вывода пользователю.
+    """
+    if not placement:
+        return "Размещение процессов: без закрепления"
+    workers = "; ".join(f"{worker} → узел {node}, CPU {','.join(map(str, sorted(cpus)))}"
+                        for worker, (node, cpus) in enumerate(placement))
+    return f"Размещение процессов (узлов NUMA: {len({node for node, _ in placement})}): {workers}"
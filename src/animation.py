@@ -0,0 +1,313 @@
+"""
+Модуль рендеринга анимации по ключевым кадрам.
+
+Файл анимации описывает число кадров, размер и ключевые кадры:
+
+    {
+        "frames": 48, "width": 320, "height": 240,
+        "keyframes": [
+            {"frame": 0, "configs": [...], "processor": {"gamma": 2.0, "colormap": "inferno"}},
+            {"frame": 47, "configs": [...], "processor": {"gamma": 2.6}}
+        ]
+    }
+
+Конфигурации записываются в формате fractal_config.json. Между ключевыми кадрами линейно
+интерполируются все числовые значения: параметры трансформаций, границы мира, количество итераций
+и сэмплов, параметры обработки. Нечисловые значения (название трансформации, цветовая карта)
+берутся из предыдущего ключевого кадра.
+
+Кадры рендерятся по одному в пуле процессов. Они делятся на чередующиеся цепочки по числу
+процессов: орбиты кадра начинаются с конечных точек предыдущего кадра своей цепочки, поэтому
+точки сразу лежат на аттракторе. Готовые кадры выдаются по порядку номеров и окрашиваются
+и кодируются в потоках конвейера src.stages, пока пул рендерит следующие кадры. Результат — последовательность PNG frame_0000.png, frame_0001.png, ...
+или, с --raw_output, поток несжатых кадров RGB24 (src.rawvideo) в stdout или именованный канал.
+
+Запуск:
+    python -m src.animation animation.json --output_dir frames --num_threads 8
+    python -m src.animation animation.json --raw_output - --fps 24 | \\
+        ffmpeg -f rawvideo -pix_fmt rgb24 -s 320x240 -r 24 -i - out.mp4
+"""
+import json
+import queue
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from src.cli import parse_animation_args
+from src.config_utils import config_from_dict
+from src.domain import FractalImage, Point
+from src.histogram import clear_hits, hit_counts
+from src.pool import RenderPool
+from src.processors import LogGammaCorrectionProcessor
+from src.rawvideo import RawVideoWriter
+from src.renderer import render
+from src.sampling import start_sequence
+from src.stages import Stage, run_stages
+from src.transport import pack_hits, unpack_hits
+from src.utils import ImageUtils
+
+
+def interpolate_value(start, end, t: float):
+    """
+    Линейно интерполирует значения ключевых кадров.
+
+    Числа интерполируются (целые округляются), словари и списки — поэлементно, остальные
+    значения берутся из начального ключевого кадра.
+
+    Параметры:
+        start: Значение в начальном ключевом кадре.
+        end: Значение в конечном ключевом кадре.
+        t (float): Положение между ключевыми кадрами от 0 до 1.
+
+    Returns:
+        Интерполированное значение.
+    """
+    numbers = (int, float)
+    if isinstance(start, numbers) and isinstance(end, numbers) and not isinstance(start, bool):
+        value = start + (end - start) * t
+        return round(value) if isinstance(start, int) and isinstance(end, int) else value
+    if isinstance(start, dict) and isinstance(end, dict):
+        return {key: interpolate_value(value, end.get(key, value), t) for key, value in start.items()}
+    if isinstance(start, list) and isinstance(end, list) and len(start) == len(end):
+        return [interpolate_value(a, b, t) for a, b in zip(start, end)]
+    return start
+
+
+def frame_spec(keyframes: list[dict], frame: int) -> dict:
+    """
+    Возвращает конфигурации и параметры обработки для кадра.
+
+    Параметры:
+        keyframes (list[dict]): Ключевые кадры, упорядоченные по номеру кадра.
+        frame (int): Номер кадра.
+
+    Returns:
+        dict: Словарь с полями configs и processor.
+    """
+    previous = keyframes[0]
+    for keyframe in keyframes[1:]:
+        if frame < keyframe["frame"]:
+            span = keyframe["frame"] - previous["frame"]
+            t = min(max((frame - previous["frame"]) / span, 0.0), 1.0) if span else 0.0
+            return {
+                "configs": interpolate_value(previous["configs"], keyframe["configs"], t),
+                "processor": interpolate_value(previous.get("processor", {}), keyframe.get("processor", {}), t),
+            }
+        previous = keyframe
+    return {"configs": previous["configs"], "processor": previous.get("processor", {})}
+
+
+def _pack_orbits(points: list[Point]) -> np.ndarray:
+    return np.array([(point.x, point.y) for point in points], dtype=np.float64).reshape(-1, 2)
+
+
+def _unpack_orbits(orbits: np.ndarray) -> list[Point]:
+    return [Point(x, y) for x, y in orbits.tolist()]
+
+
+@lru_cache(maxsize=1)
+def _frame_canvas(width: int, height: int) -> FractalImage:
+    """
+    Холст кадров рабочего процесса; после каждого кадра попадания на нём обнуляются.
+    """
+    return FractalImage(width, height)
+
+
+def _render_frame(task) -> tuple:
+    """
+    Рендерит кадр, продолжая орбиты с конечных точек предыдущего кадра цепочки.
+
+    Параметры:
+        task (tuple): Номер кадра, описание кадра, ширина, высота, зерно и конечные точки орбит
+                      предыдущего кадра цепочки для каждой конфигурации (None для первого кадра цепочки).
+
+    Returns:
+        tuple: Номер кадра, упакованный массив попаданий, параметры обработки и конечные точки орбит кадра.
+    """
+    frame, spec, width, height, seed, orbits = task
+    canvas = _frame_canvas(width, height)
+    end_points = []
+    for index, conf in enumerate(spec["configs"]):
+        config = config_from_dict(conf)
+        points = render(
+            canvas=canvas,
+            world=config.world,
+            variations=[config.transformation],
+            samples=config.samples,
+            iter_per_sample=config.iterations,
+            seed=seed,
+            symmetry=config.symmetry,
+            start_points=_unpack_orbits(orbits[index]) if orbits and index < len(orbits) else None,
+            keep_points=True,
+            sequence=start_sequence(config.sampling, seed),
+        )
+        end_points.append(_pack_orbits(points))
+    hits = hit_counts(canvas)
+    clear_hits(canvas, hits)
+    return frame, pack_hits(hits), spec["processor"], end_points
+
+
+def _animation_size(animation: dict) -> tuple[int, int]:
+    return int(animation.get("width", 600)), int(animation.get("height", 400))
+
+
+def rendered_frames(animation: dict, pool: RenderPool, chains: int | None = None, seed: int = 42,
+                    lookahead: int | None = None):
+    """
+    Рендерит кадры анимации в пуле и выдаёт их по одному в порядке номеров.
+
+    Кадры делятся на `chains` чередующихся цепочек: кадр f продолжает орбиты кадра f - chains,
+    параметры которого близки, поэтому точки сразу лежат на аттракторе. В пуле одновременно
+    рендерится не больше одного кадра каждой цепочки, а кадр отправляется, только если он не дальше
+    `lookahead` кадров от первого ещё не выданного, поэтому готовые, но не выданные кадры занимают
+    ограниченную память, а следующий по порядку кадр никогда не ждёт места в очереди.
+
+    Параметры:
+        animation (dict): Описание анимации (frames, width, height, keyframes).
+        pool (RenderPool): Пул процессов.
+        chains (int | None): Число цепочек (по умолчанию — число процессов пула).
+        seed (int): Зерно генератора случайных чисел (по умолчанию 42).
+        lookahead (int | None): Наибольшее опережение отправленных кадров (по умолчанию 2 * chains).
+
+    Yields:
+        tuple: Номер кадра, упакованный массив попаданий и параметры обработки.
+    """
+    keyframes = sorted(animation["keyframes"], key=lambda keyframe: keyframe["frame"])
+    frames = int(animation.get("frames", keyframes[-1]["frame"] + 1))
+    width, height = _animation_size(animation)
+    chains = max(1, min(chains or pool.processes, frames))
+    lookahead = max(lookahead or 2 * chains, chains)
+    finished = queue.Queue()
+    ready, waiting = {}, {}
+
+    def submit_waiting(next_frame: int):
+        for frame in sorted(waiting):
+            if frame >= next_frame + lookahead:
+                break
+            task = (frame, frame_spec(keyframes, frame), width, height, seed, waiting.pop(frame))
+            pool.apply_async(_render_frame, task, callback=finished.put, error_callback=finished.put)
+
+    waiting.update((frame, None) for frame in range(chains))
+    submit_waiting(0)
+    for next_frame in range(frames):
+        while next_frame not in ready:
+            result = finished.get()
+            if isinstance(result, Exception):
+                raise result
+            frame, payload, processor, orbits = result
+            ready[frame] = payload, processor
+            if frame + chains < frames:
+                waiting[frame + chains] = orbits
+            submit_waiting(next_frame)
+        payload, processor = ready.pop(next_frame)
+        submit_waiting(next_frame + 1)
+        yield next_frame, payload, processor
+
+
+def _tone_mapped_frames(animation: dict, pool: RenderPool, chains: int | None, seed: int):
+    """
+    Возвращает итератор пар (номер кадра, (номер кадра, упакованный массив попаданий, параметры обработки))
+    из rendered_frames и этап окрашивания для src.stages.
+    """
+    rendered = ((frame, (frame, payload, processor))
+                for frame, payload, processor in rendered_frames(animation, pool, chains, seed))
+
+    def tone_map(item) -> tuple:
+        frame, payload, processor = item
+        return frame, LogGammaCorrectionProcessor(**processor).tone_map(unpack_hits(payload))
+
+    return rendered, Stage("tone_map", tone_map)
+
+
+def render_animation(animation: dict, output_dir, pool: RenderPool, chains: int | None = None,
+                     seed: int = 42) -> list[Path]:
+    """
+    Рендерит все кадры анимации в последовательность PNG.
+
+    Параметры:
+        animation (dict): Описание анимации (frames, width, height, keyframes).
+        output_dir (str или Path): Каталог для кадров.
+        pool (RenderPool): Пул процессов для рендеринга кадров.
+        chains (int | None): Число цепочек кадров, продолжающих орбиты друг друга (по умолчанию — число
+                             процессов пула, см. rendered_frames).
+        seed (int): Зерно генератора случайных чисел (по умолчанию 42).
+
+    Returns:
+        list[Path]: Пути к сохранённым кадрам в порядке номеров.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rendered, tone_map = _tone_mapped_frames(animation, pool, chains, seed)
+
+    def encode(item) -> Path:
+        frame, image = item
+        path = output_dir / f"frame_{frame:04d}.png"
+        ImageUtils.save_array(image, path)
+        return path
+
+    # Кадры выдаются по одному, поэтому окрашивание и кодирование кадра идут, пока пул рендерит следующие
+    paths = {}
+    for frame, path, _ in run_stages(rendered, [tone_map, Stage("encode", encode, workers=2)]):
+        if isinstance(path, Exception):
+            raise path
+        paths[frame] = path
+    return [paths[frame] for frame in sorted(paths)]
+
+
+def stream_animation(animation: dict, writer: RawVideoWriter, pool: RenderPool, chains: int | None = None,
+                     seed: int = 42) -> int:
+    """
+    Рендерит все кадры анимации и записывает их в поток rawvideo (RGB24) в порядке номеров.
+
+    Параметры:
+        animation (dict): Описание анимации (frames, width, height, keyframes).
+        writer (RawVideoWriter): Поток кадров; его размер должен совпадать с размером анимации.
+        pool (RenderPool): Пул процессов для рендеринга кадров.
+        chains (int | None): Число цепочек кадров (по умолчанию — число процессов пула).
+        seed (int): Зерно генератора случайных чисел (по умолчанию 42).
+
+    Returns:
+        int: Число записанных кадров.
+    """
+    rendered, tone_map = _tone_mapped_frames(animation, pool, chains, seed)
+    for _, item, _ in run_stages(rendered, [tone_map]):
+        if isinstance(item, Exception):
+            raise item
+        writer.write(*item)
+    writer.close()
+    return writer.frames_written
+
+
+def main() -> None:
+    args = parse_animation_args()
+    with open(args.animation_file, "r") as f:
+        animation = json.load(f)
+
+    start_time = time.time()
+    with RenderPool(processes=args.num_threads, start_method=args.start_method) as pool:
+        if args.raw_output is None:
+            count = len(render_animation(animation, args.output_dir, pool, args.chains))
+            destination = args.output_dir
+        else:
+            # При записи кадров в stdout сообщения выводятся в stderr
+            stream = sys.stdout.buffer if args.raw_output == "-" else open(args.raw_output, "wb")
+            writer = RawVideoWriter(stream, *_animation_size(animation), fps=args.fps)
+            print(f"Формат потока: {writer.describe()}. Вход кодировщика: "
+                  f"ffmpeg {' '.join(writer.encoder_args(args.raw_output))} ...", file=sys.stderr)
+            try:
+                count = stream_animation(animation, writer, pool, args.chains)
+            finally:
+                if stream is not sys.stdout.buffer:
+                    stream.close()
+            destination = "stdout" if args.raw_output == "-" else args.raw_output
+    elapsed = time.time() - start_time
+    print(f"Анимация: {count} кадров за {elapsed:.2f} секунд "
+          f"({count / elapsed * 3600:.0f} кадров в час). Сохранено в: {destination}",
+          file=sys.stderr if args.raw_output == "-" else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Модуль автоматической настройки параметров рендеринга под машину.
+
+Оптимальные размер пакета орбит векторизованного движка, число рабочих процессов и размер
+плитки поблочного накопления зависят от размеров кэшей и числа ядер, поэтому на разных типах
+узлов они разные. Команда autotune выполняет короткие калибровочные рендеринги на текущей машине,
+перебирая параметры по очереди (сначала размер пакета, затем плитки, затем число процессов),
+и сохраняет лучшие значения в файл профиля. src.main и пакетный режим (src.batch) по умолчанию
+берут из профиля параметры, не заданные в командной строке.
+
+Профили хранятся в одном файле JSON по ключу машины (архитектура, модель процессора, число
+доступных процессоров и узлов NUMA), поэтому общий файл в домашнем каталоге, доступном с узлов
+разных типов, содержит свой профиль для каждого типа. Путь к файлу задаётся переменной окружения
+FRACTAL_PROFILE (по умолчанию ~/.fractal_profile.json).
+
+Запуск:
+    python -m src.autotune --engine numpy --samples 200000
+"""
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from src.affinity import allowed_cpus, numa_nodes
+from src.cli import parse_autotune_args
+from src.domain import Rect
+from src.engine import (DEFAULT_BATCH_SIZE, TILE_BYTES, EngineOptions, Histogram, jit_available,
+                        render_config_batched)
+from src.pool import RenderPool
+from src.transformation_config import TransformationConfig
+from src.transformations import PDJTransformation, SwirlTransformation
+
+PROFILE_ENV = "FRACTAL_PROFILE"
+DEFAULT_PROFILE_PATH = Path.home() / ".fractal_profile.json"
+
+BATCH_SIZES = (4096, 16384, 65536, 262144)
+TILE_SIZES = (1 << 18, 1 << 20, 1 << 22)
+# Сторона холста калибровки плиток: поблочное накопление включается на холстах от TILED_MIN_PIXELS
+TILE_CANVAS_SIDE = 2048
+
+
+class Profile(NamedTuple):
+    """
+    Параметры рендеринга, подобранные для машины.
+
+    Атрибуты:
+        machine (str): Ключ машины (см. machine_key).
+        engine (str): Движок, для которого выполнена калибровка: "numpy" или "jit".
+        workers (int): Число рабочих процессов пула.
+        batch_size (int): Число орбит в пакете векторизованного движка.
+        tile_threads (int): Число потоков поблочного накопления при рендеринге в одном процессе.
+        tile_bytes (int): Размер плитки поблочного накопления в байтах.
+        samples_per_second (float): Пропускная способность пула с подобранными параметрами.
+
+    Методы:
+        engine_options(**overrides): Возвращает EngineOptions с параметрами профиля.
+        describe(): Возвращает описание профиля для вывода пользователю.
+    """
+    machine: str
+    engine: str
+    workers: int
+    batch_size: int = DEFAULT_BATCH_SIZE
+    tile_threads: int = 1
+    tile_bytes: int = TILE_BYTES
+    samples_per_second: float = 0.0
+
+    def engine_options(self, **overrides) -> EngineOptions:
+        """
+        Возвращает параметры векторизованного движка из профиля; `overrides` заменяют отдельные поля.
+        Число потоков накопления не переносится: в рабочих процессах пула плитки накапливает один поток.
+        """
+        return EngineOptions(backend=self.engine, batch_size=self.batch_size,
+                             tile_bytes=self.tile_bytes)._replace(**overrides)
+
+    def describe(self) -> str:
+        return (f"Профиль машины ({self.engine}): процессов {self.workers}, пакет {self.batch_size} орбит, "
+                f"потоков накопления {self.tile_threads}, плитка {self.tile_bytes // 1024} КиБ")
+
+
+def machine_key() -> str:
+    """
+    Возвращает ключ типа машины: архитектура, модель процессора, число доступных процессоров и узлов NUMA.
+    """
+    model = platform.processor() or "unknown"
+    try:
+        for line in Path("/proc/cpuinfo").read_text().splitlines():
+            if line.startswith("model name"):
+                model = line.partition(":")[2].strip()
+                break
+    except OSError:
+        pass
+    return f"{platform.machine()} | {model} | {len(allowed_cpus())} CPU | {len(numa_nodes())} NUMA"
+
+
+def profile_path(path=None) -> Path:
+    """
+    Возвращает путь к файлу профилей: `path`, переменная окружения FRACTAL_PROFILE
+    или ~/.fractal_profile.json.
+    """
+    return Path(path or os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE_PATH)
+
+
+def _read_profiles(path: Path) -> dict:
+    data = json.loads(path.read_text())
+    if not isinstance(data, dict) or not isinstance(data.get("profiles"), dict):
+        raise ValueError("ожидается объект с полем profiles")
+    return data["profiles"]
+
+
+def load_profile(path=None, machine: str | None = None) -> Profile | None:
+    """
+    Загружает профиль текущей машины.
+
+    Параметры:
+        path (str | Path | None): Файл профилей (по умолчанию — см. profile_path).
+        machine (str | None): Ключ машины (по умолчанию — machine_key()).
+
+    Returns:
+        Profile | None: Профиль или None, если файла или профиля этой машины нет либо файл повреждён
+                        (в последнем случае выводится предупреждение).
+    """
+    path = profile_path(path)
+    if not path.exists():
+        return None
+    machine = machine or machine_key()
+    try:
+        record = _read_profiles(path).get(machine)
+        return Profile(machine=machine, **record) if record is not None else None
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Файл профилей {path} не используется: {e}")
+        return None
+
+
+def save_profile(profile: Profile, path=None) -> Path:
+    """
+    Сохраняет профиль в файл профилей, заменяя прежний профиль той же машины
+    и сохраняя профили других машин. Файл заменяется атомарно.
+
+    Returns:
+        Path: Путь к файлу профилей.
+    """
+    path = profile_path(path)
+    profiles = _read_profiles(path) if path.exists() else {}
+    record = profile._asdict()
+    profiles[record.pop("machine")] = record
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    temporary.write_text(json.dumps({"profiles": profiles}, ensure_ascii=False, indent=2))
+    os.replace(temporary, path)
+    return path
+
+
+def calibration_configs(samples: int) -> list[TransformationConfig]:
+    """
+    Возвращает конфигурации калибровочного рендеринга с `samples` сэмплами в сумме.
+    """
+    return [
+        TransformationConfig(PDJTransformation(1.0, 1.2, 1.0, 1.5), 8, Rect(-1.5, -1.5, 3, 3), samples // 2),
+        TransformationConfig(SwirlTransformation(), 8, Rect(-1, -1, 2, 2), samples - samples // 2, 2),
+    ]
+
+
+def _doubling(limit: int) -> list[int]:
+    """
+    Возвращает 1, 2, 4, ... до `limit` включительно.
+    """
+    values = [1]
+    while values[-1] * 2 <= limit:
+        values.append(values[-1] * 2)
+    return values + ([limit] if values[-1] != limit else [])
+
+
+def _best_seconds(function: Callable[[], object], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _render_rate(options: EngineOptions, samples: int, width: int, height: int, repeats: int) -> float:
+    """
+    Возвращает скорость рендеринга калибровочных конфигураций в одном процессе в сэмплах в секунду.
+    """
+    configs = calibration_configs(samples)
+
+    def render():
+        histogram = Histogram(width, height, options.accumulator, options.tile_threads, options.tile_bytes)
+        for config in configs:
+            render_config_batched(histogram, config, options=options)
+
+    return samples / _best_seconds(render, repeats)
+
+
+def calibrate_batch_size(options: EngineOptions, samples: int, width: int, height: int,
+                         sizes=BATCH_SIZES, repeats: int = 2) -> dict[int, float]:
+    """
+    Измеряет скорость рендеринга в одном процессе для каждого размера пакета.
+
+    Returns:
+        dict[int, float]: Скорость в сэмплах в секунду для каждого размера пакета.
+    """
+    return {size: _render_rate(options._replace(batch_size=size), samples, width, height, repeats)
+            for size in sizes}
+
+
+def calibrate_tiles(options: EngineOptions, samples: int, threads, sizes=TILE_SIZES,
+                    repeats: int = 2) -> dict[tuple[int, int], float]:
+    """
+    Измеряет скорость рендеринга на холсте, достаточно большом для поблочного накопления,
+    для каждого числа потоков накопления и размера плитки. С одним потоком плитки не используются,
+    поэтому для него проверяется только размер по умолчанию.
+
+    Returns:
+        dict[tuple[int, int], float]: Скорость в сэмплах в секунду для пар (потоков, байт в плитке).
+    """
+    candidates = [(1, options.tile_bytes)] + [(count, size) for count in threads if count > 1 for size in sizes]
+    return {(count, size): _render_rate(options._replace(tile_threads=count, tile_bytes=size),
+                                        samples, TILE_CANVAS_SIDE, TILE_CANVAS_SIDE, repeats)
+            for count, size in candidates}
+
+
+def calibrate_workers(options: EngineOptions, samples: int, width: int, height: int, counts,
+                      start_method: str | None = None, repeats: int = 2) -> dict[int, float]:
+    """
+    Измеряет пропускную способность пула для каждого числа рабочих процессов.
+
+    На каждый процесс приходится `samples` сэмплов (две калибровочные задачи), поэтому при линейном
+    росте производительности время замера не зависит от числа процессов. Запуск пула в замер не входит.
+
+    Returns:
+        dict[int, float]: Пропускная способность в сэмплах в секунду для каждого числа процессов.
+    """
+    rates = {}
+    for count in counts:
+        configs = calibration_configs(samples) * count
+        with RenderPool(processes=count, start_method=start_method) as pool:
+            pool.render_hits(configs[:count], width, height, options)
+            seconds = _best_seconds(lambda: pool.render_hits(configs, width, height, options), repeats)
+        rates[count] = samples * count / seconds
+    return rates
+
+
+def _print_rates(title: str, rates: dict, label: Callable[[object], str]):
+    print(title)
+    best = max(rates, key=rates.get)
+    for key, rate in rates.items():
+        print(f"  {label(key)}: {rate:,.0f} сэмплов/с" + (" — лучший" if key == best else ""))
+
+
+def autotune(engine: str = "numpy", samples: int = 200000, width: int = 600, height: int = 400,
+             max_workers: int | None = None, start_method: str | None = None, repeats: int = 2) -> Profile:
+    """
+    Подбирает параметры рендеринга для текущей машины калибровочными рендерингами.
+
+    Параметры:
+        engine (str): Движок: "numpy" или "jit" (если Numba не установлен, используется "numpy").
+        samples (int): Число сэмплов одного замера (по умолчанию 200000).
+        width (int): Ширина холста замеров размера пакета и числа процессов (по умолчанию 600).
+        height (int): Высота холста (по умолчанию 400).
+        max_workers (int | None): Наибольшее проверяемое число процессов (по умолчанию — число доступных CPU).
+        start_method (str | None): Способ запуска рабочих процессов.
+        repeats (int): Число повторов замера; используется лучшее время (по умолчанию 2).
+
+    Returns:
+        Profile: Подобранные параметры.
+    """
+    if engine == "jit" and not jit_available():
+        print("Numba не установлен, калибруется движок numpy.")
+        engine = "numpy"
+    cpus = len(allowed_cpus())
+    options = EngineOptions(backend=engine)
+
+    rates = calibrate_batch_size(options, samples, width, height, repeats=repeats)
+    _print_rates("Размер пакета (один процесс):", rates, lambda size: f"{size} орбит")
+    options = options._replace(batch_size=max(rates, key=rates.get))
+
+    rates = calibrate_tiles(options, samples, _doubling(cpus), repeats=repeats)
+    _print_rates("Поблочное накопление (холст "
+                 f"{TILE_CANVAS_SIDE}x{TILE_CANVAS_SIDE}):", rates,
+                 lambda key: f"потоков {key[0]}, плитка {key[1] // 1024} КиБ")
+    tile_threads, tile_bytes = max(rates, key=rates.get)
+    options = options._replace(tile_bytes=tile_bytes)
+
+    rates = calibrate_workers(options, samples, width, height, _doubling(max_workers or cpus), start_method,
+                              repeats)
+    _print_rates("Рабочие процессы пула:", rates, lambda count: f"процессов {count}")
+    workers = max(rates, key=rates.get)
+
+    return Profile(machine_key(), engine, workers, options.batch_size, tile_threads, tile_bytes,
+                   round(rates[workers], 1))
+
+
+def main() -> None:
+    args = parse_autotune_args()
+    start_time = time.time()
+    profile = autotune(args.engine, args.samples, args.width, args.height, args.max_workers, args.start_method,
+                       args.repeats)
+    path = save_profile(profile, args.profile)
+    print(f"Калибровка завершена за {time.time() - start_time:.1f} секунд. {profile.describe()}.")
+    print(f"Профиль машины «{profile.machine}» сохранён в {path}")
+
+
+if __name__ == "__main__":
+    main()
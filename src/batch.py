@@ -0,0 +1,256 @@
+"""
+Модуль пакетного рендеринга фракталов без участия пользователя.
+
+Задания читаются из манифеста в формате JSON Lines, по одному заданию на строку:
+
+    {"id": "job-1", "config_file": "fractal_config.json", "width": 600, "height": 400,
+     "processor": {"gamma": 2.2, "colormap": "plasma"}, "output": "out/job-1.png"}
+
+Вместо "config_file" можно передать список конфигураций прямо в поле "configs" (в формате
+fractal_config.json). Вместо "output" (или вместе с ним) можно перечислить несколько выходов
+одной гистограммы в поле "outputs":
+
+    "outputs": [{"output": "out/job-1.png"},
+                {"output": "out/job-1-web.webp", "width": 320, "processor": {"colormap": "plasma"}}]
+
+Относительные пути считаются от каталога манифеста. Все задания рендерятся в одном общем пуле
+процессов; окрашивание и кодирование готовых заданий идут в отдельных потоках одновременно
+с рендерингом следующих. Для каждого задания в файл результатов пишется запись со статусом
+и временем выполнения этапов.
+
+Если для машины есть профиль (см. src.autotune), число процессов и движок рендеринга по умолчанию
+берутся из него.
+
+Запуск:
+    python -m src.batch jobs.jsonl --results results.jsonl --num_threads 8 --max_in_flight 16 --encode_threads 2
+"""
+import json
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from src.autotune import load_profile
+from src.cli import parse_batch_args
+from src.config_utils import config_from_dict, read_config_file
+from src.engine import EngineOptions
+from src.outputs import OutputSpec, output_spec_from_dict, save_outputs, tone_map_outputs
+from src.pool import RenderPool
+from src.stages import Stage, run_stages
+
+
+class BatchJob(NamedTuple):
+    """
+    Задание пакетного рендеринга.
+
+    Атрибуты:
+        job_id (str): Идентификатор задания.
+        configs (list[TransformationConfig]): Конфигурации трансформаций.
+        width (int): Ширина изображения.
+        height (int): Высота изображения.
+        outputs (list[OutputSpec]): Выходные изображения.
+    """
+    job_id: str
+    configs: list
+    width: int
+    height: int
+    outputs: list[OutputSpec]
+
+
+def parse_job(record: dict, base_dir: Path, default_id: str) -> BatchJob:
+    """
+    Создаёт задание из записи манифеста.
+
+    Параметры:
+        record (dict): Запись манифеста.
+        base_dir (Path): Каталог, относительно которого разрешаются пути.
+        default_id (str): Идентификатор задания, если он не указан в записи.
+
+    Returns:
+        BatchJob: Задание пакетного рендеринга.
+
+    Exceptions:
+        ValueError: Если в записи нет конфигураций или путей к результатам.
+        OSError, KeyError, TypeError: Если файл конфигурации не читается или содержит некорректные конфигурации.
+    """
+    job_id = str(record.get("id", default_id))
+    if "configs" in record:
+        configs = [config_from_dict(conf) for conf in record["configs"]]
+    elif "config_file" in record:
+        configs = read_config_file(base_dir / record["config_file"])
+    else:
+        raise ValueError("В задании должно быть поле configs или config_file.")
+    if not configs:
+        raise ValueError("Задание не содержит конфигураций трансформаций.")
+    outputs = [output_spec_from_dict(output, base_dir) for output in record.get("outputs", [])]
+    if "output" in record:
+        outputs.insert(0, output_spec_from_dict(
+            {"output": record["output"], "processor": record.get("processor", {})}, base_dir))
+    if not outputs:
+        raise ValueError("В задании не указан путь к результату (output или outputs).")
+    return BatchJob(
+        job_id=job_id,
+        configs=configs,
+        width=int(record.get("width", 600)),
+        height=int(record.get("height", 400)),
+        outputs=outputs,
+    )
+
+
+def read_manifest(manifest_path):
+    """
+    Читает манифест заданий построчно.
+
+    Параметры:
+        manifest_path (str или Path): Путь к манифесту в формате JSON Lines.
+
+    Yields:
+        tuple[str, BatchJob | Exception]: Идентификатор задания и само задание либо ошибка его разбора.
+    """
+    manifest_path = Path(manifest_path)
+    base_dir = manifest_path.parent
+    with open(manifest_path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            job_id = f"line-{line_number}"
+            try:
+                record = json.loads(line)
+                job_id = str(record.get("id", job_id))
+                yield job_id, parse_job(record, base_dir, job_id)
+            except Exception as e:
+                yield job_id, e
+
+
+def _collect(state: dict) -> dict:
+    """
+    Этап конвейера: дожидается рендеринга задания в пуле и получает суммарный массив попаданий.
+    """
+    try:
+        state["hits"] = state["pending"].get()
+    finally:
+        state["release"]()
+    state["rendered_at"] = time.perf_counter()
+    return state
+
+
+def _tone_map(state: dict) -> dict:
+    """
+    Этап конвейера: окрашивает все выходы задания; массив попаданий после этого не нужен.
+    """
+    state["images"] = tone_map_outputs(state.pop("hits"), state["job"].outputs)
+    return state
+
+
+def _encode(state: dict) -> dict:
+    """
+    Этап конвейера: кодирует и сохраняет выходы задания.
+    """
+    state["paths"] = save_outputs(state.pop("images"), state["job"].outputs)
+    state["finished_at"] = time.perf_counter()
+    return state
+
+
+def _job_record(state: dict, seconds: dict) -> dict:
+    """
+    Формирует запись результата выполненного задания.
+
+    render_seconds — время рендеринга конфигураций задания в рабочих процессах, wait_seconds —
+    время от отправки задания в пул до получения результата (включая ожидание в очереди),
+    tone_map_seconds и encode_seconds — время окрашивания и сохранения выходов, save_seconds — их сумма.
+    """
+    paths = state["paths"]
+    return {
+        "id": state["job"].job_id,
+        "status": "ok",
+        "output": str(paths[0]),
+        "outputs": [str(path) for path in paths],
+        "render_seconds": round(state["pending"].render_seconds, 4),
+        "wait_seconds": round(state["rendered_at"] - state["submitted_at"], 4),
+        "tone_map_seconds": round(seconds["tone_map"], 4),
+        "encode_seconds": round(seconds["encode"], 4),
+        "save_seconds": round(seconds["tone_map"] + seconds["encode"], 4),
+        "total_seconds": round(state["finished_at"] - state["submitted_at"], 4),
+    }
+
+
+def _error_record(job_id: str, error: Exception) -> dict:
+    return {"id": job_id, "status": "error", "error": f"{type(error).__name__}: {error}"}
+
+
+def run_batch(manifest_path, results_path, num_threads=None, start_method=None, max_in_flight=None,
+              encode_threads=2, queue_size=2, affinity="none", options=None) -> dict:
+    """
+    Выполняет все задания манифеста в общем пуле процессов.
+
+    Задания проходят конвейер src.stages: рендеринг в пуле, окрашивание и кодирование выполняются
+    в отдельных потоках одновременно для разных заданий. Одновременно в пуле находится
+    не более `max_in_flight` заданий, а между этапами ждут не более `queue_size` заданий,
+    поэтому число гистограмм и изображений в памяти ограничено.
+
+    Параметры:
+        manifest_path (str или Path): Путь к манифесту заданий.
+        results_path (str или Path): Путь к файлу результатов (JSON Lines).
+        num_threads (int | None): Число рабочих процессов (по умолчанию — число CPU).
+        start_method (str | None): Способ запуска рабочих процессов.
+        max_in_flight (int | None): Ограничение на число одновременно выполняемых заданий
+                                    (по умолчанию — 2 × число процессов).
+        encode_threads (int): Число потоков кодирования (по умолчанию 2).
+        queue_size (int): Длина очередей между этапами (по умолчанию 2).
+        affinity (str): Закрепление рабочих процессов: "none", "core" или "node" (см. src.affinity).
+        options (EngineOptions | None): Параметры векторизованного движка; None — рендеринг по точкам.
+
+    Returns:
+        dict: Количество успешно выполненных ("ok") и завершившихся ошибкой ("error") заданий.
+    """
+    summary = {"ok": 0, "error": 0}
+
+    with RenderPool(processes=num_threads, start_method=start_method, affinity=affinity) as pool, \
+            open(results_path, "w") as results:
+        slots = threading.BoundedSemaphore(max_in_flight or 2 * pool.processes)
+
+        def submit():
+            for job_id, job in read_manifest(manifest_path):
+                if isinstance(job, Exception):
+                    yield job_id, job
+                    continue
+                slots.acquire()
+                try:
+                    pending = pool.render_hits_async(job.configs, job.width, job.height, options)
+                except Exception as e:
+                    slots.release()
+                    yield job_id, e
+                    continue
+                yield job_id, {"job": job, "pending": pending, "submitted_at": time.perf_counter(),
+                               "release": slots.release}
+
+        stages = [Stage("render", _collect), Stage("tone_map", _tone_map), Stage("encode", _encode, encode_threads)]
+        for job_id, state, seconds in run_stages(submit(), stages, queue_size):
+            record = _error_record(job_id, state) if isinstance(state, Exception) else _job_record(state, seconds)
+            summary[record["status"]] += 1
+            results.write(json.dumps(record, ensure_ascii=False) + "\n")
+            results.flush()
+
+    return summary
+
+
+def main() -> None:
+    args = parse_batch_args()
+    # Число процессов и движок, не заданные в командной строке, берутся из профиля машины (src.autotune)
+    profile = None if args.no_profile else load_profile(args.profile)
+    if profile is not None:
+        print(profile.describe())
+    num_threads = args.num_threads or (profile.workers if profile else None)
+    engine = args.engine or (profile.engine if profile else "python")
+    options = None
+    if engine != "python":
+        options = profile.engine_options(backend=engine) if profile else EngineOptions(backend=engine)
+    start_time = time.time()
+    summary = run_batch(args.manifest, args.results, num_threads, args.start_method, args.max_in_flight,
+                        args.encode_threads, affinity=args.affinity, options=options)
+    print(f"Пакетный рендеринг завершён за {time.time() - start_time:.2f} секунд: "
+          f"успешно {summary['ok']}, с ошибкой {summary['error']}. Результаты: {args.results}")
+
+
+if __name__ == "__main__":
+    main()
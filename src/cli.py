@@ -1,5 +1,9 @@
 import argparse
 
+from src.affinity import AFFINITY_MODES
+from src.planner import parse_size
+from src.sampling import SAMPLING_METHODS
+
 
 def parse_args():
     """
@@ -7,7 +11,11 @@ def parse_args():
 
     Эта функция использует argparse для парсинга различных параметров, которые могут быть переданы
     при запуске программы. Аргументы включают параметры для ширины и высоты холста, количество
-    трансформаций, путь к конфигурационному файлу, режим работы и количество потоков для многопроцессорного режима.
+    трансформаций, путь к конфигурационному файлу, режим работы, количество потоков и способ запуска процессов
+    для многопроцессорного режима, параметры кадров предпросмотра, суперсэмплинга и оценки плотности
+    допуск сходимости адаптивного режима, выбор начальных точек орбит, движок рендеринга и точность
+    его вычислений, лимит памяти, закрепление рабочих процессов за ядрами, вывод хода рендеринга
+    и файл профиля машины.
 
     Returns:
         argparse.Namespace: Объект с парсированными аргументами командной строки.
@@ -19,4 +27,197 @@ def parse_args():
     parser.add_argument("--config_file", type=str, required=False, help="Путь к конфигурационному файлу.")
     parser.add_argument("--mode", choices=["single", "multi", "compare"], required=True, help="Режим работы.")
     parser.add_argument("--num_threads", type=int, default=None, help="Число потоков для многопроцессорного режима.")
+    parser.add_argument("--start_method", choices=["fork", "forkserver", "spawn"], default=None,
+                        help="Способ запуска рабочих процессов (по умолчанию — принятый на платформе).")
+    parser.add_argument("--preview_dir", type=str, default=None,
+                        help="Каталог для кадров предпросмотра прогрессивного рендеринга (режимы single и compare).")
+    parser.add_argument("--preview_every", type=int, default=1, help="Сохранять кадр предпросмотра каждые N пакетов.")
+    parser.add_argument("--preview_seconds", type=float, default=None,
+                        help="Сохранять кадр предпросмотра не реже, чем раз в T секунд.")
+    parser.add_argument("--supersample", type=int, default=1,
+                        help="Коэффициент суперсэмплинга холста накопления (по умолчанию 1).")
+    parser.add_argument("--de_radius", type=float, default=0.0,
+                        help="Максимальная ширина ядра оценки плотности в пикселях; 0 отключает фильтр.")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="Допуск сходимости адаптивного режима (samples становится верхней границей).")
+    parser.add_argument("--sampling", choices=SAMPLING_METHODS, default=None,
+                        help="Выбор начальных точек орбит для всех конфигураций: случайный (uniform) или "
+                             "по перемешанной последовательности Соболя (sobol) либо Холтона (halton).")
+    parser.add_argument("--engine", choices=["python", "numpy", "jit"], default=None,
+                        help="Движок рендеринга: по точкам (python), пакетами на массивах (numpy) или "
+                             "JIT-компилируемым ядром (jit, требует Numba, иначе используется numpy). "
+                             "По умолчанию — из профиля машины или python.")
+    parser.add_argument("--precision", choices=["float32", "float64"], default="float64",
+                        help="Точность координат точек движков numpy и jit.")
+    parser.add_argument("--accumulator", choices=["uint32", "uint64", "float32"], default="uint32",
+                        help="Тип счётчиков попаданий движков numpy и jit (расширяется автоматически при переполнении).")
+    parser.add_argument("--tile_threads", type=int, default=None,
+                        help="Число потоков поблочного накопления попаданий движка numpy на больших холстах "
+                             "(по умолчанию — из профиля машины или 1).")
+    parser.add_argument("--batch_size", type=int, default=None,
+                        help="Число орбит в пакете движков numpy и jit (по умолчанию — из профиля машины).")
+    parser.add_argument("--memory_limit", type=parse_size, default=None,
+                        help="Лимит памяти рендеринга, например 8G (по умолчанию — доступная память системы).")
+    parser.add_argument("--affinity", choices=AFFINITY_MODES, default="none",
+                        help="Закрепление рабочих процессов: за одним ядром (core), за ядрами узла NUMA (node) "
+                             "или без закрепления (none, по умолчанию).")
+    parser.add_argument("--progress_interval", type=float, default=1.0,
+                        help="Период обновления строки прогресса многопроцессного рендеринга в секундах "
+                             "(0 — не выводить).")
+    parser.add_argument("--metrics_file", type=str, default=None,
+                        help="Файл снимка метрик хода рендеринга: .prom — формат Prometheus, иначе JSON.")
+    _add_profile_args(parser)
     return parser.parse_args()
+
+
+def _add_profile_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Файл профилей машин, созданный командой python -m src.autotune "
+                             "(по умолчанию — $FRACTAL_PROFILE или ~/.fractal_profile.json).")
+    parser.add_argument("--no_profile", action="store_true",
+                        help="Не использовать профиль машины.")
+
+
+def parse_batch_args(argv=None):
+    """
+    Функция для парсинга аргументов командной строки пакетного режима.
+
+    Аргументы включают путь к манифесту заданий, путь к файлу результатов, число процессов,
+    способ их запуска и закрепления за ядрами, ограничение на число одновременно выполняемых заданий,
+    число потоков кодирования, движок рендеринга и файл профиля машины.
+
+    Параметры:
+        argv (list[str] | None): Список аргументов (по умолчанию — sys.argv).
+
+    Returns:
+        argparse.Namespace: Объект с парсированными аргументами командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Пакетный рендеринг фракталов по манифесту заданий.")
+    parser.add_argument("manifest", type=str, help="Путь к манифесту заданий в формате JSON Lines.")
+    parser.add_argument("--results", type=str, default="batch_results.jsonl",
+                        help="Путь к файлу с результатами заданий (JSON Lines).")
+    parser.add_argument("--num_threads", type=int, default=None, help="Число рабочих процессов.")
+    parser.add_argument("--start_method", choices=["fork", "forkserver", "spawn"], default=None,
+                        help="Способ запуска рабочих процессов (по умолчанию — принятый на платформе).")
+    parser.add_argument("--max_in_flight", type=int, default=None,
+                        help="Максимальное число одновременно выполняемых заданий (по умолчанию — 2 × число процессов).")
+    parser.add_argument("--encode_threads", type=int, default=2,
+                        help="Число потоков кодирования изображений (по умолчанию 2).")
+    parser.add_argument("--affinity", choices=AFFINITY_MODES, default="none",
+                        help="Закрепление рабочих процессов: core, node или none (по умолчанию).")
+    parser.add_argument("--engine", choices=["python", "numpy", "jit"], default=None,
+                        help="Движок рендеринга (по умолчанию — движок профиля машины или python).")
+    _add_profile_args(parser)
+    return parser.parse_args(argv)
+
+
+def parse_server_args(argv=None):
+    """
+    Функция для парсинга аргументов командной строки сервера рендеринга.
+
+    Аргументы включают адрес и порт сервера, число рабочих процессов, способ их запуска
+    и размер кэша результатов.
+
+    Параметры:
+        argv (list[str] | None): Список аргументов (по умолчанию — sys.argv).
+
+    Returns:
+        argparse.Namespace: Объект с парсированными аргументами командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Сервер рендеринга фракталов.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Адрес сервера.")
+    parser.add_argument("--port", type=int, default=8765, help="Порт сервера.")
+    parser.add_argument("--num_threads", type=int, default=None, help="Число рабочих процессов.")
+    parser.add_argument("--start_method", choices=["fork", "forkserver", "spawn"], default=None,
+                        help="Способ запуска рабочих процессов (по умолчанию — принятый на платформе).")
+    parser.add_argument("--cache_size", type=int, default=256, help="Число изображений в кэше результатов.")
+    return parser.parse_args(argv)
+
+
+def parse_distributed_args(argv=None):
+    """
+    Функция для парсинга аргументов командной строки распределённого рендеринга.
+
+    Роль "coordinator" раздаёт порции сэмплов и сохраняет итоговое изображение, роль "worker"
+    подключается к координатору и рендерит порции.
+
+    Параметры:
+        argv (list[str] | None): Список аргументов (по умолчанию — sys.argv).
+
+    Returns:
+        argparse.Namespace: Объект с парсированными аргументами командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Распределённый рендеринг фракталов.")
+    parser.add_argument("role", choices=["coordinator", "worker"], help="Роль процесса.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Адрес координатора.")
+    parser.add_argument("--port", type=int, default=9100, help="Порт координатора.")
+    parser.add_argument("--authkey", type=str, default=None,
+                        help="Ключ аутентификации (по умолчанию — переменная окружения FRACTAL_AUTHKEY).")
+    parser.add_argument("--config_file", type=str, default="fractal_config.json",
+                        help="Путь к конфигурационному файлу (для координатора).")
+    parser.add_argument("--width", type=int, default=600, help="Ширина холста.")
+    parser.add_argument("--height", type=int, default=400, help="Высота холста.")
+    parser.add_argument("--chunk_samples", type=int, default=10000, help="Число сэмплов в одной порции.")
+    parser.add_argument("--local_workers", type=int, default=0,
+                        help="Запустить указанное число рабочих в локальных процессах.")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Максимальное время ожидания результатов координатором в секундах.")
+    parser.add_argument("--output", type=str, default="fractal_distributed.png", help="Путь к результату.")
+    return parser.parse_args(argv)
+
+
+def parse_animation_args(argv=None):
+    """
+    Функция для парсинга аргументов командной строки рендеринга анимации.
+
+    Аргументы включают путь к файлу анимации, каталог для кадров, число рабочих процессов,
+    способ их запуска, число цепочек кадров, и параметры потока кадров rawvideo.
+
+    Параметры:
+        argv (list[str] | None): Список аргументов (по умолчанию — sys.argv).
+
+    Returns:
+        argparse.Namespace: Объект с парсированными аргументами командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Рендеринг анимации фракталов по ключевым кадрам.")
+    parser.add_argument("animation_file", type=str, help="Путь к файлу анимации (JSON).")
+    parser.add_argument("--output_dir", type=str, default="frames", help="Каталог для кадров.")
+    parser.add_argument("--num_threads", type=int, default=None, help="Число рабочих процессов.")
+    parser.add_argument("--start_method", choices=["fork", "forkserver", "spawn"], default=None,
+                        help="Способ запуска рабочих процессов (по умолчанию — принятый на платформе).")
+    parser.add_argument("--chains", type=int, default=None,
+                        help="Число цепочек кадров, рендерящихся параллельно; кадр продолжает орбиты "
+                             "предыдущего кадра своей цепочки (по умолчанию — число процессов).")
+    parser.add_argument("--raw_output", type=str, default=None,
+                        help="Записывать кадры несжатыми байтами RGB24 в файл или именованный канал "
+                             "(\"-\" — в stdout) вместо PNG.")
+    parser.add_argument("--fps", type=float, default=24, help="Частота кадров для описания потока rawvideo.")
+    return parser.parse_args(argv)
+
+
+def parse_autotune_args(argv=None):
+    """
+    Функция для парсинга аргументов командной строки автоматической настройки.
+
+    Аргументы включают калибруемый движок, размер замеров и холста, наибольшее число процессов,
+    способ их запуска, число повторов замеров и путь к файлу профилей.
+
+    Параметры:
+        argv (list[str] | None): Список аргументов (по умолчанию — sys.argv).
+
+    Returns:
+        argparse.Namespace: Объект с парсированными аргументами командной строки.
+    """
+    parser = argparse.ArgumentParser(description="Подбор параметров рендеринга для текущей машины.")
+    parser.add_argument("--engine", choices=["numpy", "jit"], default="numpy", help="Калибруемый движок.")
+    parser.add_argument("--samples", type=int, default=200000, help="Число сэмплов одного замера.")
+    parser.add_argument("--width", type=int, default=600, help="Ширина холста замеров.")
+    parser.add_argument("--height", type=int, default=400, help="Высота холста замеров.")
+    parser.add_argument("--max_workers", type=int, default=None,
+                        help="Наибольшее проверяемое число процессов (по умолчанию — число доступных CPU).")
+    parser.add_argument("--start_method", choices=["fork", "forkserver", "spawn"], default=None,
+                        help="Способ запуска рабочих процессов (по умолчанию — принятый на платформе).")
+    parser.add_argument("--repeats", type=int, default=2, help="Число повторов каждого замера.")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Файл профилей (по умолчанию — $FRACTAL_PROFILE или ~/.fractal_profile.json).")
+    return parser.parse_args(argv)
@@ -0,0 +1,103 @@
+"""
+Модуль таблиц цветовых карт.
+
+Окрашивание изображения требует только таблицы цветов карты, поэтому таблицы распространённых карт
+matplotlib заранее вычислены и сохранены в файл colormaps.npz рядом с модулем. Процессоры берут
+таблицы из этого файла, и ни основной процесс, ни рабочие процессы не импортируют matplotlib,
+импорт которого занимает больше времени, чем рендеринг небольшого изображения. Matplotlib
+импортируется только для карт, которых нет в файле, и для пересоздания файла:
+
+    python -m src.colormaps
+"""
+from pathlib import Path
+
+import numpy as np
+
+LUT_FILE = Path(__file__).with_name("colormaps.npz")
+
+# Карты, таблицы которых хранятся в LUT_FILE
+NAMED_COLORMAPS = (
+    "inferno", "magma", "plasma", "viridis", "cividis", "twilight", "turbo",
+    "hot", "afmhot", "gist_heat", "copper", "gray", "bone", "pink",
+    "cool", "spring", "summer", "autumn", "winter", "coolwarm",
+)
+
+_luts: dict[str, np.ndarray] = {}
+
+
+def build_lut(name: str) -> np.ndarray:
+    """
+    Вычисляет таблицу цветов карты matplotlib.
+
+    Параметры:
+        name (str): Название цветовой карты.
+
+    Returns:
+        np.ndarray: Таблица формы (N, 3) типа uint8, где N — число цветов карты.
+
+    Exceptions:
+        ValueError: Если карта с таким названием не зарегистрирована в matplotlib.
+    """
+    import matplotlib
+
+    colormap = matplotlib.colormaps.get_cmap(name)
+    colors = colormap(np.arange(colormap.N))
+    return np.minimum(255, colors[:, :3] * 255).astype(np.uint8)
+
+
+def _load_file() -> None:
+    if LUT_FILE.exists():
+        with np.load(LUT_FILE) as data:
+            for name in data.files:
+                _luts.setdefault(name, data[name])
+
+
+def get_lut(name: str) -> np.ndarray:
+    """
+    Возвращает таблицу цветов карты, загружая её из LUT_FILE или вычисляя с помощью matplotlib.
+
+    Параметры:
+        name (str): Название цветовой карты.
+
+    Returns:
+        np.ndarray: Таблица формы (N, 3) типа uint8.
+    """
+    if name not in _luts:
+        _load_file()
+    if name not in _luts:
+        _luts[name] = build_lut(name)
+    return _luts[name]
+
+
+def apply_lut(lut: np.ndarray, values) -> np.ndarray:
+    """
+    Окрашивает значения из [0, 1] по таблице так же, как это делает карта matplotlib.
+
+    Значения меньше 0 получают первый цвет таблицы, значения не меньше 1 — последний.
+
+    Параметры:
+        lut (np.ndarray): Таблица цветов (см. get_lut).
+        values (float или np.ndarray): Значения для окрашивания.
+
+    Returns:
+        np.ndarray: Цвета формы values.shape + (3,) типа uint8.
+    """
+    size = len(lut)
+    indices = np.clip(np.floor(np.multiply(values, size)), 0, size - 1).astype(np.intp)
+    return lut[indices]
+
+
+def save_luts(path: Path = LUT_FILE, names=NAMED_COLORMAPS) -> None:
+    """
+    Вычисляет таблицы карт с помощью matplotlib и сохраняет их в файл.
+
+    Параметры:
+        path (Path): Путь к файлу таблиц.
+        names (tuple[str]): Названия цветовых карт.
+    """
+    np.savez_compressed(path, **{name: build_lut(name) for name in names})
+
+
+if __name__ == "__main__":
+    save_luts()
+    print(f"Таблицы {len(NAMED_COLORMAPS)} цветовых карт сохранены в {LUT_FILE}")
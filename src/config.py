@@ -1,7 +1,8 @@
 from src.transformations import (SinusoidalTransformation, SphericalTransformation, SwirlTransformation,
                                  PolarTransformation, HandkerchiefTransformation, HeartTransformation,
                                  DiscTransformation, SpiralTransformation, HyperbolicTransformation,
-                                 DiamondTransformation, PopcornTransformation, PDJTransformation, CurlTransformation)
+                                 DiamondTransformation, PopcornTransformation, PDJTransformation, CurlTransformation,
+                                 ExpressionTransformation)
 
 TRANSFORMATIONS_MAP = {
     "SinusoidalTransformation": SinusoidalTransformation,
@@ -17,6 +18,7 @@ TRANSFORMATIONS_MAP = {
     "PopcornTransformation": PopcornTransformation,
     "PDJTransformation": PDJTransformation,
     "CurlTransformation": CurlTransformation,
+    "ExpressionTransformation": ExpressionTransformation,
 }
 
 TRANSFORMATION_PARAMS = {
@@ -33,4 +35,5 @@ TRANSFORMATION_PARAMS = {
     "PopcornTransformation": "c=0.5, d=0.5",
     "PDJTransformation": "a=1.0, b=1.0, c=1.0, d=1.0",
     "CurlTransformation": "p=0.5, q=0.5",
+    "ExpressionTransformation": 'x="sin(a * x) / r", y="cos(a * y) * theta", params={"a": 1.5}',
 }
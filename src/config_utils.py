@@ -1,10 +1,70 @@
+import ast
 import json
 
 from src.config import TRANSFORMATIONS_MAP, TRANSFORMATION_PARAMS
 from src.domain import Rect
+from src.sampling import SAMPLING_METHODS
 from src.transformation_config import TransformationConfig
 
 
+def config_from_dict(conf):
+    """
+    Создаёт объект TransformationConfig из словаря в формате конфигурационного файла.
+
+    Параметры:
+        conf (dict): Словарь с полями transformation, params, iterations, world, samples, symmetry
+                     и необязательными tolerance и sampling.
+
+    Returns:
+        TransformationConfig: Конфигурация трансформации.
+
+    Exceptions:
+        KeyError: Если трансформация неизвестна или отсутствует обязательное поле.
+        TypeError: Если параметры не соответствуют конструктору трансформации.
+        ValueError: Если способ выбора начальных точек неизвестен.
+    """
+    transformation_class = TRANSFORMATIONS_MAP[conf["transformation"]]
+    params = conf.get("params", {})
+    sampling = conf.get("sampling", "uniform")
+    if sampling not in SAMPLING_METHODS:
+        raise ValueError(f"Неизвестный способ выбора начальных точек: {sampling}. "
+                         f"Допустимые: {', '.join(SAMPLING_METHODS)}")
+    return TransformationConfig(
+        transformation=transformation_class(**params),
+        iterations=conf["iterations"],
+        world=Rect(**conf["world"]),
+        samples=conf["samples"],
+        symmetry=conf["symmetry"],
+        tolerance=conf.get("tolerance"),
+        sampling=sampling,
+    )
+
+
+def config_to_dict(conf):
+    """
+    Преобразует объект TransformationConfig в словарь в формате конфигурационного файла.
+
+    Параметры:
+        conf (TransformationConfig): Конфигурация трансформации.
+
+    Returns:
+        dict: Словарь, пригодный для сохранения в JSON и обратного чтения через config_from_dict.
+    """
+    serialized = {
+        "transformation": conf.transformation.__class__.__name__,
+        "params": vars(conf.transformation),
+        "iterations": conf.iterations,
+        "world": vars(conf.world),
+        "samples": conf.samples,
+        "symmetry": conf.symmetry,
+    }
+    if conf.tolerance is not None:
+        serialized["tolerance"] = conf.tolerance
+    if conf.sampling != "uniform":
+        serialized["sampling"] = conf.sampling
+    return serialized
+
+
 def load_config_from_file(config_file_path):
     """
     Загружает конфигурации трансформаций из файла.
@@ -20,28 +80,30 @@ def load_config_from_file(config_file_path):
         выводится сообщение об ошибке, и возвращается пустой список.
     """
     try:
-        with open(config_file_path, "r") as f:
-            configs = json.load(f)
-        transformation_configs = []
-        for conf in configs:
-            transformation_class = TRANSFORMATIONS_MAP[conf["transformation"]]
-            params = conf.get("params", {})
-            transformation = transformation_class(**params)
-            transformation_configs.append(
-                TransformationConfig(
-                    transformation=transformation,
-                    iterations=conf["iterations"],
-                    world=Rect(**conf["world"]),
-                    samples=conf["samples"],
-                    symmetry=conf["symmetry"],
-                )
-            )
-        return transformation_configs
+        return read_config_file(config_file_path)
     except Exception as e:
         print(f"Ошибка при загрузке конфигурационного файла: {e}")
         return []
 
 
+def read_config_file(config_file_path):
+    """
+    Читает конфигурации трансформаций из файла, не перехватывая ошибки.
+
+    Параметры:
+        config_file_path (str или Path): Путь к файлу конфигурации.
+
+    Returns:
+        list: Список объектов TransformationConfig.
+
+    Exceptions:
+        OSError, ValueError, KeyError, TypeError: Если файл не читается или содержит некорректные конфигурации.
+    """
+    with open(config_file_path, "r") as f:
+        configs = json.load(f)
+    return [config_from_dict(conf) for conf in configs]
+
+
 def save_config_to_file(configs, output_file):
     """
     Сохраняет список конфигураций трансформаций в файл.
@@ -54,16 +116,7 @@ def save_config_to_file(configs, output_file):
         Если возникает ошибка при сохранении, выводится сообщение об ошибке.
     """
     try:
-        serialized_configs = []
-        for conf in configs:
-            serialized_configs.append({
-                "transformation": conf.transformation.__class__.__name__,
-                "params": vars(conf.transformation),
-                "iterations": conf.iterations,
-                "world": vars(conf.world),
-                "samples": conf.samples,
-                "symmetry": conf.symmetry,
-            })
+        serialized_configs = [config_to_dict(conf) for conf in configs]
         with open(output_file, "w") as f:
             json.dump(serialized_configs, f, indent=4)
         print(f"Конфигурация успешно сохранена в файл: {output_file}")
@@ -71,6 +124,28 @@ def save_config_to_file(configs, output_file):
         print(f"Ошибка при сохранении конфигурации: {e}")
 
 
+def parse_keyword_arguments(text):
+    """
+    Разбирает ввод вида "a=1.0, b=2, x=\"sin(x)\", params={\"c\": 0.5}" в словарь, не выполняя код.
+
+    Значения могут быть только литералами Python: числами, строками, списками и словарями.
+
+    Параметры:
+        text (str): Список именованных аргументов через запятую.
+
+    Returns:
+        dict: Имена аргументов и их значения.
+
+    Exceptions:
+        SyntaxError: Если ввод не является списком именованных аргументов.
+        ValueError: Если значение аргумента не является литералом.
+    """
+    call = ast.parse(f"dict({text})", mode="eval").body
+    if not isinstance(call, ast.Call) or call.args or any(keyword.arg is None for keyword in call.keywords):
+        raise ValueError("Ожидаются только именованные аргументы вида имя=значение")
+    return {keyword.arg: ast.literal_eval(keyword.value) for keyword in call.keywords}
+
+
 def get_transformation_config():
     """
     Запрашивает у пользователя параметры трансформации и возвращает объект TransformationConfig.
@@ -118,7 +193,7 @@ def get_transformation_config():
             params = input("Введите параметры (оставьте пустым для значений по умолчанию): ")
             try:
                 if params:
-                    params_dict = eval(f"dict({params})")
+                    params_dict = parse_keyword_arguments(params)
                     # Проверка, что параметры соответствуют аргументам конструктора
                     invalid_args = [key for key in params_dict if key not in expected_args]
                     if invalid_args:
@@ -145,7 +220,7 @@ def get_transformation_config():
     while True:
         world_input = input("Границы мира (формат: x=-1, y=-1, width=2, height=2, по умолчанию): ")
         try:
-            world_params = eval(f"dict({world_input})") if world_input else {"x": -1, "y": -1, "width": 2, "height": 2}
+            world_params = parse_keyword_arguments(world_input) if world_input else {"x": -1, "y": -1, "width": 2, "height": 2}
             world = Rect(**world_params)
             break
         except (SyntaxError, ValueError, TypeError) as e:
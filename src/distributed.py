@@ -0,0 +1,359 @@
+"""
+Модуль распределённого рендеринга фракталов по схеме координатор/рабочие.
+
+Координатор делит сэмплы каждой конфигурации на порции и раздаёт их по TCP рабочим процессам,
+которые могут работать на других узлах. Каждая порция рендерится со своим зерном генератора
+случайных чисел, а рабочий возвращает сжатый массив попаданий, который координатор суммирует
+в итоговый холст. Внешний брокер не нужен: используется multiprocessing.connection.
+
+Соединения multiprocessing.connection передают объекты через pickle, поэтому на адресах, доступных
+из сети, обязателен собственный ключ аутентификации: с ключом по умолчанию работают только
+локальные адреса.
+
+Запуск:
+    python -m src.distributed coordinator --config_file fractal_config.json --host 0.0.0.0 --port 9100 \
+        --authkey SECRET --output fractal.png
+    python -m src.distributed worker --host 10.0.0.1 --port 9100 --authkey SECRET
+"""
+import ipaddress
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+
+import numpy as np
+
+from src.cli import parse_distributed_args
+from src.config_utils import config_from_dict, config_to_dict, load_config_from_file
+from src.domain import FractalImage
+from src.histogram import add_hits, clear_hits, hit_counts
+from src.processors import LogGammaCorrectionProcessor
+from src.renderer import render_config
+from src.sampling import start_sequence
+from src.transport import merge_hits, pack_hits
+from src.utils import ImageUtils
+
+DEFAULT_AUTHKEY = b"fractal-flame"
+
+# Пауза рабочего соединения в ожидании порций, возвращённых отвалившимися рабочими
+IDLE_WAIT = 0.05
+
+# Период проверки, живы ли локальные рабочие процессы
+LIVENESS_INTERVAL = 0.5
+
+
+def _authkey(value: str | None = None) -> bytes:
+    value = value or os.environ.get("FRACTAL_AUTHKEY")
+    return value.encode() if value else DEFAULT_AUTHKEY
+
+
+def is_loopback(host: str) -> bool:
+    """
+    Проверяет, что адрес доступен только с локальной машины.
+    """
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_authkey(host: str, authkey: bytes):
+    """
+    Запрещает ключ аутентификации по умолчанию для адресов, доступных из сети.
+
+    Exceptions:
+        ValueError: Если адрес не локальный, а ключ совпадает с DEFAULT_AUTHKEY.
+    """
+    if authkey == DEFAULT_AUTHKEY and not is_loopback(host):
+        raise ValueError(f"Для адреса {host} нужен собственный ключ аутентификации: "
+                         "задайте --authkey или переменную окружения FRACTAL_AUTHKEY.")
+
+
+def split_chunks(configs, width: int, height: int, chunk_samples: int, seed: int = 42) -> list[dict]:
+    """
+    Делит сэмплы конфигураций на порции с собственными зёрнами генератора.
+
+    Параметры:
+        configs (list[TransformationConfig]): Конфигурации трансформаций.
+        width (int): Ширина холста.
+        height (int): Высота холста.
+        chunk_samples (int): Максимальное число сэмплов в порции.
+        seed (int): Базовое зерно; порция с номером i получает зерно seed + i.
+
+    Последовательность начальных точек (если в конфигурации задан sampling, см. src.sampling) у всех
+    порций конфигурации общая — с зерном перемешивания seed, — а каждая порция берёт из неё свой
+    отрезок, начинающийся с номера первого сэмпла порции.
+
+    Returns:
+        list[dict]: Порции с номером, словарём конфигурации, зерном, номером первого сэмпла
+                    и размером холста.
+    """
+    chunks = []
+    for config in configs:
+        config = config._replace(tolerance=None)
+        for start in range(0, config.samples, chunk_samples):
+            samples = min(chunk_samples, config.samples - start)
+            chunks.append({
+                "chunk": len(chunks),
+                "config": config_to_dict(config._replace(samples=samples)),
+                "seed": seed + len(chunks),
+                "offset": start,
+                "sequence_seed": seed,
+                "width": width,
+                "height": height,
+            })
+    return chunks
+
+
+class Coordinator:
+    """
+    Координатор распределённого рендеринга.
+
+    Параметры:
+        configs (list[TransformationConfig]): Конфигурации трансформаций.
+        width (int): Ширина холста.
+        height (int): Высота холста.
+        address (tuple[str, int]): Адрес, на котором координатор ждёт рабочих (по умолчанию свободный порт localhost).
+        authkey (bytes): Ключ аутентификации соединений.
+        chunk_samples (int): Максимальное число сэмплов в порции (по умолчанию 10000).
+        seed (int): Базовое зерно генератора случайных чисел (по умолчанию 42).
+
+    Методы:
+        run(timeout, alive): Раздаёт порции рабочим и возвращает суммарный массив попаданий.
+
+    Exceptions:
+        ValueError: Если адрес доступен из сети, а ключ аутентификации не задан (см. check_authkey).
+    """
+    def __init__(self, configs, width: int, height: int, address=("127.0.0.1", 0), authkey: bytes = DEFAULT_AUTHKEY,
+                 chunk_samples: int = 10000, seed: int = 42):
+        check_authkey(address[0], authkey)
+        self.width = width
+        self.height = height
+        self._authkey = authkey
+        self._listener = Listener(address, authkey=authkey)
+        self._chunks = queue.Queue()
+        chunks = split_chunks(configs, width, height, chunk_samples, seed)
+        for chunk in chunks:
+            self._chunks.put(chunk)
+        self._remaining = len(chunks)
+        self._total = np.zeros((height, width), dtype=np.int64)
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        if not chunks:
+            self._done.set()
+
+    @property
+    def address(self):
+        return self._listener.address
+
+    def run(self, timeout: float | None = None, alive=None) -> np.ndarray:
+        """
+        Раздаёт порции подключившимся рабочим и дожидается всех результатов.
+
+        Параметры:
+            timeout (float | None): Максимальное время ожидания в секундах.
+            alive (callable | None): Функция без аргументов, возвращающая False, когда рабочих
+                                     не осталось и ждать результатов бессмысленно.
+
+        Returns:
+            np.ndarray: Массив формы (height, width) с суммарным числом попаданий.
+
+        Exceptions:
+            TimeoutError: Если порции не были обработаны за отведённое время.
+            RuntimeError: Если рабочие завершились, не обработав все порции.
+        """
+        acceptor = threading.Thread(target=self._accept_loop, daemon=True)
+        acceptor.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        workers_lost = False
+        while not self._done.wait(LIVENESS_INTERVAL if alive is not None else timeout):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if alive is not None and not alive():
+                workers_lost = not self._done.is_set()
+                break
+        finished = self._done.is_set()
+        # Останавливаем обслуживание и пробуждаем поток, ожидающий подключения, чтобы он завершился
+        self._done.set()
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except OSError:
+            pass
+        acceptor.join()
+        self._listener.close()
+        if workers_lost:
+            raise RuntimeError(f"Рабочие процессы завершились, не обработано порций: {self._remaining}")
+        if not finished:
+            raise TimeoutError(f"Не обработано порций: {self._remaining}")
+        return self._total
+
+    def _accept_loop(self):
+        while not self._done.is_set():
+            try:
+                connection = self._listener.accept()
+            except (OSError, multiprocessing.AuthenticationError):
+                continue
+            if self._done.is_set():
+                connection.close()
+                break
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        with connection:
+            while not self._done.is_set():
+                try:
+                    chunk = self._chunks.get_nowait()
+                except queue.Empty:
+                    time.sleep(IDLE_WAIT)
+                    continue
+                try:
+                    connection.send(chunk)
+                    _, payload = connection.recv()
+                except (EOFError, OSError):
+                    # Рабочий отключился: порция достанется другому
+                    self._chunks.put(chunk)
+                    return
+                with self._lock:
+                    merge_hits(self._total, payload)
+                    self._remaining -= 1
+                    if self._remaining == 0:
+                        self._done.set()
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+
+
+def _render_chunk(canvases: dict, chunk: dict) -> tuple:
+    """
+    Рендерит порцию на закэшированном холсте и возвращает упакованный массив попаданий.
+    """
+    size = (chunk["width"], chunk["height"])
+    if size not in canvases:
+        canvases[size] = FractalImage(*size)
+    canvas = canvases[size]
+    config = config_from_dict(chunk["config"])
+    sequence = start_sequence(config.sampling, chunk.get("sequence_seed", chunk["seed"]), chunk.get("offset", 0))
+    render_config(canvas, config, seed=chunk["seed"], sequence=sequence)
+    hits = hit_counts(canvas)
+    clear_hits(canvas, hits)
+    return pack_hits(hits)
+
+
+def run_worker(address, authkey: bytes = DEFAULT_AUTHKEY) -> int:
+    """
+    Подключается к координатору и рендерит порции, пока они не закончатся.
+
+    Параметры:
+        address (tuple[str, int]): Адрес координатора.
+        authkey (bytes): Ключ аутентификации.
+
+    Returns:
+        int: Число обработанных порций.
+
+    Exceptions:
+        ValueError: Если адрес доступен из сети, а ключ аутентификации не задан (см. check_authkey).
+    """
+    check_authkey(address[0], authkey)
+    canvases = {}
+    processed = 0
+    with Client(tuple(address), authkey=authkey) as connection:
+        while True:
+            try:
+                chunk = connection.recv()
+            except EOFError:
+                break
+            if chunk is None:
+                break
+            connection.send((chunk["chunk"], _render_chunk(canvases, chunk)))
+            processed += 1
+    return processed
+
+
+def render_distributed_local(configs, width: int, height: int, num_workers: int = 2, chunk_samples: int = 10000,
+                             seed: int = 42, address=("127.0.0.1", 0), authkey: bytes = DEFAULT_AUTHKEY,
+                             timeout: float | None = None) -> FractalImage:
+    """
+    Выполняет распределённый рендеринг с рабочими в локальных процессах.
+
+    К координатору могут подключиться и внешние рабочие. Если все локальные рабочие завершатся,
+    не обработав порции, рендеринг прерывается.
+
+    Параметры:
+        configs (list[TransformationConfig]): Конфигурации трансформаций.
+        width (int): Ширина холста.
+        height (int): Высота холста.
+        num_workers (int): Число локальных рабочих процессов (по умолчанию 2).
+        chunk_samples (int): Максимальное число сэмплов в порции (по умолчанию 10000).
+        seed (int): Базовое зерно генератора случайных чисел (по умолчанию 42).
+        address (tuple[str, int]): Адрес координатора (по умолчанию свободный порт localhost).
+        authkey (bytes): Ключ аутентификации соединений.
+        timeout (float | None): Максимальное время рендеринга в секундах.
+
+    Returns:
+        FractalImage: Холст с суммарным результатом рендеринга.
+
+    Exceptions:
+        TimeoutError: Если порции не были обработаны за отведённое время.
+        RuntimeError: Если все локальные рабочие завершились, не обработав порции.
+    """
+    coordinator = Coordinator(configs, width, height, address, authkey, chunk_samples, seed)
+    workers = [multiprocessing.Process(target=run_worker, args=(coordinator.address, authkey))
+               for _ in range(num_workers)]
+    for worker in workers:
+        worker.start()
+    try:
+        hits = coordinator.run(timeout, alive=lambda: any(worker.is_alive() for worker in workers))
+    finally:
+        for worker in workers:
+            worker.join(LIVENESS_INTERVAL)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+    canvas = FractalImage(width, height)
+    add_hits(canvas, hits)
+    return canvas
+
+
+def main() -> None:
+    args = parse_distributed_args()
+    authkey = _authkey(args.authkey)
+
+    try:
+        check_authkey(args.host, authkey)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        return
+
+    if args.role == "worker":
+        processed = run_worker((args.host, args.port), authkey)
+        print(f"Рабочий процесс завершён, обработано порций: {processed}")
+        return
+
+    configs = load_config_from_file(args.config_file)
+    start_time = time.time()
+    try:
+        if args.local_workers:
+            canvas = render_distributed_local(configs, args.width, args.height, args.local_workers, args.chunk_samples,
+                                              address=(args.host, args.port), authkey=authkey, timeout=args.timeout)
+        else:
+            coordinator = Coordinator(configs, args.width, args.height, (args.host, args.port), authkey,
+                                      args.chunk_samples)
+            print(f"Координатор ожидает рабочих на {coordinator.address[0]}:{coordinator.address[1]}")
+            canvas = FractalImage(args.width, args.height)
+            add_hits(canvas, coordinator.run(args.timeout))
+    except (TimeoutError, RuntimeError) as e:
+        print(f"Ошибка распределённого рендеринга: {e}")
+        return
+    output_path = Path(args.output)
+    ImageUtils.save_with_processing(canvas, LogGammaCorrectionProcessor(), output_path)
+    print(f"Распределённая версия: {time.time() - start_time:.2f} секунд. Сохранено: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
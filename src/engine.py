@@ -0,0 +1,517 @@
+"""
+Модуль векторизованного рендеринга фракталов на массивах NumPy.
+
+В отличие от src.renderer.render, который обрабатывает точки по одной, здесь орбиты
+обрабатываются пакетами: координаты точек хранятся в массивах, трансформации применяются
+методом Transformation.batch, а попадания накапливаются в гистограмме-массиве.
+
+Точность вычислений выбирается отдельно для координат точек (float32 или float64) и для
+счётчиков попаданий (uint32, uint64 или float32). Счётчики автоматически расширяются
+(uint32 -> uint64, float32 -> float64), когда число попаданий может превысить точно
+представимый диапазон типа.
+
+Разреженные попадания пакета накапливаются в порядке возрастания индекса, то есть плитка за
+плиткой — полосами из целых строк размером с кэш L2, а не вразброс по всему холсту. На больших
+холстах плитки можно разделить между несколькими потоками (параметр tile_threads): каждый поток
+владеет своим непрерывным диапазоном плиток, поэтому синхронизация не нужна.
+
+Функция render_viewports накапливает одни и те же орбиты сразу в несколько областей просмотра
+(кадрирования, увеличенные фрагменты), не повторяя итерации трансформаций.
+
+Бэкенд "jit" выполняет тот же рендеринг JIT-компилируемым ядром src.jit, если установлен Numba
+и все трансформации поддерживаются ядром; иначе используется бэкенд "numpy".
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from src import progress
+from src.domain import Rect
+from src.histogram import log_density
+from src.renderer import ADAPTIVE_BATCHES, AdaptiveResult
+from src.sampling import StartSequence, start_sequence
+from src.transformations import Transformation
+
+PRECISIONS = {"float32": np.float32, "float64": np.float64}
+
+ACCUMULATORS = {"uint32": np.uint32, "uint64": np.uint64, "float32": np.float32}
+
+# Тип, до которого расширяется счётчик, и наибольшее точно представимое в исходном типе значение
+PROMOTIONS = {
+    np.dtype(np.uint32): (np.uint64, np.iinfo(np.uint32).max),
+    np.dtype(np.float32): (np.float64, 2 ** 24),
+}
+
+BACKENDS = ("numpy", "jit")
+
+DEFAULT_BATCH_SIZE = 65536
+
+# Если холст больше пакета попаданий во столько раз, попадания суммируются через сортировку,
+# а не через bincount по всему холсту
+BINCOUNT_RATIO = 8
+
+# Размер плитки поблочного накопления в байтах (порядка размера кэша L2) и наименьший холст,
+# на котором оно используется
+TILE_BYTES = 1 << 20
+TILED_MIN_PIXELS = 1 << 22
+
+
+class EngineOptions(NamedTuple):
+    """
+    Параметры векторизованного рендеринга.
+
+    Атрибуты:
+        precision (str): Точность координат точек: "float32" или "float64" (по умолчанию "float64").
+        accumulator (str): Тип счётчиков попаданий: "uint32", "uint64" или "float32" (по умолчанию "uint32").
+        batch_size (int): Число орбит, обрабатываемых одним пакетом (по умолчанию DEFAULT_BATCH_SIZE).
+        backend (str): Бэкенд: "numpy" или "jit" (по умолчанию "numpy").
+        tile_threads (int): Число потоков поблочного накопления попаданий на больших холстах (по умолчанию 1).
+        tile_bytes (int): Размер плитки поблочного накопления в байтах (по умолчанию TILE_BYTES).
+    """
+    precision: str = "float64"
+    accumulator: str = "uint32"
+    batch_size: int = DEFAULT_BATCH_SIZE
+    backend: str = "numpy"
+    tile_threads: int = 1
+    tile_bytes: int = TILE_BYTES
+
+
+class Viewport(NamedTuple):
+    """
+    Область просмотра для render_viewports.
+
+    Атрибуты:
+        world (Rect): Область мира, отображаемая на гистограмму.
+        histogram (Histogram): Гистограмма, в которую накапливаются попадания области.
+    """
+    world: Rect
+    histogram: "Histogram"
+
+
+class Histogram:
+    """
+    Гистограмма попаданий в виде массива с автоматическим расширением типа счётчиков.
+
+    Параметры:
+        width (int): Ширина холста.
+        height (int): Высота холста.
+        accumulator (str): Тип счётчиков: "uint32", "uint64" или "float32" (по умолчанию "uint32").
+        tile_threads (int): Число потоков, между которыми делятся плитки при поблочном накоплении
+                            (по умолчанию 1).
+        tile_bytes (int): Размер плитки в байтах (по умолчанию TILE_BYTES).
+
+    Атрибуты:
+        hits (np.ndarray): Массив формы (height, width) с числом попаданий.
+
+    Методы:
+        reserve(count): Расширяет тип счётчиков, если добавление count попаданий может переполнить его.
+        add(indices): Добавляет попадания по плоским индексам пикселей.
+        add_counts(counts): Добавляет плоский массив числа попаданий в каждый пиксель.
+    """
+    def __init__(self, width: int, height: int, accumulator: str = "uint32", tile_threads: int = 1,
+                 tile_bytes: int = TILE_BYTES):
+        if accumulator not in ACCUMULATORS:
+            raise ValueError(f"Неизвестный тип счётчиков: {accumulator}. Допустимые: {', '.join(ACCUMULATORS)}")
+        if tile_threads < 1:
+            raise ValueError("Число потоков накопления должно быть положительным.")
+        if tile_bytes < 1:
+            raise ValueError("Размер плитки должен быть положительным.")
+        self.width = width
+        self.height = height
+        self.tile_threads = tile_threads
+        self.tile_bytes = tile_bytes
+        self.hits = np.zeros((height, width), dtype=ACCUMULATORS[accumulator])
+        # Верхняя граница максимального значения счётчика, пересчитывается по требованию
+        self._max_bound = 0
+
+    def reserve(self, count: int):
+        """
+        Расширяет тип счётчиков, если после добавления `count` попаданий максимум может выйти
+        за точно представимый диапазон.
+        """
+        promotion = PROMOTIONS.get(self.hits.dtype)
+        if promotion is None:
+            return
+        wider_type, limit = promotion
+        if self._max_bound + count <= limit:
+            return
+        self._max_bound = int(self.hits.max())
+        if self._max_bound + count > limit:
+            self.hits = self.hits.astype(wider_type)
+
+    def add(self, indices: np.ndarray):
+        """
+        Добавляет по одному попаданию в пиксели с плоскими индексами `indices`.
+        """
+        if not indices.size:
+            return
+        self.reserve(indices.size)
+        self._max_bound += indices.size
+        flat = self.hits.reshape(-1)
+        if self.tile_threads > 1 and flat.size >= TILED_MIN_PIXELS and flat.size > BINCOUNT_RATIO * indices.size:
+            self._add_tiled(flat, indices)
+        else:
+            _add_block(flat, indices)
+
+    def _add_tiled(self, flat: np.ndarray, indices: np.ndarray):
+        """
+        Распределяет попадания по плиткам из целых строк размером около tile_bytes и делит плитки
+        на tile_threads непрерывных диапазонов с примерно равным числом попаданий; каждый поток
+        накапливает свой диапазон плитка за плиткой.
+        """
+        tile = self.width * max(1, self.tile_bytes // (self.width * flat.itemsize))
+        tiles = indices // tile
+        counts = np.bincount(tiles, minlength=-(-flat.size // tile))
+        # Устойчивая сортировка 16-битных ключей — поразрядная, за линейное время
+        keys = tiles.astype(np.uint16) if counts.size <= 1 << 16 else tiles
+        grouped = indices[np.argsort(keys, kind="stable")]
+        ends = np.cumsum(counts)
+        splits = np.searchsorted(ends, np.arange(1, self.tile_threads) * indices.size / self.tile_threads)
+        bounds = [0] + np.unique(splits + 1).tolist() + [counts.size]
+        jobs = []
+        for first, last in zip(bounds, bounds[1:]):
+            start, end = (ends[first - 1] if first else 0), ends[last - 1]
+            if last > first and end > start:
+                jobs.append((flat[first * tile:last * tile], grouped[start:end] - first * tile))
+        list(_tile_executor(self.tile_threads).map(lambda job: _add_block(*job), jobs))
+
+    def add_counts(self, counts: np.ndarray):
+        """
+        Добавляет плоский массив `counts` длины width * height с числом попаданий в каждый пиксель.
+        """
+        most = int(counts.max()) if counts.size else 0
+        if not most:
+            return
+        self.reserve(most)
+        self._max_bound += most
+        flat = self.hits.reshape(-1)
+        flat += counts.astype(flat.dtype, copy=False)
+
+
+def _add_block(flat: np.ndarray, indices: np.ndarray):
+    """
+    Добавляет по одному попаданию в элементы `flat` с индексами `indices`.
+
+    Разреженные попадания сортируются, поэтому запись идёт по холсту последовательно —
+    полоса строк размером TILE_BYTES за полосой.
+    """
+    if flat.size <= BINCOUNT_RATIO * indices.size:
+        flat += np.bincount(indices, minlength=flat.size).astype(flat.dtype, copy=False)
+    else:
+        pixels, counts = np.unique(indices, return_counts=True)
+        flat[pixels] += counts.astype(flat.dtype, copy=False)
+
+
+_executors: dict[int, tuple[int, ThreadPoolExecutor]] = {}
+
+
+def _tile_executor(threads: int) -> ThreadPoolExecutor:
+    """
+    Возвращает пул потоков поблочного накопления; после fork пул создаётся заново, так как
+    потоки родительского процесса в дочернем не существуют.
+    """
+    pid, executor = _executors.get(threads, (None, None))
+    if pid != os.getpid():
+        executor = ThreadPoolExecutor(threads, thread_name_prefix="histogram-tiles")
+        _executors[threads] = (os.getpid(), executor)
+    return executor
+
+
+def apply_variations(variations: list[Transformation], choice: np.ndarray | None, x: np.ndarray, y: np.ndarray):
+    """
+    Применяет к каждой точке выбранную для неё трансформацию.
+
+    Параметры:
+        variations (list[Transformation]): Список трансформаций.
+        choice (np.ndarray | None): Номер трансформации для каждой точки (None, если трансформация одна).
+        x, y (np.ndarray): Координаты точек.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Новые координаты точек.
+    """
+    if choice is None:
+        return variations[0].batch(x, y)
+    new_x, new_y = np.empty_like(x), np.empty_like(y)
+    for index, variation in enumerate(variations):
+        mask = choice == index
+        if mask.any():
+            new_x[mask], new_y[mask] = variation.batch(x[mask], y[mask])
+    return new_x, new_y
+
+
+def _apply_jitter(jitters: np.ndarray, choice: np.ndarray | None, rng, x: np.ndarray, y: np.ndarray):
+    """
+    Добавляет к точкам случайные отклонения с амплитудой jitter выбранных для них трансформаций.
+    """
+    amplitude = jitters[choice] if choice is not None else jitters[0]
+    noise = rng.random((2, len(x))) * 2 - 1
+    return (x + (amplitude * noise[0]).astype(x.dtype),
+            y + (amplitude * noise[1]).astype(y.dtype))
+
+
+def pixel_indices(world: Rect, width: int, height: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Переводит точки в плоские индексы пикселей холста, отбрасывая точки вне области.
+
+    Параметры:
+        world (Rect): Область мира, отображаемая на холст.
+        width (int): Ширина холста.
+        height (int): Высота холста.
+        x, y (np.ndarray): Координаты точек.
+
+    Returns:
+        np.ndarray: Плоские индексы (y * width + x) пикселей, в которые попали точки.
+    """
+    inside = (world.x <= x) & (x < world.x + world.width) & (world.y <= y) & (y < world.y + world.height)
+    px = ((x[inside] - world.x) / world.width * width).astype(np.int64)
+    py = ((y[inside] - world.y) / world.height * height).astype(np.int64)
+    on_canvas = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    return py[on_canvas] * width + px[on_canvas]
+
+
+def render_batched(
+    histogram: Histogram,
+    world: Rect,
+    variations: list[Transformation],
+    samples: int,
+    iter_per_sample: int,
+    seed: int,
+    symmetry: int = 1,
+    precision: str = "float64",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    backend: str = "numpy",
+    sequence: StartSequence | None = None,
+):
+    """
+    Рендерит фрактал пакетами орбит в гистограмму.
+
+    Параметры:
+        histogram (Histogram): Гистограмма, в которую накапливаются попадания.
+        world (Rect): Прямоугольная область, в пределах которой генерируются точки.
+        variations (list[Transformation]): Список преобразований, применяемых к точкам.
+        samples (int): Количество генерируемых точек.
+        iter_per_sample (int): Количество итераций для каждой точки.
+        seed (int): Значение для генератора случайных чисел.
+        symmetry (int): Количество симметрий (по умолчанию 1, без симметрии).
+        precision (str): Точность координат точек: "float32" или "float64" (по умолчанию "float64").
+        batch_size (int): Число орбит в пакете (по умолчанию DEFAULT_BATCH_SIZE).
+        backend (str): "numpy" или "jit"; без Numba или для неподдерживаемых трансформаций
+                       "jit" заменяется на "numpy" (по умолчанию "numpy").
+        sequence (StartSequence | None): Последовательность начальных точек с низкой неравномерностью
+                                         (см. src.sampling); по умолчанию точки выбираются случайно.
+
+    Returns:
+        None. Изменяет состояние гистограммы напрямую.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Неизвестная точность: {precision}. Допустимые: {', '.join(PRECISIONS)}")
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестный бэкенд: {backend}. Допустимые: {', '.join(BACKENDS)}")
+    dtype = PRECISIONS[precision]
+    rng = np.random.default_rng(seed)
+    angles = np.arange(symmetry) * (2 * np.pi / symmetry)
+    if backend == "jit" and _jit_supports(variations):
+        _render_jit(histogram, world, variations, samples, iter_per_sample, rng, angles, dtype, batch_size,
+                    sequence)
+        return
+    _render_targets([Viewport(world, histogram)], world, variations, samples, iter_per_sample, rng, angles, dtype,
+                    batch_size, sequence)
+
+
+def render_viewports(
+    viewports: list[Viewport],
+    variations: list[Transformation],
+    samples: int,
+    iter_per_sample: int,
+    seed: int,
+    symmetry: int = 1,
+    precision: str = "float64",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    start_world: Rect | None = None,
+    sequence: StartSequence | None = None,
+):
+    """
+    Рендерит фрактал сразу в несколько областей просмотра, итерируя орбиты один раз.
+
+    Каждая итерация пакета орбит — самая дорогая часть рендеринга — переводится в пиксели каждой
+    области, поэтому кадрирования и увеличенные фрагменты того же аттрактора почти ничего не стоят
+    сверх одного рендеринга. С одной областью результат совпадает с render_batched. Рендеринг
+    выполняется движком numpy: ядро JIT накапливает попадания только в одну гистограмму.
+
+    Параметры:
+        viewports (list[Viewport]): Области просмотра и их гистограммы.
+        variations (list[Transformation]): Список преобразований, применяемых к точкам.
+        samples (int): Количество генерируемых точек.
+        iter_per_sample (int): Количество итераций для каждой точки.
+        seed (int): Значение для генератора случайных чисел.
+        symmetry (int): Количество симметрий (по умолчанию 1, без симметрии).
+        precision (str): Точность координат точек: "float32" или "float64" (по умолчанию "float64").
+        batch_size (int): Число орбит в пакете (по умолчанию DEFAULT_BATCH_SIZE).
+        start_world (Rect | None): Область, в которой выбираются начальные точки орбит
+                                   (по умолчанию — область первой области просмотра).
+        sequence (StartSequence | None): Последовательность начальных точек с низкой неравномерностью
+                                         (см. src.sampling); по умолчанию точки выбираются случайно.
+
+    Returns:
+        None. Изменяет состояние гистограмм областей напрямую.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Неизвестная точность: {precision}. Допустимые: {', '.join(PRECISIONS)}")
+    if not viewports:
+        raise ValueError("Нужна хотя бы одна область просмотра.")
+    angles = np.arange(symmetry) * (2 * np.pi / symmetry)
+    _render_targets(viewports, start_world or viewports[0].world, variations, samples, iter_per_sample,
+                    np.random.default_rng(seed), angles, PRECISIONS[precision], batch_size, sequence)
+
+
+def _start_points(world: Rect, rng, count: int, dtype, sequence: StartSequence | None, first: int):
+    """
+    Возвращает начальные точки пакета: точки first, ..., first + count - 1 последовательности
+    или, без неё, случайные точки области.
+    """
+    if sequence is not None:
+        x, y = sequence.points(world, first, count)
+        return x.astype(dtype), y.astype(dtype)
+    x = rng.uniform(world.x, world.x + world.width, count).astype(dtype)
+    y = rng.uniform(world.y, world.y + world.height, count).astype(dtype)
+    return x, y
+
+
+def _render_targets(viewports: list[Viewport], world: Rect, variations, samples: int, iter_per_sample: int, rng,
+                    angles: np.ndarray, dtype, batch_size: int, sequence: StartSequence | None = None):
+    """
+    Итерирует пакеты орбит, начинающихся в области `world`, и накапливает попадания в гистограммы
+    всех областей просмотра.
+    """
+    rotations = list(zip(np.cos(angles).astype(dtype), np.sin(angles).astype(dtype)))
+    jitters = np.array([variation.jitter for variation in variations])
+
+    for start in range(0, samples, batch_size):
+        count = min(batch_size, samples - start)
+        plotted = 0
+        x, y = _start_points(world, rng, count, dtype, sequence, start)
+        for _ in range(iter_per_sample):
+            choice = rng.integers(len(variations), size=count) if len(variations) > 1 else None
+            x, y = apply_variations(variations, choice, x, y)
+            if jitters.any():
+                x, y = _apply_jitter(jitters, choice, rng, x, y)
+            for cos_theta, sin_theta in rotations:
+                if sin_theta == 0 and cos_theta == 1:
+                    xr, yr = x, y
+                else:
+                    xr, yr = x * cos_theta - y * sin_theta, x * sin_theta + y * cos_theta
+                for view_world, histogram in viewports:
+                    indices = pixel_indices(view_world, histogram.width, histogram.height, xr, yr)
+                    histogram.add(indices)
+                    plotted += len(indices)
+        progress.report(count, count * iter_per_sample, plotted)
+
+
+def jit_available() -> bool:
+    """
+    Проверяет, установлен ли Numba для бэкенда "jit".
+
+    Модуль src.jit (и вместе с ним Numba) импортируется только при выборе бэкенда "jit",
+    поэтому бэкенд "numpy", поточечный рендеринг и рабочие процессы пула не тратят время
+    на загрузку компилятора.
+    """
+    from src import jit
+    return jit.JIT_AVAILABLE
+
+
+def _jit_supports(variations) -> bool:
+    from src import jit
+    return jit.JIT_AVAILABLE and jit.supports(variations)
+
+
+def _render_jit(histogram: Histogram, world: Rect, variations, samples: int, iter_per_sample: int, rng,
+                angles: np.ndarray, dtype, batch_size: int, sequence: StartSequence | None = None):
+    """
+    Рендерит орбиты JIT-ядром src.jit.chaos_kernel с отдельной гистограммой на каждый поток.
+
+    Гистограммы потоков имеют тип uint32 и сливаются в `histogram`, только когда очередной
+    пакет мог бы их переполнить, и в конце рендеринга.
+    """
+    from src import jit
+    kinds, params, jitters = jit.encode_variations(variations)
+    cos_rot, sin_rot = np.cos(angles), np.sin(angles)
+    bounds = np.array([world.x, world.y, world.width, world.height], dtype=np.float64)
+    threads = jit.thread_count()
+    histograms = np.zeros((threads, histogram.width * histogram.height), dtype=np.uint32)
+    # Пакет JIT-ядра не создаёт временных массивов на каждую итерацию, поэтому он крупнее
+    batch_size *= threads * 4
+    limit = np.iinfo(np.uint32).max
+    pending = 0
+    for start in range(0, samples, batch_size):
+        count = min(batch_size, samples - start)
+        hits_bound = count * iter_per_sample * len(angles)
+        if pending + hits_bound > limit:
+            _flush_jit(histogram, histograms)
+            pending = 0
+        x, y = _start_points(world, rng, count, dtype, sequence, start)
+        seed = int(rng.integers(np.iinfo(np.int32).max))
+        jit.chaos_kernel(x, y, kinds, params, jitters, iter_per_sample, cos_rot, sin_rot, bounds,
+                         histogram.width, histogram.height, seed, histograms)
+        pending += hits_bound
+        # Попадания ядра известны только при слиянии гистограмм потоков
+        progress.report(count, count * iter_per_sample)
+    if pending:
+        _flush_jit(histogram, histograms)
+
+
+def _flush_jit(histogram: Histogram, histograms: np.ndarray):
+    """
+    Сливает гистограммы потоков JIT-ядра в `histogram`, обнуляет их и сообщает число попаданий.
+    """
+    counts = histograms.sum(axis=0, dtype=np.uint64)
+    histogram.add_counts(counts)
+    histograms[:] = 0
+    progress.report(0, 0, int(counts.sum()))
+
+
+def render_config_batched(histogram: Histogram, config, seed: int = 42, options: EngineOptions = EngineOptions(),
+                          sequence: StartSequence | None = None) -> AdaptiveResult | None:
+    """
+    Рендерит одну конфигурацию в гистограмму векторизованным движком.
+
+    Если в конфигурации задан допуск, рендеринг идёт пакетами до сходимости нормализованной
+    логарифмической плотности, как в src.renderer.render_adaptive.
+
+    Параметры:
+        histogram (Histogram): Гистограмма, в которую накапливаются попадания.
+        config (TransformationConfig): Конфигурация трансформации.
+        seed (int): Значение для генератора случайных чисел (по умолчанию 42).
+        options (EngineOptions): Параметры векторизованного рендеринга.
+        sequence (StartSequence | None): Отрезок последовательности начальных точек; по умолчанию —
+                                         с начала последовательности config.sampling с зерном seed.
+
+    Returns:
+        AdaptiveResult | None: Результат адаптивного рендеринга или None для фиксированного числа сэмплов.
+    """
+    sequence = sequence or start_sequence(config.sampling, seed)
+
+    def render_part(samples, part_seed, done=0):
+        render_batched(histogram, config.world, [config.transformation], samples, config.iterations, part_seed,
+                       config.symmetry, options.precision, options.batch_size, options.backend,
+                       sequence and sequence.skip(done))
+
+    if config.tolerance is None:
+        render_part(config.samples, seed)
+        return None
+
+    batch_samples = max(1, config.samples // ADAPTIVE_BATCHES)
+    previous = log_density(histogram.hits)
+    done, batch, error = 0, 0, float("inf")
+    while done < config.samples:
+        batch_size = min(batch_samples, config.samples - done)
+        render_part(batch_size, seed + batch, done)
+        done += batch_size
+        batch += 1
+        current = log_density(histogram.hits)
+        error = float(np.mean(np.abs(current - previous)))
+        previous = current
+        if batch >= 2 and error < config.tolerance:
+            return AdaptiveResult(done, error, True)
+    return AdaptiveResult(done, error, False)
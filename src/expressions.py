@@ -0,0 +1,187 @@
+"""
+Модуль трансформаций, заданных формулами.
+
+Формулы новых координат — выражения от x, y, r (расстояние до начала координат), theta (угол)
+и именованных параметров, например "x * sin(r * r) - y * cos(r * r)". Выражение разбирается модулем
+ast один раз; допускаются только числа, арифметические операции и функции из списка FUNCTIONS,
+поэтому в конфигурации нельзя выполнить произвольный код. Обе формулы компилируются в одну
+функцию NumPy над массивами координат: одинаковые подвыражения (в том числе r и theta, общие
+для обеих формул) вычисляются один раз.
+"""
+import ast
+import math
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+# Допустимые функции: имя в формуле -> (универсальная функция NumPy, число аргументов)
+FUNCTIONS = {
+    "sin": ("sin", 1), "cos": ("cos", 1), "tan": ("tan", 1),
+    "asin": ("arcsin", 1), "acos": ("arccos", 1), "atan": ("arctan", 1), "atan2": ("arctan2", 2),
+    "arcsin": ("arcsin", 1), "arccos": ("arccos", 1), "arctan": ("arctan", 1), "arctan2": ("arctan2", 2),
+    "sinh": ("sinh", 1), "cosh": ("cosh", 1), "tanh": ("tanh", 1),
+    "sqrt": ("sqrt", 1), "exp": ("exp", 1), "log": ("log", 1), "abs": ("absolute", 1), "sign": ("sign", 1),
+    "floor": ("floor", 1), "ceil": ("ceil", 1), "hypot": ("hypot", 2),
+    "min": ("minimum", 2), "max": ("maximum", 2),
+}
+CONSTANTS = {"pi": np.pi, "e": np.e}
+COORDINATES = ("x", "y")
+# Производные переменные раскрываются в выражения от x и y и участвуют в поиске общих подвыражений
+DERIVED = {"r": "sqrt(x * x + y * y)", "theta": "atan2(y, x)"}
+RESERVED_NAMES = set(FUNCTIONS) | set(CONSTANTS) | set(COORDINATES) | set(DERIVED)
+
+_BINARY_OPERATORS = {ast.Add: "add", ast.Sub: "subtract", ast.Mult: "multiply", ast.Div: "true_divide",
+                     ast.Pow: "power", ast.Mod: "remainder"}
+_COMMUTATIVE = {"add", "multiply"}
+_UNARY_OPERATORS = {ast.USub: "negative", ast.UAdd: "positive"}
+
+
+class ExpressionError(ValueError):
+    """
+    Исключение, возникающее, если формула некорректна или содержит недопустимые конструкции.
+    """
+
+
+class CompiledVariation(NamedTuple):
+    """
+    Скомпилированная пара формул.
+
+    Атрибуты:
+        function (Callable): Функция function(x, y, **params) -> (new_x, new_y); результаты могут быть
+                             скалярами, если формула не зависит от координат.
+        source (str): Исходный текст функции.
+        operations (int): Число вычисляемых операций после исключения общих подвыражений.
+    """
+    function: Callable
+    source: str
+    operations: int
+
+
+class _Compiler:
+    """
+    Переводит проверенное дерево выражения в последовательность вызовов универсальных функций NumPy.
+
+    Каждая операция записывается в канонической форме от уже вычисленных операндов (имён и чисел),
+    а для сложения и умножения операнды упорядочиваются, поэтому одинаковые подвыражения,
+    в том числе записанные в разном порядке, получают одну временную переменную.
+    """
+    def __init__(self, params: tuple[str, ...]):
+        self.params = set(params)
+        self.operations: list[tuple[str, str, tuple[str, ...]]] = []
+        self.names: dict[tuple[str, tuple[str, ...]], str] = {}
+        self.arrays: set[str] = set(COORDINATES)
+
+    def compile(self, text: str) -> str:
+        if not isinstance(text, str):
+            raise ExpressionError(f"Формула должна быть строкой, получено {text!r}.")
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ExpressionError(f"Синтаксическая ошибка в формуле {text!r}: {e.msg}") from None
+        return self._emit(tree.body, text)
+
+    def source(self, signature: str, results: tuple[str, ...]) -> str:
+        """
+        Возвращает текст функции. Массив временной переменной, которая больше не используется,
+        отдаётся под результат операции (аргумент out), поэтому число одновременно живых
+        массивов не превышает числа нужных в дальнейшем подвыражений.
+        """
+        last_use = {}
+        for index, (_, _, operands) in enumerate(self.operations):
+            for operand in operands:
+                last_use[operand] = index
+        lines = [f"def variation({signature}):"]
+        for index, (name, function, operands) in enumerate(self.operations):
+            free = [operand for operand in operands if operand.startswith("_t") and operand in self.arrays
+                    and last_use[operand] == index and operand not in results]
+            out = f", out={free[0]}" if free and name in self.arrays else ""
+            lines.append(f"    {name} = np.{function}({', '.join(operands)}{out})")
+        lines.append(f"    return {', '.join(results)}")
+        return "\n".join(lines)
+
+    def _assign(self, function: str, operands: tuple[str, ...]) -> str:
+        key = (function, operands)
+        if key not in self.names:
+            name = f"_t{len(self.names)}"
+            self.names[key] = name
+            self.operations.append((name, function, operands))
+            if any(operand in self.arrays for operand in operands):
+                self.arrays.add(name)
+        return self.names[key]
+
+    def _emit(self, node: ast.AST, text: str) -> str:
+        if isinstance(node, ast.Constant):
+            if type(node.value) not in (int, float):
+                raise ExpressionError(f"Недопустимая константа {node.value!r} в формуле {text!r}.")
+            # Целые числа записываются как float: np.power не возводит целые в отрицательную степень
+            try:
+                value = float(node.value)
+            except OverflowError:
+                value = math.inf
+            if not math.isfinite(value):
+                raise ExpressionError(f"Константа вне диапазона float в формуле {text!r}.")
+            return repr(value)
+        if isinstance(node, ast.Name):
+            if node.id in COORDINATES or node.id in self.params:
+                return node.id
+            if node.id in CONSTANTS:
+                return repr(CONSTANTS[node.id])
+            if node.id in DERIVED:
+                return self.compile(DERIVED[node.id])
+            raise ExpressionError(f"Неизвестное имя {node.id!r} в формуле {text!r}.")
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            function = _BINARY_OPERATORS[type(node.op)]
+            operands = (self._emit(node.left, text), self._emit(node.right, text))
+            if function in _COMMUTATIVE:
+                operands = tuple(sorted(operands))
+            return self._assign(function, operands)
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            return self._assign(_UNARY_OPERATORS[type(node.op)], (self._emit(node.operand, text),))
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in FUNCTIONS:
+            function, arity = FUNCTIONS[node.func.id]
+            if node.keywords or len(node.args) != arity:
+                raise ExpressionError(f"Функция {node.func.id} принимает аргументов: {arity} (формула {text!r}).")
+            return self._assign(function, tuple(self._emit(arg, text) for arg in node.args))
+        raise ExpressionError(f"Недопустимая конструкция {ast.unparse(node)!r} в формуле {text!r}.")
+
+
+def check_param_names(names) -> None:
+    """
+    Проверяет, что имена параметров формулы допустимы.
+
+    Exceptions:
+        ExpressionError: Если имя не является идентификатором, начинается с подчёркивания
+                         или совпадает с именем координаты, функции или константы.
+    """
+    for name in names:
+        if not isinstance(name, str) or not name.isidentifier() or name.startswith("_") or name in RESERVED_NAMES:
+            raise ExpressionError(f"Недопустимое имя параметра {name!r}.")
+
+
+@lru_cache(maxsize=None)
+def compile_variation(x_expression: str, y_expression: str, params: tuple[str, ...] = ()) -> CompiledVariation:
+    """
+    Разбирает и компилирует формулы новых координат в одну функцию NumPy.
+
+    Результат кэшируется, поэтому повторные вызовы с теми же формулами (например, в каждом
+    рабочем процессе пула после передачи трансформации) не разбирают формулы заново.
+
+    Параметры:
+        x_expression (str): Формула новой координаты X.
+        y_expression (str): Формула новой координаты Y.
+        params (tuple[str, ...]): Имена параметров формул.
+
+    Returns:
+        CompiledVariation: Скомпилированная функция, её исходный текст и число операций.
+
+    Exceptions:
+        ExpressionError: Если формула некорректна или содержит недопустимые конструкции.
+    """
+    check_param_names(params)
+    compiler = _Compiler(params)
+    results = (compiler.compile(x_expression), compiler.compile(y_expression))
+    source = compiler.source(", ".join(COORDINATES + params), results)
+    namespace = {"np": np}
+    exec(compile(source, "<variation>", "exec"), namespace)
+    return CompiledVariation(namespace["variation"], source, len(compiler.operations))
@@ -0,0 +1,93 @@
+"""
+Модуль фильтрации гистограммы попаданий: оценка плотности и суперсэмплинг.
+
+Оценка плотности (density estimation) размывает каждый пиксель ядром Гаусса, ширина которого
+зависит от числа попаданий: одиночные попадания в разреженных областях размываются сильно,
+а плотные области почти не меняются. Ширины ядер квантуются на несколько уровней, и каждый уровень
+размывается свёрткой через БПФ, поэтому стоимость не зависит от радиуса ядра.
+"""
+import numpy as np
+
+from src.histogram import downsample_hits
+
+# Число уровней, на которые квантуются ширины ядер
+DE_LEVELS = 8
+
+# Ядра уже этого значения (в пикселях) не размывают изображение
+MIN_BLUR_SIGMA = 0.3
+
+
+def gaussian_blur(values: np.ndarray, sigma: float) -> np.ndarray:
+    """
+    Размывает массив ядром Гаусса через БПФ.
+
+    Массив дополняется нулями на 3 sigma с каждой стороны, поэтому размытие не заворачивается
+    через края изображения.
+
+    Параметры:
+        values (np.ndarray): Двумерный массив.
+        sigma (float): Стандартное отклонение ядра в пикселях.
+
+    Returns:
+        np.ndarray: Размытый массив той же формы.
+    """
+    if sigma < MIN_BLUR_SIGMA:
+        return values.astype(np.float64)
+    pad = int(np.ceil(3 * sigma))
+    padded = np.pad(values.astype(np.float64), pad)
+    frequency_y = np.fft.fftfreq(padded.shape[0])[:, None]
+    frequency_x = np.fft.rfftfreq(padded.shape[1])[None, :]
+    transfer = np.exp(-2 * np.pi ** 2 * sigma ** 2 * (frequency_y ** 2 + frequency_x ** 2))
+    blurred = np.fft.irfft2(np.fft.rfft2(padded) * transfer, s=padded.shape)
+    return blurred[pad:pad + values.shape[0], pad:pad + values.shape[1]]
+
+
+def density_estimation(hits: np.ndarray, max_radius: float, min_radius: float = 0.0, curve: float = 0.4,
+                       levels: int = DE_LEVELS) -> np.ndarray:
+    """
+    Размывает гистограмму ядром, ширина которого убывает с числом попаданий в пикселе.
+
+    Ширина ядра пикселя: max(min_radius, max_radius / (hits + 1) ** curve). Попадания каждого
+    пикселя распределяются его ядром, поэтому суммарное число попаданий сохраняется (кроме ушедших за края).
+
+    Параметры:
+        hits (np.ndarray): Массив формы (height, width) с числом попаданий.
+        max_radius (float): Ширина ядра для пикселя с нулём попаданий.
+        min_radius (float): Минимальная ширина ядра (по умолчанию 0).
+        curve (float): Скорость убывания ширины ядра с ростом числа попаданий (по умолчанию 0.4).
+        levels (int): Число уровней квантования ширины ядра (по умолчанию DE_LEVELS).
+
+    Returns:
+        np.ndarray: Размытый массив типа float64.
+    """
+    hits = hits.astype(np.float64)
+    sigma = np.maximum(min_radius, max_radius / (hits + 1) ** curve)
+    radii = np.linspace(min_radius, max_radius, levels)
+    step = (max_radius - min_radius) / (levels - 1) if levels > 1 and max_radius > min_radius else 1.0
+    level = np.clip(np.rint((sigma - min_radius) / step), 0, levels - 1).astype(np.int64)
+
+    result = np.zeros_like(hits)
+    for index, radius in enumerate(radii):
+        layer = np.where((level == index) & (hits > 0), hits, 0.0)
+        if layer.any():
+            result += gaussian_blur(layer, radius)
+    return result
+
+
+def filter_hits(hits: np.ndarray, supersample: int = 1, de_radius: float = 0.0, de_curve: float = 0.4) -> np.ndarray:
+    """
+    Применяет оценку плотности к суперсэмплированной гистограмме и уменьшает её до выходного размера.
+
+    Параметры:
+        hits (np.ndarray): Массив попаданий, отрендеренный в `supersample` раз крупнее выходного.
+        supersample (int): Коэффициент суперсэмплинга (по умолчанию 1).
+        de_radius (float): Максимальная ширина ядра оценки плотности в пикселях выходного
+                           изображения; 0 отключает оценку плотности (по умолчанию 0).
+        de_curve (float): Скорость убывания ширины ядра (по умолчанию 0.4).
+
+    Returns:
+        np.ndarray: Массив средней плотности попаданий выходного размера типа float64.
+    """
+    if de_radius > 0:
+        hits = density_estimation(hits, de_radius * supersample, curve=de_curve)
+    return downsample_hits(hits.astype(np.float64), supersample) / supersample ** 2
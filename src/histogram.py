@@ -0,0 +1,120 @@
+"""
+Модуль для работы с гистограммой попаданий фрактального изображения в виде массивов NumPy.
+"""
+import numpy as np
+
+from src.domain import FractalImage
+
+
+def hit_counts(canvas: FractalImage) -> np.ndarray:
+    """
+    Извлекает число попаданий всех пикселей холста в двумерный массив.
+
+    Параметры:
+        canvas (FractalImage): Холст, из которого извлекаются данные.
+
+    Returns:
+        np.ndarray: Массив формы (height, width) с числом попаданий в каждый пиксель.
+    """
+    return np.array([[pixel.hit_count for pixel in row] for row in canvas.data], dtype=np.int64)
+
+
+def log_density(hits: np.ndarray) -> np.ndarray:
+    """
+    Вычисляет нормализованную логарифмическую плотность попаданий.
+
+    Значения лежат в диапазоне [0, 1]: log1p(hits) / log1p(max(hits)).
+
+    Параметры:
+        hits (np.ndarray): Массив числа попаданий.
+
+    Returns:
+        np.ndarray: Массив нормализованной логарифмической плотности.
+    """
+    max_hits = hits.max() if hits.size else 0
+    if max_hits == 0:
+        return np.zeros(hits.shape, dtype=np.float64)
+    return np.log1p(hits) / np.log1p(max_hits)
+
+
+def add_hits(canvas: FractalImage, hits: np.ndarray):
+    """
+    Добавляет попадания из массива на холст, затрагивая только ненулевые пиксели.
+
+    Цвета пикселей накапливаются так же, как при рендеринге: +10 к красному и +5 к зелёному
+    и синему за каждое попадание, с ограничением сверху значением 255.
+
+    Параметры:
+        canvas (FractalImage): Холст, на который добавляются попадания.
+        hits (np.ndarray): Массив формы (height, width) с числом попаданий.
+
+    Returns:
+        None. Изменяет состояние объекта `canvas` напрямую.
+    """
+    ys, xs = np.nonzero(hits)
+    for y, x, count in zip(ys.tolist(), xs.tolist(), hits[ys, xs].astype(np.int64).tolist()):
+        pixel = canvas.data[y][x]
+        pixel.hit_count += count
+        pixel.r = min(255, pixel.r + 10 * count)
+        pixel.g = min(255, pixel.g + 5 * count)
+        pixel.b = min(255, pixel.b + 5 * count)
+
+
+def clear_hits(canvas: FractalImage, hits: np.ndarray):
+    """
+    Обнуляет пиксели холста, отмеченные ненулевыми значениями в массиве попаданий.
+
+    Позволяет переиспользовать холст после извлечения из него гистограммы, не проходя
+    по всем пикселям.
+
+    Параметры:
+        canvas (FractalImage): Холст, пиксели которого обнуляются.
+        hits (np.ndarray): Массив формы (height, width), ненулевые элементы которого задают пиксели.
+
+    Returns:
+        None. Изменяет состояние объекта `canvas` напрямую.
+    """
+    ys, xs = np.nonzero(hits)
+    for y, x in zip(ys.tolist(), xs.tolist()):
+        pixel = canvas.data[y][x]
+        pixel.r = pixel.g = pixel.b = pixel.hit_count = 0
+
+
+def downsample_hits(hits: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Уменьшает массив попаданий в `factor` раз по каждой оси, суммируя блоки factor × factor.
+
+    Если размер не делится на `factor`, массив дополняется нулями.
+
+    Параметры:
+        hits (np.ndarray): Массив формы (height, width).
+        factor (int): Коэффициент уменьшения.
+
+    Returns:
+        np.ndarray: Массив формы (ceil(height / factor), ceil(width / factor)).
+    """
+    if factor == 1:
+        return hits
+    height, width = hits.shape
+    pad_y, pad_x = -height % factor, -width % factor
+    if pad_y or pad_x:
+        hits = np.pad(hits, ((0, pad_y), (0, pad_x)))
+    new_height, new_width = hits.shape[0] // factor, hits.shape[1] // factor
+    return hits.reshape(new_height, factor, new_width, factor).sum(axis=(1, 3))
+
+
+def build_pyramid(hits: np.ndarray, levels: int) -> list[np.ndarray]:
+    """
+    Строит пирамиду массивов попаданий: каждый следующий уровень вдвое меньше предыдущего.
+
+    Параметры:
+        hits (np.ndarray): Массив попаданий полного разрешения (уровень 0).
+        levels (int): Число уровней после нулевого.
+
+    Returns:
+        list[np.ndarray]: Уровни пирамиды от полного разрешения к наименьшему.
+    """
+    pyramid = [hits]
+    for _ in range(levels):
+        pyramid.append(downsample_hits(pyramid[-1], 2))
+    return pyramid
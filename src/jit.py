@@ -0,0 +1,200 @@
+"""
+Модуль JIT-компилируемого ядра рендеринга.
+
+Если установлен Numba, цикл итераций, поворотов симметрии и накопления попаданий для всех орбит
+компилируется в одно машинное ядро: точки не покидают регистров процессора, а временные массивы,
+которые создаёт NumPy на каждую поэлементную операцию, не нужны. Орбиты делятся на порции,
+порции обрабатываются параллельно, и каждая накапливает попадания в собственную гистограмму,
+поэтому потокам не нужна синхронизация.
+
+Без Numba функции ядра остаются обычными функциями Python, а JIT_AVAILABLE равен False —
+src.engine в этом случае использует векторизованный движок NumPy.
+"""
+import math
+
+import numpy as np
+
+from src.transformations import (
+    CurlTransformation,
+    DiamondTransformation,
+    DiscTransformation,
+    HandkerchiefTransformation,
+    HeartTransformation,
+    HyperbolicTransformation,
+    PDJTransformation,
+    PolarTransformation,
+    PopcornTransformation,
+    SinusoidalTransformation,
+    SphericalTransformation,
+    SpiralTransformation,
+    SwirlTransformation,
+)
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT_AVAILABLE = numba is not None
+
+if numba is not None:
+    # Слой потоков TBB зависает при завершении процесса, который запускал ядро и затем создавал
+    # рабочие процессы через fork; workqueue безопасен для fork, а ядро вызывается из одного потока
+    numba.config.THREADING_LAYER = "workqueue"
+
+# Трансформации, поддерживаемые ядром, и их параметры; номер вида — позиция в словаре
+KERNEL_VARIATIONS = {
+    SinusoidalTransformation: ("scale_x", "scale_y"),
+    SphericalTransformation: (),
+    SwirlTransformation: (),
+    PolarTransformation: (),
+    HandkerchiefTransformation: (),
+    HeartTransformation: (),
+    DiscTransformation: (),
+    SpiralTransformation: (),
+    HyperbolicTransformation: (),
+    DiamondTransformation: ("scale",),
+    PopcornTransformation: ("c", "d"),
+    PDJTransformation: ("a", "b", "c", "d"),
+    CurlTransformation: ("p", "q"),
+}
+
+MAX_PARAMS = 4
+
+
+def _jit(**options):
+    if numba is None:
+        return lambda func: func
+    return numba.njit(cache=True, **options)
+
+
+prange = numba.prange if numba is not None else range
+
+
+def supports(variations) -> bool:
+    """
+    Проверяет, что все трансформации поддерживаются ядром.
+    """
+    return all(type(variation) in KERNEL_VARIATIONS for variation in variations)
+
+
+def encode_variations(variations) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Кодирует трансформации для ядра: номера видов, таблицу параметров и амплитуды отклонений.
+
+    Параметры:
+        variations (list[Transformation]): Трансформации, поддерживаемые ядром.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: Номера видов формы (n,), параметры формы (n, MAX_PARAMS)
+                                                   и амплитуды отклонений (jitter) формы (n,).
+
+    Exceptions:
+        ValueError: Если трансформация не поддерживается ядром.
+    """
+    kinds = np.zeros(len(variations), dtype=np.int64)
+    params = np.zeros((len(variations), MAX_PARAMS), dtype=np.float64)
+    jitters = np.array([variation.jitter for variation in variations], dtype=np.float64)
+    kernel_types = list(KERNEL_VARIATIONS)
+    for index, variation in enumerate(variations):
+        if type(variation) not in KERNEL_VARIATIONS:
+            raise ValueError(f"Трансформация {type(variation).__name__} не поддерживается JIT-ядром.")
+        kinds[index] = kernel_types.index(type(variation))
+        for position, name in enumerate(KERNEL_VARIATIONS[type(variation)]):
+            params[index, position] = getattr(variation, name)
+    return kinds, params, jitters
+
+
+@_jit()
+def _variation(kind, params, x, y):
+    if kind == 0:
+        return math.sin(params[0] * x), math.sin(params[1] * y)
+    if kind == 1:
+        r2 = x * x + y * y
+        return (x / r2, y / r2) if r2 != 0 else (0.0, 0.0)
+    if kind == 2:
+        r2 = x * x + y * y
+        sin_r2, cos_r2 = math.sin(r2), math.cos(r2)
+        return x * sin_r2 - y * cos_r2, x * cos_r2 + y * sin_r2
+    r = math.sqrt(x * x + y * y)
+    theta = math.atan2(y, x)
+    if kind == 3:
+        return theta / math.pi, r - 1.0
+    if kind == 4:
+        return r * math.sin(theta + r), r * math.cos(theta - r)
+    if kind == 5:
+        return r * math.sin(theta * r), -r * math.cos(theta * r)
+    if kind == 6:
+        return theta / math.pi * math.sin(math.pi * r), theta / math.pi * math.cos(math.pi * r)
+    if kind == 7:
+        if r == 0:
+            return 0.0, 0.0
+        return (math.cos(theta) + math.sin(r)) / r, (math.sin(theta) - math.cos(r)) / r
+    if kind == 8:
+        return (math.sin(theta) / r if r != 0 else 0.0), math.cos(theta) * r
+    if kind == 9:
+        return params[0] * math.sin(theta) * math.cos(r), params[0] * math.cos(theta) * math.sin(r)
+    if kind == 10:
+        return x + params[0] * math.sin(math.tan(3 * y)), y + params[1] * math.sin(math.tan(3 * x))
+    if kind == 11:
+        return (math.sin(params[0] * y) - math.cos(params[1] * x),
+                math.sin(params[2] * x) - math.cos(params[3] * y))
+    denom = x * x + y * y + 1e-6
+    return (x + params[0] * y) / denom, (y - params[1] * x) / denom
+
+
+@_jit(parallel=True)
+def chaos_kernel(xs, ys, kinds, params, jitters, iterations, cos_rot, sin_rot, world, width, height, seed,
+                 histograms):
+    """
+    Итерирует орбиты, начинающиеся в точках (xs, ys), и накапливает попадания.
+
+    Орбиты делятся на histograms.shape[0] порций; порция с номером i обрабатывается независимо,
+    выбирает трансформации и отклонения генератором с зерном seed + i и пишет в гистограмму histograms[i].
+    Состояние орбиты хранится в типе начальных точек: после каждой итерации координаты
+    округляются до float32 или float64, как в векторизованном движке.
+
+    Параметры:
+        xs, ys (np.ndarray): Начальные точки орбит.
+        kinds, params, jitters (np.ndarray): Закодированные трансформации (см. encode_variations).
+        iterations (int): Количество итераций для каждой точки.
+        cos_rot, sin_rot (np.ndarray): Косинусы и синусы углов симметрии.
+        world (np.ndarray): Область мира (x, y, width, height).
+        width, height (int): Размер холста.
+        seed (int): Базовое зерно генератора выбора трансформаций.
+        histograms (np.ndarray): Гистограммы порций формы (порции, height * width).
+    """
+    chunks = histograms.shape[0]
+    count = xs.shape[0]
+    for chunk in prange(chunks):
+        np.random.seed(seed + chunk)
+        histogram = histograms[chunk]
+        state = np.empty(2, dtype=xs.dtype)
+        for i in range(chunk * count // chunks, (chunk + 1) * count // chunks):
+            x = xs[i]
+            y = ys[i]
+            for _ in range(iterations):
+                k = np.random.randint(0, kinds.shape[0]) if kinds.shape[0] > 1 else 0
+                vx, vy = _variation(kinds[k], params[k], x, y)
+                if jitters[k] != 0.0:
+                    vx += jitters[k] * (2.0 * np.random.random() - 1.0)
+                    vy += jitters[k] * (2.0 * np.random.random() - 1.0)
+                state[0] = vx
+                state[1] = vy
+                x = state[0]
+                y = state[1]
+                for s in range(cos_rot.shape[0]):
+                    xr = x * cos_rot[s] - y * sin_rot[s]
+                    yr = x * sin_rot[s] + y * cos_rot[s]
+                    if world[0] <= xr < world[0] + world[2] and world[1] <= yr < world[1] + world[3]:
+                        px = int((xr - world[0]) / world[2] * width)
+                        py = int((yr - world[1]) / world[3] * height)
+                        if 0 <= px < width and 0 <= py < height:
+                            histogram[py * width + px] += 1
+
+
+def thread_count() -> int:
+    """
+    Возвращает число потоков, на которые делятся орбиты ядра.
+    """
+    return numba.get_num_threads() if numba is not None else 1
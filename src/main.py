@@ -2,14 +2,22 @@ import logging
 import platform
 from pathlib import Path
 import time
-from multiprocessing import Pool
-from functools import partial
 
+from src.affinity import describe_placement
+from src.autotune import load_profile
 from src.cli import parse_args
 from src.config_utils import load_config_from_file, save_config_to_file, get_transformation_config
 from src.domain import FractalImage
+from src.engine import (DEFAULT_BATCH_SIZE, TILE_BYTES, EngineOptions, Histogram, jit_available,
+                        render_config_batched)
+from src.filters import filter_hits
+from src.histogram import add_hits, hit_counts
 from src.processors import LogGammaCorrectionProcessor
-from src.renderer import render, render_single, merge_canvases
+from src.planner import MemoryBudgetError, plan_render
+from src.pool import RenderPool
+from src.progress import ProgressMonitor
+from src.renderer import AdaptiveResult, render_config, render_progressive
+from src.sampling import start_sequence
 from src.utils import ImageUtils
 
 logging.basicConfig()
@@ -17,12 +25,120 @@ logging.getLogger().setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def render_with_previews(canvas, config, processor, preview_dir: Path, preview_every: int,
+                         preview_seconds: float | None, first_frame: int = 0) -> tuple[int, AdaptiveResult | None]:
+    """
+    Рендерит конфигурацию прогрессивно, сохраняя кадры предпросмотра в каталог.
+
+    Если в конфигурации задан допуск, рендеринг останавливается после сходимости, как в адаптивном режиме.
+
+    Параметры:
+        canvas (FractalImage): Холст, на котором происходит рендеринг.
+        config (TransformationConfig): Конфигурация трансформации.
+        processor (LogGammaCorrectionProcessor): Процессор для окрашивания кадров.
+        preview_dir (Path): Каталог для кадров.
+        preview_every (int): Сохранять кадр каждые N пакетов.
+        preview_seconds (float | None): Сохранять кадр не реже, чем раз в T секунд.
+        first_frame (int): Номер первого кадра.
+
+    Returns:
+        tuple[int, AdaptiveResult | None]: Номер, с которого следует нумеровать следующие кадры,
+                                           и результат адаптивного рендеринга (None, если допуск не задан).
+    """
+    preview_dir.mkdir(parents=True, exist_ok=True)
+    frame = first_frame
+    result = None
+    for preview in render_progressive(canvas, config.world, [config.transformation], config.samples,
+                                      config.iterations, seed=42, processor=processor, symmetry=config.symmetry,
+                                      preview_every=preview_every, preview_seconds=preview_seconds,
+                                      tolerance=config.tolerance, sequence=start_sequence(config.sampling, 42)):
+        ImageUtils.save_array(preview.image, preview_dir / f"preview_{frame:04d}.png")
+        frame += 1
+        if config.tolerance is not None:
+            result = AdaptiveResult(preview.samples, preview.error,
+                                    preview.samples < config.samples or preview.error < config.tolerance)
+    return frame, result
+
+
+def report_adaptive(config, result):
+    """
+    Выводит фактическое количество сэмплов и оценку ошибки адаптивного рендеринга конфигурации.
+
+    Параметры:
+        config (TransformationConfig): Конфигурация трансформации.
+        result (AdaptiveResult | None): Результат адаптивного рендеринга; None — ничего не выводится.
+    """
+    if result is not None:
+        print(f"{config.transformation.__class__.__name__}: адаптивный режим, {result.samples} сэмплов, "
+              f"оценка ошибки {result.error:.2e}")
+
+
+def save_rendered(canvas, processor, output_path: Path, supersample: int = 1, de_radius: float = 0.0):
+    """
+    Обрабатывает и сохраняет отрендеренный холст, применяя оценку плотности и суперсэмплинг.
+
+    Параметры:
+        canvas (FractalImage): Холст, отрендеренный в `supersample` раз крупнее выходного изображения.
+        processor (LogGammaCorrectionProcessor): Процессор для окрашивания изображения.
+        output_path (Path): Путь к файлу результата.
+        supersample (int): Коэффициент суперсэмплинга (по умолчанию 1).
+        de_radius (float): Максимальная ширина ядра оценки плотности; 0 отключает фильтр (по умолчанию 0).
+    """
+    if supersample == 1 and de_radius <= 0:
+        ImageUtils.save_with_processing(canvas, processor, output_path)
+        return
+    hits = filter_hits(hit_counts(canvas), supersample, de_radius)
+    ImageUtils.save_array(processor.tone_map(hits), output_path)
+
+
+def plan_memory(args, engine: str, render_width: int, render_height: int, workers: int):
+    """
+    Планирует рендеринг в пределах лимита памяти и выводит план.
+
+    Параметры:
+        args (argparse.Namespace): Аргументы командной строки.
+        engine (str): Движок рендеринга.
+        render_width (int): Ширина холста рендеринга.
+        render_height (int): Высота холста рендеринга.
+        workers (int): Запрошенное число рабочих процессов (0 — рендеринг в основном процессе).
+
+    Returns:
+        MemoryPlan | None: План рендеринга или None, если рендеринг не помещается в лимит.
+    """
+    try:
+        plan = plan_render(render_width, render_height, workers, engine, args.accumulator, args.memory_limit)
+    except MemoryBudgetError as e:
+        print(f"Ошибка: {e}")
+        return None
+    print(plan.describe())
+    if plan.accumulator != args.accumulator:
+        print(f"Тип счётчиков заменён с {args.accumulator} на {plan.accumulator}, чтобы уложиться в лимит памяти.")
+    if workers and plan.workers != workers:
+        if plan.workers:
+            print(f"Число процессов уменьшено с {workers} до {plan.workers}, чтобы уложиться в лимит памяти.")
+        else:
+            print("Отдельные гистограммы процессов не помещаются в лимит памяти, "
+                  "используется общая гистограмма в основном процессе.")
+    return plan
+
+
 def main() -> None:
     args = parse_args()
 
     logger.info(platform.python_version())
 
+    # Параметры, не заданные в командной строке, берутся из профиля машины (src.autotune)
+    profile = None if args.no_profile else load_profile(args.profile)
+    if profile is not None:
+        print(profile.describe())
+    engine = args.engine or (profile.engine if profile else "python")
+    batch_size = args.batch_size or (profile.batch_size if profile else DEFAULT_BATCH_SIZE)
+    tile_bytes = profile.tile_bytes if profile else TILE_BYTES
+    tile_threads = args.tile_threads or (profile.tile_threads if profile else 1)
+
     width, height = args.width, args.height
+    # Холст накопления рендерится в supersample раз крупнее выходного изображения
+    render_width, render_height = width * args.supersample, height * args.supersample
 
     # Выбор источника конфигурации
     transformation_configs = []
@@ -36,6 +152,35 @@ def main() -> None:
             config = get_transformation_config()
             transformation_configs.append(config)
 
+    if args.tolerance is not None:
+        transformation_configs = [config._replace(tolerance=args.tolerance) for config in transformation_configs]
+    if args.sampling is not None:
+        transformation_configs = [config._replace(sampling=args.sampling) for config in transformation_configs]
+
+    engine_options = None
+    if engine in ["numpy", "jit"]:
+        if args.preview_dir and args.mode in ["single", "compare"]:
+            print("Ошибка: кадры предпросмотра (--preview_dir) поддерживаются только движком python.")
+            return
+        if engine == "jit" and not jit_available():
+            print("Numba не установлен, вместо движка jit используется движок numpy.")
+        engine_options = EngineOptions(precision=args.precision, accumulator=args.accumulator, backend=engine,
+                                       batch_size=batch_size, tile_threads=tile_threads,
+                                       tile_bytes=tile_bytes)
+
+    # Проверка памяти до вопросов о параметрах обработки, чтобы не запускать заведомо неисполнимый рендеринг
+    if args.mode in ["single", "compare"] and plan_memory(args, engine, render_width, render_height, 0) is None:
+        return
+    if args.mode in ["multi", "compare"]:
+        num_threads = args.num_threads if args.num_threads is not None else (
+            (profile.workers if profile else None) or int(input("Введите количество потоков: ")))
+        if num_threads < 0:
+            print("Ошибка: число потоков не может быть отрицательным (0 — рендеринг в основном процессе).")
+            return
+        plan = plan_memory(args, engine, render_width, render_height, num_threads)
+        if plan is None:
+            return
+
     print("\n=== Настройка параметров обработки изображения ===")
     gamma = float(input("Параметр гамма-коррекции (по умолчанию: 2.0): ") or 2.0)
     scale = float(input("Масштабный коэффициент (по умолчанию: 1.0): ") or 1.0)
@@ -48,35 +193,58 @@ def main() -> None:
 
     if args.mode in ["single", "compare"]:
         start_time = time.time()
-        canvas_single_thread = FractalImage(width, height)
+        canvas_single_thread = FractalImage(render_width, render_height)
+        histogram = (Histogram(render_width, render_height, args.accumulator, tile_threads, tile_bytes)
+                     if engine_options else None)
+        preview_frame = 0
         for config in transformation_configs:
-            render(
-                canvas=canvas_single_thread,
-                world=config.world,
-                variations=[config.transformation],
-                samples=config.samples,
-                iter_per_sample=config.iterations,
-                seed=42,
-                symmetry=config.symmetry,
-            )
+            if histogram is not None:
+                result = render_config_batched(histogram, config, options=engine_options)
+            elif args.preview_dir:
+                preview_frame, result = render_with_previews(canvas_single_thread, config, processor,
+                                                             Path(args.preview_dir), args.preview_every,
+                                                             args.preview_seconds, preview_frame)
+            else:
+                result = render_config(canvas_single_thread, config)
+            report_adaptive(config, result)
+        if histogram is not None:
+            add_hits(canvas_single_thread, histogram.hits)
         single_thread_time = time.time() - start_time
         output_path_single = Path("fractal_single.png")
-        ImageUtils.save_with_processing(canvas_single_thread, processor, output_path_single)
+        save_rendered(canvas_single_thread, processor, output_path_single, args.supersample, args.de_radius)
         print(f"Однопоточная версия: {single_thread_time:.2f} секунд. Сохранено: {output_path_single}")
 
     if args.mode in ["multi", "compare"]:
-        num_threads = args.num_threads or int(input("Введите количество потоков: "))
+        if engine_options:
+            engine_options = engine_options._replace(accumulator=plan.accumulator)
         start_time = time.time()
-        with Pool(processes=num_threads) as pool:
-            render_partial = partial(render_single, width=width, height=height)
-            canvases_multi_process = pool.map(render_partial, transformation_configs,
-                                              chunksize=len(transformation_configs) // num_threads or 1)
-
-        canvas_multi_process = FractalImage(width, height)
-        merge_canvases(canvas_multi_process, canvases_multi_process)
+        if plan.workers:
+            with RenderPool(processes=plan.workers, start_method=args.start_method, affinity=args.affinity) as pool:
+                if args.affinity != "none":
+                    print(describe_placement(pool.placement))
+                total_samples = sum(config.samples for config in transformation_configs)
+                interval = args.progress_interval
+                with ProgressMonitor(pool.progress, total_samples, interval=interval if interval > 0 else 1.0,
+                                     metrics_file=args.metrics_file, show=interval > 0):
+                    hits, results = pool.render_hits_with_results(transformation_configs, render_width,
+                                                                  render_height, engine_options)
+        elif engine_options is None:
+            # Движок python рендерит в основном процессе прямо в изображение
+            canvas = FractalImage(render_width, render_height)
+            results = [render_config(canvas, config) for config in transformation_configs]
+            hits = hit_counts(canvas)
+        else:
+            histogram = Histogram(render_width, render_height, plan.accumulator, plan.tile_threads, tile_bytes)
+            results = [render_config_batched(histogram, config, options=engine_options)
+                       for config in transformation_configs]
+            hits = histogram.hits
+        canvas_multi_process = FractalImage(render_width, render_height)
+        add_hits(canvas_multi_process, hits)
         multi_process_time = time.time() - start_time
+        for config, result in zip(transformation_configs, results):
+            report_adaptive(config, result)
         output_path_multi = Path("fractal_multi.png")
-        ImageUtils.save_with_processing(canvas_multi_process, processor, output_path_multi)
+        save_rendered(canvas_multi_process, processor, output_path_multi, args.supersample, args.de_radius)
         print(f"Многопроцессорная версия: {multi_process_time:.2f} секунд. Сохранено: {output_path_multi}")
 
     # Предложение сохранить конфигурацию
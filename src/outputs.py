@@ -0,0 +1,154 @@
+"""
+Модуль получения нескольких изображений из одной гистограммы.
+
+Одну и ту же гистограмму часто нужно сохранить в нескольких вариантах: в полном размере,
+уменьшенной копией для веба, миниатюрой, с другими цветовыми картами. Гистограмма при этом
+не изменяется: пирамида уменьшенных массивов попаданий строится один раз для всех выходов,
+максимум каждого уровня (статистика нормализации) вычисляется один раз, а окрашивание
+и кодирование выходов выполняются параллельно в пуле потоков.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from src.histogram import build_pyramid
+from src.processors import LogGammaCorrectionProcessor, ProcessorPipeline
+
+
+class OutputSpec(NamedTuple):
+    """
+    Описание одного выходного изображения.
+
+    Атрибуты:
+        path (Path): Путь к файлу изображения.
+        width (int | None): Ширина изображения; высота выбирается по пропорциям гистограммы
+                            (по умолчанию None — размер гистограммы).
+        gamma (float): Параметр гамма-коррекции (по умолчанию 2.0).
+        scale (float): Масштаб логарифмической коррекции (по умолчанию 1.0).
+        colormap (str): Название цветовой карты (по умолчанию "inferno").
+        brightness_shift (float): Смещение яркости (по умолчанию 0.1).
+        format (str | None): Формат файла, например "PNG" или "WEBP" (по умолчанию — по расширению пути).
+    """
+    path: Path
+    width: int | None = None
+    gamma: float = 2.0
+    scale: float = 1.0
+    colormap: str = "inferno"
+    brightness_shift: float = 0.1
+    format: str | None = None
+
+
+def output_spec_from_dict(record: dict, base_dir: Path = Path(".")) -> OutputSpec:
+    """
+    Создаёт описание выхода из словаря вида {"output": "out/a.webp", "width": 640,
+    "processor": {"gamma": 2.2, "colormap": "plasma"}, "format": "WEBP"}.
+
+    Параметры:
+        record (dict): Описание выхода.
+        base_dir (Path): Каталог, относительно которого разрешается путь.
+
+    Returns:
+        OutputSpec: Описание выхода.
+
+    Exceptions:
+        ValueError: Если не указан путь к файлу.
+        TypeError: Если параметры обработки некорректны.
+    """
+    if "output" not in record:
+        raise ValueError("В описании выхода не указан путь к файлу (output).")
+    width = record.get("width")
+    return OutputSpec(
+        path=base_dir / record["output"],
+        width=int(width) if width is not None else None,
+        format=record.get("format"),
+        **record.get("processor", {}),
+    )
+
+
+def _target_size(shape: tuple[int, int], width: int | None) -> tuple[int, int]:
+    height, full_width = shape
+    if width is None or width >= full_width:
+        return full_width, height
+    return width, max(1, round(height * width / full_width))
+
+
+def _pyramid_level(shape: tuple[int, int], size: tuple[int, int]) -> int:
+    """
+    Возвращает наименьший уровень пирамиды, который не меньше размера size по обеим осям.
+    """
+    height, width = shape
+    level = 0
+    while -(-width // 2 ** (level + 1)) >= size[0] and -(-height // 2 ** (level + 1)) >= size[1]:
+        level += 1
+    return level
+
+
+def tone_map_outputs(hits: np.ndarray, specs: list[OutputSpec], threads: int | None = None) -> list[Image.Image]:
+    """
+    Окрашивает все выходы по одной гистограмме, не сохраняя их.
+
+    Выход окрашивается на наименьшем подходящем уровне пирамиды и, если его размер не совпадает
+    с уровнем, масштабируется до точного размера фильтром Lanczos.
+
+    Параметры:
+        hits (np.ndarray): Массив формы (height, width) с числом попаданий; не изменяется.
+        specs (list[OutputSpec]): Описания выходов.
+        threads (int | None): Число потоков окрашивания (по умолчанию — по числу выходов).
+
+    Returns:
+        list[Image.Image]: Изображения в порядке описаний.
+    """
+    sizes = [_target_size(hits.shape, spec.width) for spec in specs]
+    levels = [_pyramid_level(hits.shape, size) for size in sizes]
+    pyramid = build_pyramid(hits, max(levels, default=0))
+    maxima = {level: (pyramid[level].max() if pyramid[level].size else 0) for level in set(levels)}
+
+    def tone_map(spec: OutputSpec, size: tuple[int, int], level: int) -> Image.Image:
+        processor = LogGammaCorrectionProcessor(spec.gamma, spec.scale, spec.colormap, spec.brightness_shift)
+        rgb = ProcessorPipeline([processor], threads=1).tone_map(pyramid[level], contexts=[maxima[level]])
+        image = Image.fromarray(rgb)
+        if image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        return image
+
+    with ThreadPoolExecutor(threads or max(1, len(specs))) as executor:
+        return list(executor.map(tone_map, specs, sizes, levels))
+
+
+def save_outputs(images: list[Image.Image], specs: list[OutputSpec], threads: int | None = None) -> list[Path]:
+    """
+    Кодирует и сохраняет окрашенные выходы.
+
+    Параметры:
+        images (list[Image.Image]): Изображения, полученные tone_map_outputs.
+        specs (list[OutputSpec]): Описания выходов в том же порядке.
+        threads (int | None): Число потоков кодирования (по умолчанию — по числу выходов).
+
+    Returns:
+        list[Path]: Пути сохранённых файлов в порядке описаний.
+    """
+    def save(image: Image.Image, spec: OutputSpec) -> Path:
+        spec.path.parent.mkdir(parents=True, exist_ok=True)
+        image.save(spec.path, format=spec.format)
+        return spec.path
+
+    with ThreadPoolExecutor(threads or max(1, len(specs))) as executor:
+        return list(executor.map(save, images, specs))
+
+
+def render_outputs(hits: np.ndarray, specs: list[OutputSpec], threads: int | None = None) -> list[Path]:
+    """
+    Окрашивает и сохраняет все выходы по одной гистограмме.
+
+    Параметры:
+        hits (np.ndarray): Массив формы (height, width) с числом попаданий; не изменяется.
+        specs (list[OutputSpec]): Описания выходов.
+        threads (int | None): Число потоков окрашивания и кодирования (по умолчанию — по числу выходов).
+
+    Returns:
+        list[Path]: Пути сохранённых файлов в порядке описаний.
+    """
+    return save_outputs(tone_map_outputs(hits, specs, threads), specs, threads)
@@ -0,0 +1,244 @@
+"""
+Модуль планирования памяти рендеринга.
+
+Каждый рабочий процесс пула держит собственный холст или гистограмму во всё изображение, а основной
+процесс — суммарный массив попаданий и итоговый холст, поэтому потребление памяти растёт линейно
+с числом процессов. Планировщик оценивает объём памяти на пиксель для выбранного движка и типа
+счётчиков и по лимиту памяти (заданному или доступной памяти системы) выбирает число процессов,
+тип счётчиков и режим: отдельные гистограммы в процессах пула или одна общая гистограмма в основном
+процессе, которую потоки заполняют по плиткам (src.engine.Histogram). Если рендеринг не помещается
+в лимит ни в одном режиме, планировщик отказывает, а не позволяет системе завершить процесс
+по нехватке памяти.
+"""
+import os
+import re
+from typing import NamedTuple
+
+# Оценки памяти на пиксель в байтах (с запасом)
+# Холст FractalImage: объект Pixel в списке строк
+PIXEL_OBJECT_BYTES = 144
+# Массив int64 попаданий (hit_counts, суммарный массив основного процесса)
+HITS_BYTES = 8
+# Упаковка массива попаданий для передачи (src.transport.pack_hits): индексы, значения и сжатые данные
+PACK_BYTES = 24
+# Окрашенное изображение RGB и изображение PIL
+IMAGE_BYTES = 6
+ACCUMULATOR_BYTES = {"uint32": 4, "uint64": 8, "float32": 4}
+# Размер счётчиков после автоматического расширения типа (src.engine.PROMOTIONS)
+PROMOTED_BYTES = {"uint32": 8, "uint64": 8, "float32": 8}
+
+# Память интерпретатора и библиотек в одном рабочем процессе
+PROCESS_BYTES = 96 * 2 ** 20
+
+_SIZE_UNITS = {"": 1, "K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30, "T": 2 ** 40}
+
+
+class MemoryBudgetError(Exception):
+    """
+    Исключение, возникающее, если рендеринг не помещается в лимит памяти.
+    """
+
+
+class MemoryPlan(NamedTuple):
+    """
+    План рендеринга в пределах лимита памяти.
+
+    Атрибуты:
+        workers (int): Число рабочих процессов пула; 0 — рендеринг в основном процессе
+                       на общую гистограмму.
+        accumulator (str): Тип счётчиков попаданий движков numpy и jit.
+        tile_threads (int): Число потоков поблочного накопления общей гистограммы.
+        worker_bytes (int): Оценка памяти одного рабочего процесса в байтах.
+        main_bytes (int): Оценка памяти основного процесса в байтах.
+        limit (int | None): Лимит памяти в байтах (None, если он неизвестен).
+    """
+    workers: int
+    accumulator: str
+    tile_threads: int
+    worker_bytes: int
+    main_bytes: int
+    limit: int | None
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        Оценка суммарной памяти всех процессов в байтах.
+        """
+        return self.main_bytes + self.workers * self.worker_bytes
+
+    def describe(self) -> str:
+        """
+        Возвращает описание плана для вывода пользователю.
+        """
+        if self.workers:
+            mode = (f"процессов: {self.workers} по {format_size(self.worker_bytes)}, "
+                    f"основной процесс: {format_size(self.main_bytes)}")
+        else:
+            mode = f"рендеринг в основном процессе: {format_size(self.main_bytes)}"
+            if self.tile_threads > 1:
+                mode += f", потоков накопления: {self.tile_threads}"
+        limit = format_size(self.limit) if self.limit is not None else "неизвестен"
+        return (f"План памяти: {mode}, счётчики {self.accumulator}; "
+                f"всего {format_size(self.total_bytes)} при лимите {limit}")
+
+
+def parse_size(text: str) -> int:
+    """
+    Разбирает размер памяти вида "512M", "4G" или "1073741824".
+
+    Параметры:
+        text (str): Размер в байтах с необязательным суффиксом K, M, G или T (степени 1024).
+
+    Returns:
+        int: Размер в байтах.
+
+    Exceptions:
+        ValueError: Если строка не является размером памяти.
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*", text, re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Некорректный размер памяти: {text}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def format_size(size: int) -> str:
+    """
+    Форматирует размер памяти в байтах в виде "1.5 ГиБ".
+    """
+    for unit, name in ((2 ** 30, "ГиБ"), (2 ** 20, "МиБ"), (2 ** 10, "КиБ")):
+        if size >= unit:
+            return f"{size / unit:.1f} {name}"
+    return f"{size} Б"
+
+
+def available_memory() -> int | None:
+    """
+    Возвращает объём доступной памяти системы в байтах (MemAvailable из /proc/meminfo
+    или число свободных страниц) или None, если его не удаётся определить.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
+def histogram_bytes(pixels: int, accumulator: str) -> int:
+    """
+    Оценивает пиковую память гистограммы движков numpy и jit: при расширении типа счётчиков
+    старый и новый массивы существуют одновременно.
+    """
+    return pixels * (ACCUMULATOR_BYTES[accumulator] + PROMOTED_BYTES[accumulator])
+
+
+def estimate_worker_bytes(pixels: int, engine: str, accumulator: str) -> int:
+    """
+    Оценивает память одного рабочего процесса пула в байтах.
+
+    Параметры:
+        pixels (int): Число пикселей холста.
+        engine (str): Движок рендеринга: "python", "numpy" или "jit".
+        accumulator (str): Тип счётчиков движков numpy и jit.
+
+    Returns:
+        int: Оценка памяти в байтах.
+    """
+    if engine == "python":
+        canvas = pixels * (PIXEL_OBJECT_BYTES + HITS_BYTES)
+    else:
+        canvas = histogram_bytes(pixels, accumulator)
+        if engine == "jit":
+            # Гистограммы uint32 потоков JIT-ядра
+            canvas += pixels * 4 * (os.cpu_count() or 1)
+    return PROCESS_BYTES + canvas + pixels * PACK_BYTES
+
+
+def estimate_main_bytes(pixels: int, engine: str, accumulator: str, shared: bool = False) -> int:
+    """
+    Оценивает память основного процесса в байтах: суммарный массив попаданий, итоговый холст
+    и изображение, а для общей гистограммы — и саму гистограмму.
+
+    Параметры:
+        pixels (int): Число пикселей холста.
+        engine (str): Движок рендеринга: "python", "numpy" или "jit".
+        accumulator (str): Тип счётчиков движков numpy и jit.
+        shared (bool): Рендеринг на общую гистограмму в основном процессе (по умолчанию False).
+
+    Returns:
+        int: Оценка памяти в байтах.
+    """
+    total = pixels * (HITS_BYTES + PIXEL_OBJECT_BYTES + IMAGE_BYTES)
+    if shared:
+        total += histogram_bytes(pixels, accumulator) if engine != "python" else 0
+    return PROCESS_BYTES + total
+
+
+def plan_render(width: int, height: int, workers: int, engine: str = "python", accumulator: str = "uint32",
+                limit: int | None = None) -> MemoryPlan:
+    """
+    Выбирает число процессов, тип счётчиков и режим рендеринга в пределах лимита памяти.
+
+    Сначала проверяется запрошенный тип счётчиков; если с ним не помещается запрошенное число
+    процессов, для "uint64" пробуется "uint32" (счётчики расширяются автоматически только при
+    необходимости). Затем число процессов уменьшается до помещающегося. Если не помещается даже
+    один процесс, движки numpy и jit рендерят в основном процессе на одну общую гистограмму,
+    которую заполняют `workers` потоков по плиткам.
+
+    Параметры:
+        width (int): Ширина холста рендеринга.
+        height (int): Высота холста рендеринга.
+        workers (int): Запрошенное число рабочих процессов (0 — рендеринг в основном процессе).
+        engine (str): Движок рендеринга: "python", "numpy" или "jit" (по умолчанию "python").
+        accumulator (str): Запрошенный тип счётчиков (по умолчанию "uint32").
+        limit (int | None): Лимит памяти в байтах; по умолчанию — доступная память системы.
+
+    Returns:
+        MemoryPlan: План рендеринга.
+
+    Exceptions:
+        MemoryBudgetError: Если рендеринг не помещается в лимит ни в одном режиме.
+    """
+    pixels = width * height
+    if limit is None:
+        limit = available_memory()
+    accumulators = [accumulator] + (["uint32"] if accumulator == "uint64" else [])
+
+    if workers == 0 or limit is None:
+        shared = workers == 0
+        main_bytes = estimate_main_bytes(pixels, engine, accumulator, shared)
+        plan = MemoryPlan(workers, accumulator, 1, estimate_worker_bytes(pixels, engine, accumulator),
+                          main_bytes, limit)
+        if limit is not None and plan.total_bytes > limit:
+            raise MemoryBudgetError(f"Для холста {width}x{height} нужно около {format_size(plan.total_bytes)} "
+                                    f"памяти, а лимит — {format_size(limit)}.")
+        return plan
+
+    best = None
+    for candidate in accumulators:
+        main_bytes = estimate_main_bytes(pixels, engine, candidate)
+        worker_bytes = estimate_worker_bytes(pixels, engine, candidate)
+        fit = min(workers, max(0, (limit - main_bytes) // worker_bytes))
+        if fit and (best is None or fit > best.workers):
+            best = MemoryPlan(fit, candidate, 1, worker_bytes, main_bytes, limit)
+        if fit == workers:
+            break
+    if best is not None:
+        return best
+
+    if engine != "python":
+        candidate = accumulators[-1]
+        main_bytes = estimate_main_bytes(pixels, engine, candidate, shared=True)
+        if main_bytes <= limit:
+            return MemoryPlan(0, candidate, workers, 0, main_bytes, limit)
+
+    needed = estimate_main_bytes(pixels, engine, accumulators[-1]) + estimate_worker_bytes(
+        pixels, engine, accumulators[-1])
+    raise MemoryBudgetError(f"Для холста {width}x{height} даже с одним процессом нужно около "
+                            f"{format_size(needed)} памяти, а лимит — {format_size(limit)}. "
+                            f"Уменьшите размер изображения или выберите движок numpy.")
@@ -0,0 +1,420 @@
+"""
+Модуль с переиспользуемым пулом процессов для рендеринга фракталов.
+
+Пул создаётся один раз и обслуживает любое количество заданий. Каждый рабочий процесс при
+запуске импортирует модули рендеринга и затем кэширует объекты трансформаций и холсты, поэтому
+в задачах передаются только лёгкие словари конфигураций, а обратно — упакованные массивы попаданий.
+
+Рабочие процессы можно закрепить за ядрами или узлами NUMA (src.affinity). Тогда холсты
+и гистограммы процессов размещаются в памяти их узлов, а результаты задач сначала суммируются
+по узлам потоками, закреплёнными за этими узлами, и только затем в общий массив.
+
+Ход рендеринга рабочие процессы сообщают через общие счётчики RenderPool.progress (src.progress).
+"""
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src import progress
+from src.affinity import numa_nodes, pin_current, plan_placement
+from src.config_utils import config_from_dict, config_to_dict
+from src.domain import FractalImage
+from src.engine import EngineOptions, Histogram, render_config_batched
+from src.histogram import add_hits, clear_hits, hit_counts
+from src.progress import ProgressCounters
+from src.renderer import render_config
+from src.transport import merge_hits, pack_hits
+
+START_METHODS = ("fork", "forkserver", "spawn")
+
+# Модули, которые сервер forkserver загружает заранее, чтобы рабочие процессы не импортировали их заново
+PRELOAD_MODULES = ["numpy", "src.renderer", "src.engine", "src.pool"]
+
+# Размеры кэшей рабочего процесса: конфигураций и холстов
+CONFIG_CACHE_SIZE = 64
+CANVAS_CACHE_SIZE = 2
+
+# Холсты крупнее этого числа пикселей не кэшируются: холст из объектов Pixel занимает
+# сотни байт на пиксель, а долгоживущий сервер получает размеры от клиентов
+MAX_CACHED_CANVAS_PIXELS = 1_000_000
+
+# Длина очереди упакованных результатов перед потоком суммирования узла NUMA
+NODE_QUEUE_SIZE = 4
+
+# Состояние рабочего процесса: кэш трансформаций и холстов, узел NUMA
+_worker_state = {}
+
+
+def _init_worker(counter=None, placement=(), counters=None):
+    """
+    Инициализирует рабочий процесс: занимает место в пуле, закрепляет процесс за процессорами
+    из плана размещения, подключает счётчики хода рендеринга и создаёт кэши конфигураций и холстов.
+
+    Модули рендеринга к этому моменту уже импортированы вместе с src.pool. Кэши создаются
+    после закрепления, поэтому их память размещается на узле NUMA процесса.
+
+    Параметры:
+        counter (multiprocessing.Value | None): Общий счётчик запущенных процессов; по нему процесс
+                                                выбирает своё место (перезапущенный процесс
+                                                занимает места по кругу).
+        placement (list[tuple[int, frozenset[int]]]): План размещения src.affinity.plan_placement.
+        counters (ProgressCounters | None): Счётчики хода рендеринга (src.progress).
+    """
+    slot, node = 0, 0
+    if counter is not None:
+        with counter.get_lock():
+            slot = counter.value
+            counter.value += 1
+    if placement:
+        node, cpus = placement[slot % len(placement)]
+        pin_current(cpus)
+    if counters is not None:
+        progress.attach(counters, slot)
+    _worker_state["node"] = node
+    _worker_state["configs"] = OrderedDict()
+    _worker_state["canvases"] = OrderedDict()
+
+
+def _config_key(conf: dict):
+    """
+    Возвращает хешируемый ключ словаря конфигурации для кэширования.
+    """
+    return repr(sorted(conf.items()))
+
+
+def _get_config(conf: dict):
+    """
+    Возвращает закэшированную в рабочем процессе конфигурацию, создавая её при первом обращении.
+
+    В кэше хранится не более CONFIG_CACHE_SIZE последних использованных конфигураций.
+    """
+    configs = _worker_state.setdefault("configs", OrderedDict())
+    key = _config_key(conf)
+    if key in configs:
+        configs.move_to_end(key)
+    else:
+        configs[key] = config_from_dict(conf)
+        if len(configs) > CONFIG_CACHE_SIZE:
+            configs.popitem(last=False)
+    return configs[key]
+
+
+def _get_canvas(width: int, height: int) -> FractalImage:
+    """
+    Возвращает пустой холст заданного размера.
+
+    Холсты не крупнее MAX_CACHED_CANVAS_PIXELS кэшируются в рабочем процессе, в кэше хранится
+    не более CANVAS_CACHE_SIZE последних использованных размеров.
+    """
+    if width * height > MAX_CACHED_CANVAS_PIXELS:
+        return FractalImage(width, height)
+    canvases = _worker_state.setdefault("canvases", OrderedDict())
+    key = (width, height)
+    if key in canvases:
+        canvases.move_to_end(key)
+    else:
+        canvases[key] = FractalImage(width, height)
+        if len(canvases) > CANVAS_CACHE_SIZE:
+            canvases.popitem(last=False)
+    return canvases[key]
+
+
+def _render_task(task) -> tuple:
+    """
+    Рендерит одну конфигурацию на закэшированном холсте и возвращает упакованный массив попаданий.
+
+    Если в задаче переданы параметры EngineOptions, конфигурация рендерится векторизованным
+    движком src.engine с выбранной точностью.
+
+    Параметры:
+        task (tuple): Номер задачи, словарь конфигурации, ширина и высота холста, параметры движка или None.
+
+    Returns:
+        tuple: Номер задачи, массив попаданий в разреженной или сжатой форме (см. src.transport.pack_hits),
+               результат адаптивного рендеринга (AdaptiveResult или None), время рендеринга в секундах
+               и номер узла NUMA рабочего процесса.
+    """
+    index, conf, width, height, options = task
+    start = time.perf_counter()
+    progress.set_active(True)
+    try:
+        if options is not None:
+            histogram = Histogram(width, height, options.accumulator, options.tile_threads,
+                                  options.tile_bytes)
+            result = render_config_batched(histogram, _get_config(conf), options=options)
+            hits = histogram.hits
+        else:
+            canvas = _get_canvas(width, height)
+            result = render_config(canvas, _get_config(conf))
+            hits = hit_counts(canvas)
+            clear_hits(canvas, hits)
+    finally:
+        progress.set_active(False)
+    seconds = time.perf_counter() - start
+    return index, pack_hits(hits), result, seconds, _worker_state.get("node", 0)
+
+
+def _merge_results(total: np.ndarray, results, node_cpus: list | None = None) -> tuple[list, float]:
+    """
+    Суммирует упакованные массивы попаданий задач и возвращает их результаты адаптивного рендеринга.
+
+    Если задано несколько узлов NUMA, массивы сначала суммируются по узлам (см. _NodeReducer).
+
+    Параметры:
+        total (np.ndarray): Суммарный массив попаданий; изменяется на месте.
+        results (iterable): Результаты _render_task.
+        node_cpus (list[frozenset[int]] | None): Процессоры узлов NUMA рабочих процессов.
+
+    Returns:
+        tuple[list, float]: AdaptiveResult или None для каждой задачи в порядке номеров и суммарное
+                            время рендеринга задач в рабочих процессах.
+    """
+    adaptive = {}
+    render_seconds = 0.0
+    reducer = _NodeReducer(total, node_cpus) if node_cpus and len(node_cpus) > 1 else None
+    try:
+        for index, payload, result, seconds, node in results:
+            if reducer is not None:
+                reducer.add(node, payload)
+            else:
+                merge_hits(total, payload)
+            adaptive[index] = result
+            render_seconds += seconds
+    finally:
+        if reducer is not None:
+            reducer.finish()
+    return [adaptive[index] for index in sorted(adaptive)], render_seconds
+
+
+class _NodeReducer:
+    """
+    Суммирование результатов по узлам NUMA перед общим суммированием.
+
+    Для каждого узла запускается поток, закреплённый за процессорами узла. Поток создаёт частичную
+    сумму при первом результате своего узла (страницы массива размещаются на этом узле) и добавляет
+    в неё результаты процессов узла; в общий массив попадает по одной частичной сумме на узел.
+    """
+    def __init__(self, total: np.ndarray, node_cpus: list):
+        self.total = total
+        self.queues = [queue.Queue(NODE_QUEUE_SIZE) for _ in node_cpus]
+        self.partials = [None] * len(node_cpus)
+        self.errors = []
+        self.threads = [threading.Thread(target=self._reduce, args=(node, cpus), daemon=True)
+                        for node, cpus in enumerate(node_cpus)]
+        for thread in self.threads:
+            thread.start()
+
+    def _reduce(self, node: int, cpus):
+        pin_current(cpus)
+        while (payload := self.queues[node].get()) is not None:
+            try:
+                if self.partials[node] is None:
+                    self.partials[node] = np.zeros_like(self.total)
+                merge_hits(self.partials[node], payload)
+            except Exception as e:
+                self.errors.append(e)
+
+    def add(self, node: int, payload):
+        self.queues[node % len(self.queues)].put(payload)
+
+    def finish(self):
+        for node_queue in self.queues:
+            node_queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.errors:
+            raise self.errors[0]
+        for partial in self.partials:
+            if partial is not None:
+                self.total += partial
+
+
+class RenderPool:
+    """
+    Переиспользуемый пул процессов для рендеринга.
+
+    Пул можно использовать для нескольких заданий подряд и в нескольких режимах в рамках
+    одного процесса. Поддерживается как контекстный менеджер.
+
+    Параметры:
+        processes (int | None): Число рабочих процессов (по умолчанию — число CPU).
+        start_method (str | None): Способ запуска процессов: "fork", "forkserver" или "spawn"
+                                   (по умолчанию — способ, принятый на платформе).
+        affinity (str): Размещение процессов по ядрам: "none", "core" или "node" (см. src.affinity;
+                        по умолчанию "none").
+
+    Атрибуты:
+        processes (int): Число рабочих процессов.
+        placement (list[tuple[int, frozenset[int]]]): План размещения процессов (пустой без закрепления).
+        progress (ProgressCounters): Счётчики хода рендеринга рабочих процессов (см. src.progress.ProgressMonitor).
+
+    Методы:
+        render_hits(configs, width, height): Рендерит конфигурации и возвращает суммарный массив попаданий.
+        render_hits_with_results(configs, width, height): То же вместе с результатами адаптивного рендеринга.
+        render_hits_async(configs, width, height): Отправляет конфигурации на рендеринг без ожидания результата.
+        render(configs, width, height): Рендерит конфигурации и возвращает холст FractalImage.
+        imap_unordered(func, tasks): Выполняет произвольную функцию для каждой задачи.
+        apply_async(func, task, callback, error_callback): Отправляет одну задачу без ожидания результата.
+        close(): Завершает работу пула.
+    """
+    def __init__(self, processes: int | None = None, start_method: str | None = None, affinity: str = "none"):
+        if start_method is not None and start_method not in START_METHODS:
+            raise ValueError(f"Неизвестный способ запуска процессов: {start_method}. "
+                             f"Допустимые: {', '.join(START_METHODS)}")
+        context = multiprocessing.get_context(start_method)
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(PRELOAD_MODULES)
+        self.processes = processes or multiprocessing.cpu_count()
+        nodes = numa_nodes()
+        self.placement = plan_placement(self.processes, affinity, nodes)
+        used_nodes = {node for node, _ in self.placement}
+        self._node_cpus = nodes if len(used_nodes) > 1 else None
+        self.progress = ProgressCounters(self.processes, context)
+        self._pool = context.Pool(processes=self.processes, initializer=_init_worker,
+                                  initargs=(context.Value("i", 0), self.placement, self.progress))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _tasks(self, configs, width: int, height: int, options: EngineOptions | None = None) -> list:
+        return [(index, config_to_dict(config), width, height, options) for index, config in enumerate(configs)]
+
+    def render_hits(self, configs, width: int, height: int, options: EngineOptions | None = None) -> np.ndarray:
+        """
+        Рендерит конфигурации в рабочих процессах и суммирует их попадания.
+
+        Параметры:
+            configs (list[TransformationConfig]): Конфигурации трансформаций.
+            width (int): Ширина холста.
+            height (int): Высота холста.
+            options (EngineOptions | None): Параметры векторизованного движка; None — рендеринг по точкам.
+
+        Returns:
+            np.ndarray: Массив формы (height, width) с суммарным числом попаданий.
+        """
+        return self.render_hits_with_results(configs, width, height, options)[0]
+
+    def render_hits_with_results(self, configs, width: int, height: int,
+                                 options: EngineOptions | None = None) -> tuple[np.ndarray, list]:
+        """
+        Рендерит конфигурации в рабочих процессах, суммирует их попадания и собирает результаты
+        адаптивного рендеринга.
+
+        Параметры:
+            configs (list[TransformationConfig]): Конфигурации трансформаций.
+            width (int): Ширина холста.
+            height (int): Высота холста.
+            options (EngineOptions | None): Параметры векторизованного движка; None — рендеринг по точкам.
+
+        Returns:
+            tuple[np.ndarray, list]: Суммарный массив попаданий и AdaptiveResult или None
+                                     для каждой конфигурации в исходном порядке.
+        """
+        total = np.zeros((height, width), dtype=np.int64)
+        tasks = self._tasks(configs, width, height, options)
+        results, _ = _merge_results(total, self._pool.imap_unordered(_render_task, tasks), self._node_cpus)
+        return total, results
+
+    def render_hits_async(self, configs, width: int, height: int,
+                          options: EngineOptions | None = None) -> "PendingRender":
+        """
+        Отправляет конфигурации на рендеринг без ожидания результата.
+
+        Параметры:
+            configs (list[TransformationConfig]): Конфигурации трансформаций.
+            width (int): Ширина холста.
+            height (int): Высота холста.
+            options (EngineOptions | None): Параметры векторизованного движка; None — рендеринг по точкам.
+
+        Returns:
+            PendingRender: Объект для получения суммарного массива попаданий.
+        """
+        tasks = self._tasks(configs, width, height, options)
+        return PendingRender(self._pool.map_async(_render_task, tasks), width, height, self._node_cpus)
+
+    def render(self, configs, width: int, height: int, options: EngineOptions | None = None) -> FractalImage:
+        """
+        Рендерит конфигурации в рабочих процессах и собирает результат на новом холсте.
+
+        Параметры:
+            configs (list[TransformationConfig]): Конфигурации трансформаций.
+            width (int): Ширина холста.
+            height (int): Высота холста.
+            options (EngineOptions | None): Параметры векторизованного движка; None — рендеринг по точкам.
+
+        Returns:
+            FractalImage: Холст с суммарным результатом рендеринга.
+        """
+        canvas = FractalImage(width, height)
+        add_hits(canvas, self.render_hits(configs, width, height, options))
+        return canvas
+
+    def imap_unordered(self, func, tasks):
+        """
+        Выполняет произвольную функцию модульного уровня для каждой задачи в рабочих процессах.
+
+        Параметры:
+            func (callable): Функция, принимающая одну задачу.
+            tasks (iterable): Задачи.
+
+        Returns:
+            iterator: Результаты в порядке готовности.
+        """
+        return self._pool.imap_unordered(func, tasks)
+
+    def apply_async(self, func, task, callback=None, error_callback=None):
+        """
+        Отправляет одну задачу произвольной функции модульного уровня без ожидания результата.
+
+        Параметры:
+            func (callable): Функция, принимающая одну задачу.
+            task: Задача.
+            callback (callable | None): Вызывается с результатом в служебном потоке пула.
+            error_callback (callable | None): Вызывается с исключением задачи в служебном потоке пула.
+
+        Returns:
+            multiprocessing.pool.AsyncResult: Ожидаемый результат.
+        """
+        return self._pool.apply_async(func, (task,), callback=callback, error_callback=error_callback)
+
+    def close(self):
+        """
+        Завершает работу пула, дожидаясь окончания рабочих процессов.
+        """
+        self._pool.close()
+        self._pool.join()
+
+
+class PendingRender:
+    """
+    Рендеринг, отправленный в пул и ещё, возможно, не завершённый.
+
+    Атрибуты:
+        render_seconds (float | None): Суммарное время рендеринга задач в рабочих процессах
+                                       (известно после вызова get).
+
+    Методы:
+        ready(): Проверяет, завершён ли рендеринг.
+        get(timeout): Дожидается завершения и возвращает суммарный массив попаданий.
+    """
+    def __init__(self, async_result, width: int, height: int, node_cpus: list | None = None):
+        self._async_result = async_result
+        self._node_cpus = node_cpus
+        self.width = width
+        self.height = height
+        self.render_seconds = None
+
+    def ready(self) -> bool:
+        return self._async_result.ready()
+
+    def get(self, timeout: float | None = None) -> np.ndarray:
+        total = np.zeros((self.height, self.width), dtype=np.int64)
+        _, self.render_seconds = _merge_results(total, self._async_result.get(timeout), self._node_cpus)
+        return total
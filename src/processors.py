@@ -1,10 +1,23 @@
 """
 Модуль для обработки изображений фракталов с использованием методов коррекции.
+
+Помимо обработки FractalImage на месте, процессоры умеют работать с массивами: метод prepare
+собирает по всему массиву попаданий нужную процессору статистику, а метод apply преобразует
+фрагмент массива. ProcessorPipeline объединяет несколько процессоров в один проход: массив
+попаданий делится на полосы строк, полосы обрабатываются всеми процессорами подряд в пуле потоков
+(NumPy освобождает GIL) и записываются прямо в выходной массив uint8.
 """
-import matplotlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
+from src.colormaps import apply_lut, get_lut
 from src.domain import FractalImage
+from src.histogram import hit_counts
+
+# Число пикселей в полосе строк, которую конвейер обрабатывает за один шаг
+CHUNK_PIXELS = 1 << 16
 
 
 class ImageProcessor:
@@ -17,10 +30,32 @@ class ImageProcessor:
 
     Методы:
         process(image: FractalImage): Метод для обработки изображения, должен быть реализован в дочерних классах.
+        prepare(hits: np.ndarray): Собирает статистику всего массива попаданий для apply.
+        apply(values: np.ndarray, context): Преобразует фрагмент массива для ProcessorPipeline.
     """
     def process(self, image: FractalImage):
         raise NotImplementedError("Subclasses must implement this method")
 
+    def prepare(self, hits: np.ndarray):
+        """
+        Собирает статистику всего массива попаданий, нужную методу apply (по умолчанию None).
+        """
+        return None
+
+    def apply(self, values: np.ndarray, context) -> np.ndarray:
+        """
+        Преобразует фрагмент массива: число попаданий формы (rows, width) для первого процессора
+        конвейера или цвета RGB формы (rows, width, 3) со значениями от 0 до 255 для остальных.
+
+        Параметры:
+            values (np.ndarray): Фрагмент массива.
+            context: Результат prepare.
+
+        Returns:
+            np.ndarray: Цвета RGB формы (rows, width, 3) со значениями от 0 до 255.
+        """
+        raise NotImplementedError(f"{type(self).__name__} не поддерживает обработку массивов")
+
 
 class GammaCorrectionProcessor(ImageProcessor):
     """
@@ -55,6 +90,12 @@ class GammaCorrectionProcessor(ImageProcessor):
                 pixel.g = int((pixel.g / 255) ** (1 / self.gamma) * 255)
                 pixel.b = int((pixel.b / 255) ** (1 / self.gamma) * 255)
 
+    def apply(self, values: np.ndarray, context) -> np.ndarray:
+        """
+        Применяет гамма-коррекцию к цветам RGB фрагмента.
+        """
+        return (values / 255) ** (1 / self.gamma) * 255
+
 
 class LogGammaCorrectionProcessor(ImageProcessor):
     """
@@ -67,11 +108,15 @@ class LogGammaCorrectionProcessor(ImageProcessor):
     Параметры:
         gamma (float): Параметр гамма-коррекции (по умолчанию 2.0).
         scale (float): Масштабный коэффициент для логарифмической коррекции (по умолчанию 1.0).
-        colormap (str): Название цветовой карты из matplotlib (по умолчанию "inferno").
+        colormap (str): Название цветовой карты из matplotlib (по умолчанию "inferno"); таблица цветов
+                        берётся из src.colormaps, поэтому matplotlib не импортируется.
         brightness_shift (float): Смещение яркости для повышения вариативности цветов (по умолчанию 0.1).
 
     Методы:
         process(image: FractalImage): Применяет логарифмическую гамма-коррекцию и окрашивает изображение.
+        tone_map(hits: np.ndarray): Применяет ту же коррекцию к массиву попаданий и возвращает массив RGB.
+        prepare(hits: np.ndarray): Возвращает максимальное число попаданий.
+        apply(values: np.ndarray, max_hit_count): Окрашивает фрагмент массива попаданий.
     """
     def __init__(self, gamma: float = 2.0, scale: float = 1.0, colormap="inferno", brightness_shift=0.1):
         """
@@ -85,7 +130,8 @@ class LogGammaCorrectionProcessor(ImageProcessor):
         """
         self.gamma = gamma
         self.scale = scale
-        self.colormap = matplotlib.colormaps.get_cmap(colormap)
+        self.colormap = colormap
+        self.lut = get_lut(colormap)
         self.brightness_shift = brightness_shift
 
     def process(self, image: FractalImage):
@@ -113,8 +159,113 @@ class LogGammaCorrectionProcessor(ImageProcessor):
 
                 gamma_corrected_hit = corrected_hit ** (1 / self.gamma)
 
-                color = self.colormap(gamma_corrected_hit + self.brightness_shift)
+                color = apply_lut(self.lut, gamma_corrected_hit + self.brightness_shift)
+
+                pixel.r = int(color[0])
+                pixel.g = int(color[1])
+                pixel.b = int(color[2])
+
+    def tone_map(self, hits: np.ndarray) -> np.ndarray:
+        """
+        Применяет ту же коррекцию, что и process, к массиву попаданий целиком (см. ProcessorPipeline).
+
+        Параметры:
+            hits (np.ndarray): Массив формы (height, width) с числом попаданий.
+
+        Returns:
+            np.ndarray: Массив RGB формы (height, width, 3) типа uint8.
+        """
+        return ProcessorPipeline([self]).tone_map(hits)
+
+    def prepare(self, hits: np.ndarray):
+        """
+        Возвращает максимальное число попаданий, по которому нормализуются фрагменты.
+        """
+        return hits.max() if hits.size else 0
+
+    def apply(self, values: np.ndarray, max_hit_count) -> np.ndarray:
+        """
+        Окрашивает фрагмент массива попаданий; max_hit_count — максимум всего массива (см. prepare).
+        """
+        if max_hit_count == 0:
+            return np.zeros(values.shape + (3,), dtype=np.uint8)
+        corrected_hits = np.log1p(values / max_hit_count * self.scale)
+        gamma_corrected_hits = corrected_hits ** (1 / self.gamma)
+        return apply_lut(self.lut, gamma_corrected_hits + self.brightness_shift)
+
+
+class ProcessorPipeline(ImageProcessor):
+    """
+    Конвейер процессоров, выполняемый одним проходом по массиву попаданий.
+
+    Первый процессор переводит число попаданий в цвета (например, LogGammaCorrectionProcessor),
+    следующие преобразуют цвета (например, GammaCorrectionProcessor). Массив делится на полосы
+    примерно по CHUNK_PIXELS пикселей; каждая полоса проходит через все процессоры, пока она
+    в кэше, и записывается в выходной массив uint8. Полосы обрабатываются в пуле потоков.
+
+    Параметры:
+        stages (list[ImageProcessor]): Процессоры в порядке применения.
+        threads (int | None): Число потоков (по умолчанию — число процессоров системы).
+        chunk_pixels (int): Число пикселей в полосе (по умолчанию CHUNK_PIXELS).
+
+    Методы:
+        tone_map(hits: np.ndarray, out: np.ndarray | None, contexts: list | None):
+            Обрабатывает массив попаданий и возвращает массив RGB.
+        process(image: FractalImage): Обрабатывает холст по его числу попаданий.
+    """
+    def __init__(self, stages: list[ImageProcessor], threads: int | None = None, chunk_pixels: int = CHUNK_PIXELS):
+        if not stages:
+            raise ValueError("Конвейер должен содержать хотя бы один процессор.")
+        self.stages = list(stages)
+        self.threads = threads or os.cpu_count() or 1
+        self.chunk_pixels = chunk_pixels
+
+    def tone_map(self, hits: np.ndarray, out: np.ndarray | None = None, contexts: list | None = None) -> np.ndarray:
+        """
+        Обрабатывает массив попаданий всеми процессорами конвейера.
+
+        Параметры:
+            hits (np.ndarray): Массив формы (height, width) с числом попаданий.
+            out (np.ndarray | None): Выходной массив формы (height, width, 3) типа uint8
+                                     (по умолчанию создаётся новый).
+            contexts (list | None): Уже вычисленные результаты prepare процессоров, например общие
+                                    для нескольких выходов одной гистограммы (по умолчанию вычисляются).
+
+        Returns:
+            np.ndarray: Массив RGB формы (height, width, 3) типа uint8.
+        """
+        if out is None:
+            out = np.empty(hits.shape + (3,), dtype=np.uint8)
+        if contexts is None:
+            contexts = [stage.prepare(hits) for stage in self.stages]
+        height, width = hits.shape
+        rows = max(1, self.chunk_pixels // max(1, width))
+        chunks = [slice(start, min(start + rows, height)) for start in range(0, height, rows)]
+
+        def run(chunk: slice):
+            values = hits[chunk]
+            for stage, context in zip(self.stages, contexts):
+                values = stage.apply(values, context)
+            if values.dtype != np.uint8:
+                values = np.clip(values, 0, 255)
+            np.copyto(out[chunk], values, casting="unsafe")
+
+        if self.threads > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(min(self.threads, len(chunks))) as executor:
+                list(executor.map(run, chunks))
+        else:
+            for chunk in chunks:
+                run(chunk)
+        return out
 
-                pixel.r = int(min(255, color[0] * 255))
-                pixel.g = int(min(255, color[1] * 255))
-                pixel.b = int(min(255, color[2] * 255))
+    def process(self, image: FractalImage):
+        """
+        Окрашивает холст по его числу попаданий.
+
+        Параметры:
+            image (FractalImage): Изображение для обработки.
+        """
+        rgb = self.tone_map(hit_counts(image)).tolist()
+        for row, colors in zip(image.data, rgb):
+            for pixel, (r, g, b) in zip(row, colors):
+                pixel.r, pixel.g, pixel.b = r, g, b
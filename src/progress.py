@@ -0,0 +1,229 @@
+"""
+Модуль отчётов о ходе рендеринга из рабочих процессов.
+
+Каждый рабочий процесс пула получает свою строку в общей памяти (multiprocessing.RawArray)
+и после каждого блока сэмплов прибавляет к ней число сэмплов, итераций и попаданий на холст,
+а также отмечает время обновления. В строку пишет только её процесс, поэтому блокировки не нужны,
+а отчёт — несколько сложений раз в блок из тысяч орбит — занимает доли процента времени рендеринга.
+
+Основной процесс читает счётчики в отдельном потоке (ProgressMonitor), выводит строку прогресса
+с оценкой оставшегося времени и, по желанию, записывает снимок метрик в файл: JSON или, для файлов
+.prom, текстовый формат Prometheus (для textfile-коллектора агента узла). По времени последнего
+обновления видно, завис ли процесс, выполняющий задачу, или просто работает медленно.
+"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Поля строки счётчиков рабочего процесса
+SAMPLES, ITERATIONS, HITS, UPDATED, ACTIVE = range(5)
+FIELDS = 5
+
+# Процесс, выполняющий задачу и не обновлявший счётчики дольше этого времени, считается зависшим
+STALL_SECONDS = 30.0
+
+# Строка счётчиков текущего рабочего процесса (None — отчёты отключены)
+_counters = None
+_base = 0
+
+
+class ProgressCounters:
+    """
+    Счётчики хода рендеринга рабочих процессов в общей памяти.
+
+    Атрибуты:
+        slots (int): Число строк (рабочих процессов).
+
+    Методы:
+        snapshot(): Возвращает копию счётчиков в виде массива формы (slots, FIELDS).
+    """
+    def __init__(self, slots: int, context=None):
+        """
+        Параметры:
+            slots (int): Число строк (рабочих процессов).
+            context: Контекст multiprocessing (по умолчанию — контекст по умолчанию).
+        """
+        self.slots = slots
+        self.array = (context or multiprocessing).RawArray("d", slots * FIELDS)
+
+    def snapshot(self) -> np.ndarray:
+        return np.frombuffer(self.array, dtype=np.float64).reshape(self.slots, FIELDS).copy()
+
+
+def attach(counters: ProgressCounters | None, slot: int):
+    """
+    Включает отчёты текущего процесса в строку slot счётчиков (None — отключает).
+    """
+    global _counters, _base
+    _counters = counters.array if counters is not None else None
+    _base = (slot % counters.slots) * FIELDS if counters is not None else 0
+
+
+def report(samples: int, iterations: int, hits: int = 0):
+    """
+    Прибавляет выполненную работу к счётчикам текущего процесса. Без attach ничего не делает.
+
+    Параметры:
+        samples (int): Число сэмплов (орбит).
+        iterations (int): Число итераций трансформаций.
+        hits (int): Число попаданий на холст.
+    """
+    if _counters is None:
+        return
+    _counters[_base + SAMPLES] += samples
+    _counters[_base + ITERATIONS] += iterations
+    _counters[_base + HITS] += hits
+    _counters[_base + UPDATED] = time.time()
+
+
+def set_active(active: bool):
+    """
+    Отмечает, выполняет ли текущий процесс задачу (для обнаружения зависших процессов).
+    """
+    if _counters is not None:
+        _counters[_base + ACTIVE] = 1.0 if active else 0.0
+        _counters[_base + UPDATED] = time.time()
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds == float("inf"):
+        return "?"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}" if minutes else f"{seconds} с"
+
+
+class ProgressMonitor:
+    """
+    Поток основного процесса, который периодически читает счётчики рабочих процессов, выводит
+    строку прогресса и записывает снимок метрик. Используется как контекстный менеджер вокруг
+    рендеринга; учитывается только работа, выполненная после входа в контекст.
+
+    Методы:
+        metrics(): Возвращает снимок метрик (словарь).
+        line(metrics): Возвращает строку прогресса.
+    """
+    def __init__(self, counters: ProgressCounters, total_samples: int, interval: float = 1.0,
+                 metrics_file=None, show: bool = True, stall_seconds: float = STALL_SECONDS):
+        """
+        Параметры:
+            counters (ProgressCounters): Счётчики рабочих процессов.
+            total_samples (int): Общее число сэмплов рендеринга (для адаптивных конфигураций — верхняя граница).
+            interval (float): Период обновления в секундах (по умолчанию 1).
+            metrics_file (str | Path | None): Файл снимка метрик: .prom — формат Prometheus, иначе JSON.
+            show (bool): Выводить строку прогресса (по умолчанию True).
+            stall_seconds (float): Время без обновлений, после которого процесс с задачей считается зависшим.
+        """
+        self.counters = counters
+        self.total_samples = total_samples
+        self.interval = interval
+        self.metrics_file = Path(metrics_file) if metrics_file else None
+        self.show = show
+        self.stall_seconds = stall_seconds
+        self._stop = threading.Event()
+        self._thread = None
+        self._printed = False
+
+    def __enter__(self):
+        self._baseline = self.counters.snapshot()
+        self._started = time.time()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self._update(final=exc_type is None)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._update()
+
+    def _update(self, final: bool = False):
+        metrics = self.metrics()
+        if self.metrics_file is not None:
+            self._write(metrics)
+        if self.show and (self._printed or not final):
+            print("\r" + self.line(metrics), end="\n" if final else "", flush=True)
+            self._printed = True
+
+    def metrics(self) -> dict:
+        """
+        Возвращает снимок метрик: выполненные сэмплы, скорость итераций и попаданий, оценку
+        оставшегося времени и состояние каждого рабочего процесса.
+        """
+        now = time.time()
+        current = self.counters.snapshot()
+        done = current - self._baseline
+        elapsed = max(now - self._started, 1e-9)
+        samples = int(done[:, SAMPLES].sum())
+        rate = samples / elapsed
+        remaining = max(self.total_samples - samples, 0)
+        workers = []
+        for slot, row in enumerate(current):
+            since_update = now - row[UPDATED] if row[UPDATED] else None
+            workers.append({
+                "worker": slot,
+                "samples": int(done[slot, SAMPLES]),
+                "iterations": int(done[slot, ITERATIONS]),
+                "hits": int(done[slot, HITS]),
+                "active": bool(row[ACTIVE]),
+                "seconds_since_update": round(since_update, 3) if since_update is not None else None,
+                "stalled": bool(row[ACTIVE]) and since_update is not None and since_update > self.stall_seconds,
+            })
+        return {
+            "timestamp": now,
+            "elapsed_seconds": round(elapsed, 3),
+            "samples_done": samples,
+            "samples_total": self.total_samples,
+            "progress": min(samples / self.total_samples, 1.0) if self.total_samples else 1.0,
+            "samples_per_second": round(rate, 1),
+            "iterations_per_second": round(done[:, ITERATIONS].sum() / elapsed, 1),
+            "hits_per_second": round(done[:, HITS].sum() / elapsed, 1),
+            "eta_seconds": round(remaining / rate, 1) if rate > 0 else None,
+            "workers": workers,
+        }
+
+    def line(self, metrics: dict) -> str:
+        """
+        Возвращает строку прогресса вида "Прогресс: 45.0% (450000/1000000 сэмплов), ...".
+        """
+        eta = metrics["eta_seconds"]
+        active = sum(worker["active"] for worker in metrics["workers"])
+        stalled = sum(worker["stalled"] for worker in metrics["workers"])
+        return (f"Прогресс: {metrics['progress'] * 100:5.1f}% "
+                f"({metrics['samples_done']}/{metrics['samples_total']} сэмплов), "
+                f"{metrics['iterations_per_second']:.3g} итераций/с, {metrics['hits_per_second']:.3g} попаданий/с, "
+                f"осталось ~{_format_seconds(eta if eta is not None else float('inf'))}, "
+                f"процессов с задачами: {active}" + (f", без отклика: {stalled}" if stalled else ""))
+
+    def _write(self, metrics: dict):
+        # Файл заменяется атомарно, чтобы читатель не увидел его частично записанным
+        temporary = self.metrics_file.with_name(self.metrics_file.name + ".tmp")
+        if self.metrics_file.suffix == ".prom":
+            temporary.write_text(prometheus_text(metrics))
+        else:
+            temporary.write_text(json.dumps(metrics, ensure_ascii=False, indent=2))
+        os.replace(temporary, self.metrics_file)
+
+
+def prometheus_text(metrics: dict) -> str:
+    """
+    Преобразует снимок метрик в текстовый формат Prometheus.
+    """
+    lines = []
+    for name in ("samples_done", "samples_total", "progress", "samples_per_second", "iterations_per_second",
+                 "hits_per_second", "eta_seconds"):
+        if metrics[name] is not None:
+            lines += [f"# TYPE fractal_render_{name} gauge", f"fractal_render_{name} {metrics[name]}"]
+    for name in ("samples", "hits", "active", "stalled", "seconds_since_update"):
+        lines.append(f"# TYPE fractal_worker_{name} gauge")
+        for worker in metrics["workers"]:
+            if worker[name] is not None:
+                lines.append(f'fractal_worker_{name}{{worker="{worker["worker"]}"}} {float(worker[name])}')
+    return "\n".join(lines) + "\n"
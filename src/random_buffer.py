@@ -0,0 +1,57 @@
+"""
+Модуль буферизованного генератора случайных чисел.
+
+Поточечный рендеринг расходует несколько случайных чисел на каждую итерацию орбиты: координаты
+начальной точки, номер трансформации и случайные отклонения (jitter). Вызовы модуля random
+по одному числу стоят дороже самих вычислений, поэтому числа генерируются генератором NumPy
+крупными блоками в заранее выделенный буфер, который перезаполняется по мере расходования.
+"""
+import numpy as np
+
+# Размер буфера случайных чисел по умолчанию
+RANDOM_BUFFER_SIZE = 1 << 16
+
+
+class RandomBuffer:
+    """
+    Буфер равномерно распределённых на [0, 1) случайных чисел.
+
+    Атрибуты:
+        size (int): Размер буфера.
+
+    Методы:
+        uniform(count): Возвращает следующие count чисел буфера.
+    """
+    def __init__(self, seed: int, size: int = RANDOM_BUFFER_SIZE):
+        """
+        Параметры:
+            seed (int): Зерно генератора NumPy.
+            size (int): Размер буфера (по умолчанию RANDOM_BUFFER_SIZE).
+        """
+        self.size = size
+        self._rng = np.random.default_rng(seed)
+        self._buffer = np.empty(size)
+        self._position = size
+
+    def uniform(self, count: int) -> np.ndarray:
+        """
+        Возвращает следующие count случайных чисел из [0, 1).
+
+        Если в буфере осталось меньше count чисел, буфер перезаполняется целиком. Результат —
+        представление буфера, которое действительно до следующего вызова; запросы больше
+        размера буфера обслуживаются отдельным массивом.
+
+        Параметры:
+            count (int): Количество чисел.
+
+        Returns:
+            np.ndarray: Массив формы (count,) типа float64.
+        """
+        if count > self.size:
+            return self._rng.random(count)
+        if self._position + count > self.size:
+            self._rng.random(out=self._buffer)
+            self._position = 0
+        start = self._position
+        self._position += count
+        return self._buffer[start:self._position]
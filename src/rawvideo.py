@@ -0,0 +1,110 @@
+"""
+Модуль потоковой записи кадров в формате rawvideo.
+
+Кадры анимации записываются в поток (stdout или именованный канал) как несжатые байты RGB24:
+строки пикселей подряд, по три байта на пиксель, без заголовков и разделителей между кадрами.
+Параметры потока (формат пикселей, размер, частота кадров) передаются кодировщику отдельно,
+например ffmpeg -f rawvideo -pix_fmt rgb24 -s 320x240 -r 24 -i - out.mp4. Кадр записывается
+прямо из непрерывного буфера окрашенного изображения, без сжатия PNG, промежуточных файлов и копий.
+"""
+from typing import BinaryIO
+
+import numpy as np
+
+PIXEL_FORMAT = "rgb24"
+
+
+class RawVideoWriter:
+    """
+    Запись кадров RGB24 в поток в порядке номеров.
+
+    Кадры могут приходить не по порядку (кадры анимации рендерятся параллельно): кадр, перед
+    которым ещё не записаны предыдущие, ждёт в памяти, пока не придут все кадры до него. Число
+    ждущих кадров можно ограничить параметром max_pending.
+
+    Атрибуты:
+        width (int): Ширина кадра.
+        height (int): Высота кадра.
+        fps (float): Частота кадров для описания потока.
+        frames_written (int): Число записанных кадров.
+
+    Методы:
+        describe(): Возвращает описание формата потока.
+        encoder_args(source): Возвращает аргументы входа rawvideo для ffmpeg.
+        write(frame, rgb): Записывает кадр с номером frame или откладывает его до записи предыдущих.
+        close(): Проверяет, что все полученные кадры записаны, и сбрасывает буфер потока.
+    """
+    def __init__(self, stream: BinaryIO, width: int, height: int, fps: float = 24, first_frame: int = 0,
+                 max_pending: int | None = None):
+        """
+        Параметры:
+            stream (BinaryIO): Двоичный поток для записи (например, sys.stdout.buffer или открытый канал).
+            width (int): Ширина кадра.
+            height (int): Высота кадра.
+            fps (float): Частота кадров (по умолчанию 24).
+            first_frame (int): Номер первого кадра (по умолчанию 0).
+            max_pending (int | None): Наибольшее число кадров, ждущих записи предыдущих (по умолчанию без ограничения).
+        """
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames_written = 0
+        self.max_pending = max_pending
+        self._next_frame = first_frame
+        self._pending: dict[int, np.ndarray] = {}
+
+    def describe(self) -> str:
+        """
+        Возвращает описание формата потока, например "rawvideo rgb24 320x240, 24 кадров/с".
+        """
+        return f"rawvideo {PIXEL_FORMAT} {self.width}x{self.height}, {self.fps:g} кадров/с"
+
+    def encoder_args(self, source: str = "-") -> list[str]:
+        """
+        Возвращает аргументы ffmpeg, описывающие вход в формате этого потока.
+
+        Параметры:
+            source (str): Источник для ffmpeg: "-" для stdin или путь к именованному каналу.
+        """
+        return ["-f", "rawvideo", "-pix_fmt", PIXEL_FORMAT, "-s", f"{self.width}x{self.height}",
+                "-r", f"{self.fps:g}", "-i", source]
+
+    def write(self, frame: int, rgb: np.ndarray):
+        """
+        Записывает кадр или откладывает его до записи предыдущих кадров.
+
+        Параметры:
+            frame (int): Номер кадра.
+            rgb (np.ndarray): Массив формы (height, width, 3) типа uint8.
+
+        Exceptions:
+            ValueError: Если форма или тип кадра не соответствуют потоку, кадр уже записан или
+                        ждущих кадров стало бы больше max_pending.
+        """
+        if rgb.shape != (self.height, self.width, 3) or rgb.dtype != np.uint8:
+            raise ValueError(f"Кадр {frame}: ожидается массив uint8 формы {(self.height, self.width, 3)}, "
+                             f"получен {rgb.dtype} формы {rgb.shape}")
+        if frame < self._next_frame or frame in self._pending:
+            raise ValueError(f"Кадр {frame} уже записан.")
+        if frame != self._next_frame and self.max_pending is not None and len(self._pending) >= self.max_pending:
+            raise ValueError(f"Кадр {frame}: ждут записи уже {len(self._pending)} кадров, "
+                             f"не получен кадр {self._next_frame}.")
+        self._pending[frame] = rgb
+        while self._next_frame in self._pending:
+            image = np.ascontiguousarray(self._pending.pop(self._next_frame))
+            self.stream.write(image.data)
+            self._next_frame += 1
+            self.frames_written += 1
+
+    def close(self):
+        """
+        Сбрасывает буфер потока. Поток не закрывается.
+
+        Exceptions:
+            ValueError: Если остались кадры, перед которыми не хватает предыдущих.
+        """
+        self.stream.flush()
+        if self._pending:
+            raise ValueError(f"Не получен кадр {self._next_frame}; не записаны кадры: "
+                             f"{', '.join(map(str, sorted(self._pending)))}")
@@ -1,8 +1,52 @@
-import random
+import logging
+import time
+from typing import Iterator, NamedTuple
+
 import numpy as np
 from src.domain import FractalImage, Rect, Point
+from src import progress
+from src.histogram import build_pyramid, hit_counts, log_density
+from src.random_buffer import RandomBuffer
+from src.sampling import StartSequence, start_sequence
 from src.transformations import Transformation
 
+logger = logging.getLogger(__name__)
+
+# Число пакетов, на которые делится бюджет сэмплов в адаптивном режиме
+ADAPTIVE_BATCHES = 20
+
+
+class AdaptiveResult(NamedTuple):
+    """
+    Результат адаптивного рендеринга.
+
+    Атрибуты:
+        samples (int): Фактически использованное количество сэмплов.
+        error (float): Оценка ошибки — средняя абсолютная разница нормализованной логарифмической
+                       плотности между двумя последними пакетами.
+        converged (bool): True, если ошибка опустилась ниже допуска до исчерпания бюджета сэмплов.
+    """
+    samples: int
+    error: float
+    converged: bool
+
+
+class Preview(NamedTuple):
+    """
+    Промежуточный кадр прогрессивного рендеринга.
+
+    Атрибуты:
+        samples (int): Количество сэмплов, отрендеренных к моменту кадра.
+        image (np.ndarray): Массив RGB уменьшенного разрешения типа uint8.
+        final (bool): True для кадра, построенного после последнего пакета.
+        error (float | None): Оценка ошибки адаптивного режима после последнего пакета
+                              (None, если допуск не задан).
+    """
+    samples: int
+    image: np.ndarray
+    final: bool
+    error: float | None = None
+
 
 def render(
     canvas: FractalImage,
@@ -12,7 +56,10 @@ def render(
     iter_per_sample: int,
     seed: int,
     symmetry: int = 1,
-):
+    start_points: list[Point] | None = None,
+    keep_points: bool = False,
+    sequence: StartSequence | None = None,
+) -> list[Point] | None:
     """
     Рендерит фрактальное изображение с учётом симметрии и преобразований.
 
@@ -22,43 +69,257 @@ def render(
         variations (list[Transformation]): Список преобразований, применяемых к точкам.
         samples (int): Количество генерируемых точек.
         iter_per_sample (int): Количество итераций для каждой точки.
-        seed (int): Значение для генератора случайных чисел, чтобы обеспечить стабильность.
+        seed (int): Значение для генератора случайных чисел, чтобы обеспечить стабильность. Случайные числа
+                    генерируются блоками (см. src.random_buffer.RandomBuffer).
         symmetry (int): Количество симметрий (по умолчанию 1, без симметрии).
+        start_points (list[Point] | None): Начальные точки орбит (например, конечные точки предыдущего кадра
+                                           анимации); сэмпл i начинается с точки start_points[i % len(start_points)].
+                                           По умолчанию точки выбираются случайно в пределах области.
+        keep_points (bool): Вернуть конечные точки орбит (по умолчанию False).
+        sequence (StartSequence | None): Последовательность с низкой неравномерностью для начальных точек
+                                         (см. src.sampling); сэмпл i начинается с её точки i.
+                                         Не используется, если заданы start_points.
+
+    После каждого блока сэмплов выполненная работа передаётся в src.progress.report.
 
     Returns:
-        None. Изменяет состояние объекта `canvas` напрямую.
-    """
-    random.seed(seed)
-    for _ in range(samples):
-        # Генерация случайной точки в пределах области
-        pw = Point(
-            random.uniform(world.x, world.x + world.width),
-            random.uniform(world.y, world.y + world.height),
+        list[Point] | None: Конечные точки орбит, если keep_points=True, иначе None.
+                            Изменяет состояние объекта `canvas` напрямую.
+    """
+    rng = RandomBuffer(seed)
+    jitters = [variation.jitter for variation in variations]
+    jittered = any(jitters)
+    angles = np.arange(symmetry) * (2 * np.pi / symmetry)
+    rotations = list(zip(np.cos(angles).tolist(), np.sin(angles).tolist()))
+    # Случайные числа одного сэмпла: начальная точка, номера трансформаций и отклонения по двум осям
+    sequence = None if start_points else sequence
+    start_count = 0 if start_points or sequence else 2
+    per_sample = start_count + iter_per_sample * (3 if jittered else 1)
+    block = max(1, rng.size // per_sample)
+
+    final_points = [] if keep_points else None
+    for first in range(0, samples, block):
+        plotted = 0
+        count = min(block, samples - first)
+        values = rng.uniform(count * per_sample).reshape(count, per_sample)
+        if sequence:
+            start_x, start_y = (coordinates.tolist() for coordinates in sequence.points(world, first, count))
+        elif not start_points:
+            # Генерация случайных точек в пределах области
+            start_x = (world.x + values[:, 0] * world.width).tolist()
+            start_y = (world.y + values[:, 1] * world.height).tolist()
+        choices = (values[:, start_count:start_count + iter_per_sample] * len(variations)).astype(np.intp).tolist()
+        noise = (values[:, start_count + iter_per_sample:] * 2 - 1).tolist() if jittered else None
+
+        for i in range(count):
+            if start_points:
+                pw = start_points[(first + i) % len(start_points)]
+            else:
+                pw = Point(start_x[i], start_y[i])
+            for step, index in enumerate(choices[i]):
+                # Применение случайного преобразования к точке
+                pw = variations[index](pw)
+                if jitters[index]:
+                    pw = Point(pw.x + jitters[index] * noise[i][2 * step],
+                               pw.y + jitters[index] * noise[i][2 * step + 1])
+
+                for cos_theta, sin_theta in rotations:
+                    # Применение симметрии
+                    pwr = Point(
+                        pw.x * cos_theta - pw.y * sin_theta,
+                        pw.x * sin_theta + pw.y * cos_theta,
+                    )
+                    if not world.contains(pwr):
+                        continue
+
+                    # Переводим точку в координаты пикселя на холсте
+                    x = int((pwr.x - world.x) / world.width * canvas.width)
+                    y = int((pwr.y - world.y) / world.height * canvas.height)
+                    if canvas.contains(x, y):
+                        pixel = canvas.pixel(x, y)
+                        pixel.hit_count += 1
+                        pixel.r = min(255, pixel.r + 10)
+                        pixel.g = min(255, pixel.g + 5)
+                        pixel.b = min(255, pixel.b + 5)
+                        plotted += 1
+            if keep_points:
+                final_points.append(pw)
+        progress.report(count, count * iter_per_sample, plotted)
+    return final_points
+
+
+def render_adaptive(
+    canvas: FractalImage,
+    world: Rect,
+    variations: list[Transformation],
+    max_samples: int,
+    iter_per_sample: int,
+    seed: int,
+    symmetry: int = 1,
+    tolerance: float = 1e-3,
+    batch_samples: int | None = None,
+    min_batches: int = 2,
+    sequence: StartSequence | None = None,
+) -> AdaptiveResult:
+    """
+    Рендерит фрактал пакетами до сходимости изображения.
+
+    После каждого пакета вычисляется нормализованная логарифмическая плотность попаданий и её
+    средняя абсолютная разница с предыдущим пакетом. Рендеринг останавливается, как только
+    разница становится меньше `tolerance`, либо когда исчерпан бюджет `max_samples`.
+
+    Параметры:
+        canvas (FractalImage): Холст, на котором происходит рендеринг.
+        world (Rect): Прямоугольная область, в пределах которой генерируются точки.
+        variations (list[Transformation]): Список преобразований, применяемых к точкам.
+        max_samples (int): Максимальное количество генерируемых точек.
+        iter_per_sample (int): Количество итераций для каждой точки.
+        seed (int): Начальное значение генератора случайных чисел (для каждого пакета своё: seed + номер пакета).
+        symmetry (int): Количество симметрий (по умолчанию 1, без симметрии).
+        tolerance (float): Допуск изменения изображения между пакетами (по умолчанию 1e-3).
+        batch_samples (int | None): Размер пакета; по умолчанию max_samples / ADAPTIVE_BATCHES.
+        min_batches (int): Минимальное число пакетов перед проверкой сходимости (по умолчанию 2).
+        sequence (StartSequence | None): Последовательность начальных точек; пакеты берут из неё
+                                         соседние отрезки (по умолчанию точки выбираются случайно).
+
+    Returns:
+        AdaptiveResult: Использованное количество сэмплов, итоговая оценка ошибки и признак сходимости.
+    """
+    if batch_samples is None:
+        batch_samples = max(1, max_samples // ADAPTIVE_BATCHES)
+
+    previous = log_density(hit_counts(canvas))
+    done, batch, error = 0, 0, float("inf")
+    while done < max_samples:
+        batch_size = min(batch_samples, max_samples - done)
+        render(canvas, world, variations, batch_size, iter_per_sample, seed + batch, symmetry,
+               sequence=sequence and sequence.skip(done))
+        done += batch_size
+        batch += 1
+
+        current = log_density(hit_counts(canvas))
+        error = float(np.mean(np.abs(current - previous)))
+        previous = current
+        if batch >= min_batches and error < tolerance:
+            return AdaptiveResult(done, error, True)
+    return AdaptiveResult(done, error, False)
+
+
+def render_progressive(
+    canvas: FractalImage,
+    world: Rect,
+    variations: list[Transformation],
+    samples: int,
+    iter_per_sample: int,
+    seed: int,
+    processor,
+    symmetry: int = 1,
+    batch_samples: int | None = None,
+    preview_every: int = 1,
+    preview_seconds: float | None = None,
+    preview_level: int = 2,
+    tolerance: float | None = None,
+    min_batches: int = 2,
+    sequence: StartSequence | None = None,
+) -> Iterator[Preview]:
+    """
+    Рендерит фрактал пакетами, периодически выдавая уменьшенные кадры предпросмотра.
+
+    Все пакеты накапливаются на одном холсте, поэтому каждый следующий кадр уточняет предыдущий.
+    Кадр строится по уровню `preview_level` пирамиды гистограммы (разрешение уменьшено
+    в 2 ** preview_level раз) и окрашивается процессором `processor` через его метод tone_map.
+    Если задан допуск, рендеринг, как в render_adaptive, останавливается после сходимости,
+    а `samples` служит верхней границей.
+
+    Параметры:
+        canvas (FractalImage): Холст, на котором происходит рендеринг.
+        world (Rect): Прямоугольная область, в пределах которой генерируются точки.
+        variations (list[Transformation]): Список преобразований, применяемых к точкам.
+        samples (int): Общее количество генерируемых точек.
+        iter_per_sample (int): Количество итераций для каждой точки.
+        seed (int): Начальное значение генератора случайных чисел (для каждого пакета своё: seed + номер пакета).
+        processor (LogGammaCorrectionProcessor): Процессор для окрашивания кадров.
+        symmetry (int): Количество симметрий (по умолчанию 1, без симметрии).
+        batch_samples (int | None): Размер пакета; по умолчанию samples / ADAPTIVE_BATCHES.
+        preview_every (int): Выдавать кадр каждые N пакетов (по умолчанию 1).
+        preview_seconds (float | None): Выдавать кадр не реже, чем раз в T секунд.
+        preview_level (int): Уровень пирамиды для кадров (по умолчанию 2, то есть 1/4 разрешения).
+        tolerance (float | None): Допуск изменения изображения между пакетами; None — рендерятся все сэмплы.
+        min_batches (int): Минимальное число пакетов перед проверкой сходимости (по умолчанию 2).
+        sequence (StartSequence | None): Последовательность начальных точек; пакеты берут из неё
+                                         соседние отрезки (по умолчанию точки выбираются случайно).
+
+    Yields:
+        Preview: Кадры предпросмотра; последний кадр отмечен признаком final.
+    """
+    if batch_samples is None:
+        batch_samples = max(1, samples // ADAPTIVE_BATCHES)
+
+    previous = log_density(hit_counts(canvas)) if tolerance is not None else None
+    done, batch, error = 0, 0, None
+    last_preview = time.monotonic()
+    while done < samples:
+        batch_size = min(batch_samples, samples - done)
+        render(canvas, world, variations, batch_size, iter_per_sample, seed + batch, symmetry,
+               sequence=sequence and sequence.skip(done))
+        done += batch_size
+        batch += 1
+
+        hits = hit_counts(canvas)
+        final = done >= samples
+        if tolerance is not None:
+            current = log_density(hits)
+            error = float(np.mean(np.abs(current - previous)))
+            previous = current
+            final = final or (batch >= min_batches and error < tolerance)
+        due_by_time = preview_seconds is not None and time.monotonic() - last_preview >= preview_seconds
+        if final or batch % preview_every == 0 or due_by_time:
+            level = build_pyramid(hits, preview_level)[-1]
+            last_preview = time.monotonic()
+            yield Preview(done, processor.tone_map(level), final, error)
+        if final:
+            return
+
+
+def render_config(canvas: FractalImage, config, seed: int = 42,
+                  sequence: StartSequence | None = None) -> AdaptiveResult | None:
+    """
+    Рендерит одну конфигурацию на холст, выбирая адаптивный режим, если в ней задан допуск.
+
+    Параметры:
+        canvas (FractalImage): Холст, на котором происходит рендеринг.
+        config: Объект конфигурации трансформации.
+        seed (int): Значение для генератора случайных чисел (по умолчанию 42).
+        sequence (StartSequence | None): Отрезок последовательности начальных точек; по умолчанию —
+                                         с начала последовательности config.sampling с зерном seed.
+
+    Returns:
+        AdaptiveResult | None: Результат адаптивного рендеринга или None для фиксированного числа сэмплов.
+    """
+    sequence = sequence or start_sequence(config.sampling, seed)
+    if config.tolerance is None:
+        render(
+            canvas=canvas,
+            world=config.world,
+            variations=[config.transformation],
+            samples=config.samples,
+            iter_per_sample=config.iterations,
+            seed=seed,
+            symmetry=config.symmetry,
+            sequence=sequence,
         )
-        for _ in range(iter_per_sample):
-            # Применение случайного преобразования к точке
-            variation = random.choice(variations)
-            pw = variation(pw)
-
-            for s in range(symmetry):
-                # Применение симметрии
-                theta2 = s * (2 * np.pi / symmetry)
-                pwr = Point(
-                    pw.x * np.cos(theta2) - pw.y * np.sin(theta2),
-                    pw.x * np.sin(theta2) + pw.y * np.cos(theta2),
-                )
-                if not world.contains(pwr):
-                    continue
-
-                # Переводим точку в координаты пикселя на холсте
-                x = int((pwr.x - world.x) / world.width * canvas.width)
-                y = int((pwr.y - world.y) / world.height * canvas.height)
-                if canvas.contains(x, y):
-                    pixel = canvas.pixel(x, y)
-                    pixel.hit_count += 1
-                    pixel.r = min(255, pixel.r + 10)
-                    pixel.g = min(255, pixel.g + 5)
-                    pixel.b = min(255, pixel.b + 5)
+        return None
+    return render_adaptive(
+        canvas=canvas,
+        world=config.world,
+        variations=[config.transformation],
+        max_samples=config.samples,
+        iter_per_sample=config.iterations,
+        seed=seed,
+        symmetry=config.symmetry,
+        tolerance=config.tolerance,
+        sequence=sequence,
+    )
 
 
 def render_single(config, width, height):
@@ -75,15 +336,10 @@ def render_single(config, width, height):
         FractalImage: Отрендеренное изображение.
     """
     canvas = FractalImage(width, height)
-    render(
-        canvas=canvas,
-        world=config.world,
-        variations=[config.transformation],
-        samples=config.samples,
-        iter_per_sample=config.iterations,
-        seed=42,
-        symmetry=config.symmetry,
-    )
+    result = render_config(canvas, config)
+    if result is not None:
+        logger.info("%s: %d сэмплов, оценка ошибки %.2e", config.transformation.__class__.__name__,
+                    result.samples, result.error)
     return canvas
 
 
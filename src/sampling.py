@@ -0,0 +1,220 @@
+"""
+Модуль квазислучайного выбора начальных точек орбит.
+
+Начальные точки, выбранные генератором случайных чисел, ложатся на область неравномерно: при
+умеренном числе сэмплов одни места получают скопления точек, а другие — пропуски. Для коротких
+орбит, когда изображение ещё помнит распределение начальных точек, это заметно как шум.
+Последовательности с низкой неравномерностью (Соболя, Холтона) заполняют квадрат [0, 1)²
+равномерно: первые 2^m точек последовательности Соболя попадают ровно по одной в каждую
+двоичную клетку площади 2^-m, а первые 2^a · 3^b точек Холтона — в каждую клетку сетки
+2^a × 3^b.
+
+Последовательности перемешиваются (scrambling) по зерну, чтобы разные зёрна давали разные,
+но одинаково равномерные наборы точек: у Соболя — случайной нижнетреугольной матрицей
+и цифровым сдвигом, у Холтона — случайной перестановкой цифр в каждом разряде. Точка
+вычисляется по своему номеру, поэтому последовательность генерируется блоками с любого
+места: пакеты адаптивного рендеринга и порции распределённого рендеринга берут соседние
+непересекающиеся отрезки одной последовательности и вместе дают те же точки, что и один
+рендеринг всех сэмплов.
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+SAMPLING_METHODS = ("uniform", "sobol", "halton")
+
+# Число двоичных разрядов координат; номера точек последовательностей меньше 2^POINT_BITS
+POINT_BITS = 32
+# Основания последовательности Холтона, число разрядов (достаточное для номеров меньше 2^POINT_BITS)
+# и число разрядов, переставляемых одной таблицей
+HALTON_BASES = (2, 3)
+HALTON_DIGITS = {2: 32, 3: 25}
+HALTON_GROUP = {2: 8, 3: 5}
+
+
+def _check_range(first: int, count: int):
+    if first < 0 or first + count > 1 << POINT_BITS:
+        raise ValueError(f"Номера точек последовательности должны быть в [0, 2^{POINT_BITS}).")
+
+
+def _sobol_directions() -> list[list[int]]:
+    """
+    Направляющие числа первых двух измерений последовательности Соболя: первое измерение —
+    последовательность ван дер Корпута, второе — многочлен x + 1 (m_k = m_{k-1} xor 2 m_{k-1}).
+    """
+    first = [1 << (POINT_BITS - 1 - k) for k in range(POINT_BITS)]
+    second, m = [], 1
+    for k in range(POINT_BITS):
+        second.append(m << (POINT_BITS - 1 - k))
+        m ^= m << 1
+    return [first, second]
+
+
+def _scramble_directions(directions: list[int], rng: np.random.Generator) -> list[int]:
+    """
+    Умножает направляющие числа на случайную нижнетреугольную двоичную матрицу с единичной
+    диагональю (линейное матричное перемешивание); свойства сети при этом сохраняются.
+    """
+    rows = []
+    for row in range(POINT_BITS):
+        below = int(rng.integers(0, 1 << row)) if row else 0
+        # Разряд j матрицы соответствует биту POINT_BITS - 1 - j числа
+        rows.append(((below << 1) | 1) << (POINT_BITS - 1 - row))
+    scrambled = []
+    for value in directions:
+        bits = 0
+        for row, mask in enumerate(rows):
+            if (mask & value).bit_count() & 1:
+                bits |= 1 << (POINT_BITS - 1 - row)
+        scrambled.append(bits)
+    return scrambled
+
+
+@lru_cache(maxsize=16)
+def _sobol_generator(seed: int | None) -> tuple[list[list[int]], list[int]]:
+    """
+    Возвращает (перемешанные) направляющие числа и цифровые сдвиги измерений для зерна `seed`.
+    """
+    directions = _sobol_directions()
+    if seed is None:
+        return directions, [0] * len(directions)
+    rng = np.random.default_rng(seed)
+    directions = [_scramble_directions(values, rng) for values in directions]
+    return directions, [int(rng.integers(0, 1 << POINT_BITS)) for _ in directions]
+
+
+@lru_cache(maxsize=16)
+def _halton_tables(seed: int | None) -> list[list[np.ndarray]]:
+    """
+    Возвращает для каждого основания таблицы групп разрядов: таблица группы g переводит число
+    из HALTON_GROUP цифр (разряды группы g номера) в вклад этих разрядов, с переставленными
+    цифрами, в числитель обратного радикального числа со знаменателем base ** HALTON_DIGITS.
+    Без перемешивания перестановки тождественные.
+    """
+    rng = np.random.default_rng(seed) if seed is not None else None
+    result = []
+    for base in HALTON_BASES:
+        digits, group = HALTON_DIGITS[base], HALTON_GROUP[base]
+        codes = np.arange(base ** group)
+        tables = []
+        for first in range(0, digits, group):
+            table = np.zeros(codes.size, dtype=np.int64)
+            for position in range(first, first + group):
+                permutation = rng.permutation(base) if rng is not None else np.arange(base)
+                digit = codes // base ** (position - first) % base
+                table += permutation[digit] * base ** (digits - 1 - position)
+            tables.append(table)
+        result.append(tables)
+    return result
+
+
+def sobol_points(first: int, count: int, seed: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Возвращает точки first, ..., first + count - 1 двумерной последовательности Соболя.
+
+    Параметры:
+        first (int): Номер первой точки.
+        count (int): Число точек.
+        seed (int | None): Зерно перемешивания; None — без перемешивания.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Координаты точек в [0, 1).
+
+    Exceptions:
+        ValueError: Если номера точек выходят за 2^32.
+    """
+    _check_range(first, count)
+    directions, shifts = _sobol_generator(seed)
+    index = np.arange(first, first + count, dtype=np.uint64)
+    coordinates = []
+    for values, shift in zip(directions, shifts):
+        bits = np.full(count, shift, dtype=np.uint64)
+        for k, value in enumerate(values):
+            if first + count > 1 << k:
+                bits ^= ((index >> np.uint64(k)) & np.uint64(1)) * np.uint64(value)
+        coordinates.append(bits * 2.0 ** -POINT_BITS)
+    return coordinates[0], coordinates[1]
+
+
+def halton_points(first: int, count: int, seed: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Возвращает точки first, ..., first + count - 1 двумерной последовательности Холтона (основания 2 и 3).
+
+    Параметры:
+        first (int): Номер первой точки.
+        count (int): Число точек.
+        seed (int | None): Зерно перемешивания (случайная перестановка цифр каждого разряда);
+                           None — без перемешивания.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Координаты точек в [0, 1).
+
+    Exceptions:
+        ValueError: Если номера точек выходят за 2^32.
+    """
+    _check_range(first, count)
+    coordinates = []
+    for base, tables in zip(HALTON_BASES, _halton_tables(seed)):
+        size = base ** HALTON_GROUP[base]
+        remaining = np.arange(first, first + count, dtype=np.int64)
+        # Учитываются все разряды и для коротких номеров: перестановка может переводить цифру 0 в ненулевую
+        numerator = np.zeros(count, dtype=np.int64)
+        for table in tables:
+            numerator += table[remaining % size]
+            remaining //= size
+        coordinates.append(numerator / float(base) ** HALTON_DIGITS[base])
+    return coordinates[0], coordinates[1]
+
+
+class StartSequence(NamedTuple):
+    """
+    Отрезок перемешанной последовательности с низкой неравномерностью для начальных точек орбит.
+
+    Атрибуты:
+        method (str): Последовательность: "sobol" или "halton".
+        seed (int): Зерно перемешивания; у всех частей одного рендеринга одинаковое.
+        offset (int): Номер точки последовательности, с которой начинается отрезок (по умолчанию 0).
+
+    Методы:
+        points(world, first, count): Возвращает начальные точки first, ..., first + count - 1 отрезка.
+        skip(samples): Возвращает отрезок, начинающийся на `samples` точек дальше.
+    """
+    method: str
+    seed: int
+    offset: int = 0
+
+    def points(self, world, first: int, count: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Возвращает координаты начальных точек first, ..., first + count - 1 отрезка в области `world`.
+        """
+        generate = sobol_points if self.method == "sobol" else halton_points
+        u, v = generate(self.offset + first, count, self.seed)
+        return world.x + u * world.width, world.y + v * world.height
+
+    def skip(self, samples: int) -> "StartSequence":
+        return self._replace(offset=self.offset + samples)
+
+
+def start_sequence(method: str, seed: int, offset: int = 0) -> StartSequence | None:
+    """
+    Возвращает последовательность начальных точек для способа выбора `method`.
+
+    Параметры:
+        method (str): "uniform", "sobol" или "halton".
+        seed (int): Зерно перемешивания.
+        offset (int): Номер первой точки (по умолчанию 0).
+
+    Returns:
+        StartSequence | None: Последовательность или None для "uniform" (точки выбираются генератором
+                              случайных чисел).
+
+    Exceptions:
+        ValueError: Если способ неизвестен.
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Неизвестный способ выбора начальных точек: {method}. "
+                         f"Допустимые: {', '.join(SAMPLING_METHODS)}")
+    if method == "uniform":
+        return None
+    return StartSequence(method, seed, offset)
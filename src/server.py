@@ -0,0 +1,305 @@
+"""
+Модуль долгоживущего сервера рендеринга фракталов.
+
+Сервер принимает задания по HTTP на локальном адресе, ставит их в очередь с приоритетами,
+рендерит в прогретом пуле процессов и возвращает PNG. Готовые изображения хранятся в кэше,
+ключом которого служит хеш задания, поэтому повторные запросы обслуживаются без рендеринга,
+а одновременные одинаковые запросы ждут один и тот же рендеринг.
+
+Запросы:
+    POST /render — тело задания: список конфигураций в формате fractal_config.json либо объект
+        {"configs": [...], "width": 600, "height": 400, "processor": {...}, "priority": 0, "job_id": "..."}.
+        Меньшее значение priority обслуживается раньше. Ответ — изображение PNG.
+    DELETE /jobs/<job_id> — отмена задания, ожидающего в очереди или выполняющегося.
+    GET /health — размер очереди и кэша.
+
+Запуск:
+    python -m src.server --port 8765 --num_threads 8
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import uuid
+from collections import OrderedDict
+
+from src.cli import parse_server_args
+from src.config_utils import config_from_dict
+from src.pool import RenderPool
+from src.processors import LogGammaCorrectionProcessor
+from src.utils import ImageUtils
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict", 500: "Internal Server Error"}
+
+
+class JobCancelledError(Exception):
+    """
+    Исключение, которым завершается ожидание отменённого задания.
+    """
+
+
+class DuplicateJobError(Exception):
+    """
+    Исключение для задания с идентификатором, уже занятым другим заданием.
+    """
+
+
+def normalize_request(body) -> tuple[dict, int, str | None]:
+    """
+    Приводит тело запроса к заданию с заполненными значениями по умолчанию.
+
+    Параметры:
+        body (list | dict): Список конфигураций или объект задания.
+
+    Returns:
+        tuple[dict, int, str | None]: Задание (configs, width, height, processor), приоритет и идентификатор.
+
+    Exceptions:
+        ValueError: Если в задании нет конфигураций.
+    """
+    if isinstance(body, list):
+        body = {"configs": body}
+    if not isinstance(body, dict) or not body.get("configs"):
+        raise ValueError("Задание должно содержать непустой список конфигураций.")
+    request = {
+        "configs": body["configs"],
+        "width": int(body.get("width", 600)),
+        "height": int(body.get("height", 400)),
+        "processor": body.get("processor", {}),
+    }
+    return request, int(body.get("priority", 0)), body.get("job_id")
+
+
+def request_key(request: dict) -> str:
+    """
+    Возвращает хеш задания, используемый как ключ кэша результатов.
+    """
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+
+def _encode_png(hits, processor: dict) -> bytes:
+    return ImageUtils.array_to_bytes(LogGammaCorrectionProcessor(**processor).tone_map(hits))
+
+
+class RenderJob:
+    """
+    Задание в очереди сервера.
+
+    Атрибуты:
+        job_id (str): Идентификатор задания.
+        key (str): Хеш задания.
+        request (dict): Нормализованное задание.
+        future (asyncio.Future): Результат рендеринга (байты PNG).
+        cancelled (bool): Признак отмены задания.
+    """
+    def __init__(self, job_id: str, key: str, request: dict):
+        self.job_id = job_id
+        self.key = key
+        self.request = request
+        self.future = asyncio.get_running_loop().create_future()
+        self.cancelled = False
+
+
+class RenderServer:
+    """
+    Сервер рендеринга с очередью заданий и кэшем результатов.
+
+    Параметры:
+        pool (RenderPool): Прогретый пул процессов для рендеринга.
+        cache_size (int): Максимальное число изображений в кэше (по умолчанию 256).
+
+    Методы:
+        start(host, port): Запускает HTTP-сервер и обработчики очереди.
+        submit(body): Ставит задание в очередь (или берёт результат из кэша) и возвращает PNG.
+        cancel(job_id): Отменяет задание.
+        close(): Останавливает сервер.
+    """
+    def __init__(self, pool: RenderPool, cache_size: int = 256):
+        self.pool = pool
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.jobs = {}
+        self.jobs_by_key = {}
+        self._sequence = itertools.count()
+        self._queue = None
+        self._dispatchers = []
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765):
+        """
+        Запускает HTTP-сервер и по одному обработчику очереди на рабочий процесс пула.
+
+        Returns:
+            asyncio.Server: Запущенный сервер.
+        """
+        self._queue = asyncio.PriorityQueue()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.pool.processes)]
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def close(self):
+        """
+        Останавливает HTTP-сервер и обработчики очереди.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for dispatcher in self._dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+
+    async def submit(self, body) -> tuple[bytes, bool, str]:
+        """
+        Возвращает PNG для задания, используя кэш и уже выполняющиеся одинаковые задания.
+
+        Параметры:
+            body (list | dict): Тело запроса.
+
+        Returns:
+            tuple[bytes, bool, str]: Байты PNG, признак попадания в кэш и идентификатор задания.
+
+        Exceptions:
+            ValueError: Если задание некорректно.
+            DuplicateJobError: Если идентификатор задания уже занят другим заданием.
+            JobCancelledError: Если задание было отменено.
+        """
+        request, priority, job_id = normalize_request(body)
+        key = request_key(request)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key], True, job_id or key
+
+        job = self.jobs_by_key.get(key)
+        if job_id is not None and job_id in self.jobs and self.jobs[job_id] is not job:
+            raise DuplicateJobError(f"Идентификатор задания {job_id} уже используется.")
+        if job is None:
+            job = RenderJob(job_id or uuid.uuid4().hex, key, request)
+            self.jobs[job.job_id] = job
+            self.jobs_by_key[key] = job
+            await self._queue.put((priority, next(self._sequence), job))
+        return await asyncio.shield(job.future), False, job.job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Отменяет задание. Все ожидающие его клиенты получают ошибку отмены.
+
+        Рендеринг, уже отправленный в пул, доводится до конца, но его результат не окрашивается
+        и не попадает в кэш.
+
+        Returns:
+            bool: True, если задание найдено и отменено.
+        """
+        job = self.jobs.get(job_id)
+        if job is None or job.future.done():
+            return False
+        job.cancelled = True
+        job.future.set_exception(JobCancelledError(f"Задание {job_id} отменено."))
+        self._forget(job)
+        return True
+
+    def _forget(self, job: RenderJob):
+        self.jobs.pop(job.job_id, None)
+        if self.jobs_by_key.get(job.key) is job:
+            del self.jobs_by_key[job.key]
+
+    def _store(self, key: str, png: bytes):
+        self.cache[key] = png
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            if job.cancelled:
+                continue
+            request = job.request
+            try:
+                configs = [config_from_dict(conf) for conf in request["configs"]]
+                pending = self.pool.render_hits_async(configs, request["width"], request["height"])
+                hits = await loop.run_in_executor(None, pending.get)
+                if job.cancelled:
+                    continue
+                png = await loop.run_in_executor(None, _encode_png, hits, request["processor"])
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if job.cancelled:
+                    continue
+                self._store(job.key, png)
+                if not job.future.done():
+                    job.future.set_result(png)
+            finally:
+                self._forget(job)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            if len(request_line) < 2:
+                status, response_headers, payload = 400, {}, b""
+            else:
+                status, response_headers, payload = await self._route(request_line[0], request_line[1], body)
+        except Exception as e:
+            logger.exception("Ошибка обработки запроса")
+            status, response_headers, payload = 500, {}, str(e).encode()
+
+        response_headers.setdefault("Content-Type", "application/json")
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                f"Content-Length: {len(payload)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in response_headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+        writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if method == "POST" and path == "/render":
+            try:
+                png, cached, job_id = await self.submit(json.loads(body or b"null"))
+            except (JobCancelledError, DuplicateJobError) as e:
+                return 409, {}, json.dumps({"error": str(e)}).encode()
+            except (ValueError, KeyError, TypeError) as e:
+                return 400, {}, json.dumps({"error": f"{type(e).__name__}: {e}"}).encode()
+            headers = {"Content-Type": "image/png", "X-Cache": "hit" if cached else "miss", "X-Job-Id": job_id}
+            return 200, headers, png
+        if method == "DELETE" and path.startswith("/jobs/"):
+            cancelled = self.cancel(path[len("/jobs/"):])
+            return (200 if cancelled else 404), {}, json.dumps({"cancelled": cancelled}).encode()
+        if method == "GET" and path == "/health":
+            return 200, {}, json.dumps({"queued": self._queue.qsize(), "cached": len(self.cache)}).encode()
+        return 404, {}, b"{}"
+
+
+async def serve(host: str, port: int, num_threads=None, start_method=None, cache_size: int = 256):
+    """
+    Запускает сервер рендеринга и обслуживает запросы до остановки процесса.
+    """
+    with RenderPool(processes=num_threads, start_method=start_method) as pool:
+        server = RenderServer(pool, cache_size)
+        await server.start(host, port)
+        print(f"Сервер рендеринга запущен: http://{host}:{port}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+
+def main() -> None:
+    args = parse_server_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.num_threads, args.start_method, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
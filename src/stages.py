@@ -0,0 +1,126 @@
+"""
+Модуль конвейера этапов обработки с ограниченными очередями.
+
+Серия изображений (задания пакетного режима, кадры анимации) проходит несколько этапов:
+получение гистограммы из пула процессов, тональное отображение и кодирование файлов. Если
+выполнять этапы по очереди, процессоры простаивают, пока изображение окрашивается и сжимается.
+Конвейер запускает каждый этап в собственных потоках и соединяет этапы очередями ограниченной
+длины: пока изображение N кодируется, изображение N + 1 окрашивается, а следующие рендерятся.
+Заполненная очередь останавливает предыдущий этап, поэтому число изображений в памяти
+ограничено, а пропускная способность определяется самым медленным этапом, а не суммой этапов.
+"""
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+_DONE = object()
+
+
+class Stage(NamedTuple):
+    """
+    Этап конвейера.
+
+    Атрибуты:
+        name (str): Название этапа; под ним в результатах сохраняется время обработки.
+        function (Callable): Функция, преобразующая значение предыдущего этапа.
+        workers (int): Число потоков этапа (по умолчанию 1).
+    """
+    name: str
+    function: Callable
+    workers: int = 1
+
+
+class StageResult(NamedTuple):
+    """
+    Результат обработки одного элемента конвейером.
+
+    Атрибуты:
+        key: Ключ элемента.
+        value: Значение после последнего этапа либо исключение этапа, на котором обработка прервалась.
+        seconds (dict[str, float]): Время обработки элемента каждым пройденным этапом.
+    """
+    key: object
+    value: object
+    seconds: dict
+
+
+def run_stages(items: Iterable[tuple], stages: list[Stage], capacity: int = 2) -> Iterator[StageResult]:
+    """
+    Пропускает элементы через этапы конвейера и выдаёт результаты по мере готовности.
+
+    Элементы читаются из `items` отдельным потоком. Если значение элемента — исключение
+    (например, ошибка разбора задания) или этап завершился исключением, следующие этапы элемент
+    пропускают, а исключение выдаётся в результате. Порядок результатов может отличаться от порядка
+    элементов, если у этапов несколько потоков.
+
+    Параметры:
+        items (Iterable[tuple]): Пары (ключ, значение). Итератор может быть ленивым: очередной элемент
+                                 запрашивается, только когда в очереди первого этапа есть место.
+        stages (list[Stage]): Этапы в порядке выполнения; функции этапов вызываются из рабочих потоков.
+        capacity (int): Длина очереди перед каждым этапом и перед выдачей результатов (по умолчанию 2).
+
+    Yields:
+        StageResult: Результат обработки элемента.
+
+    Exceptions:
+        Exception: Исключение, возникшее при чтении элементов из `items`, передаётся вызывающему
+                   после выдачи результатов уже прочитанных элементов.
+    """
+    queues = [queue.Queue(capacity) for _ in range(len(stages) + 1)]
+    stop = threading.Event()
+    source_error = []
+
+    def feed():
+        try:
+            for key, value in items:
+                if stop.is_set():
+                    break
+                queues[0].put(StageResult(key, value, {}))
+        except Exception as e:
+            source_error.append(e)
+        finally:
+            queues[0].put(_DONE)
+
+    def work(stage: Stage, inbox: queue.Queue, outbox: queue.Queue, remaining: list, lock: threading.Lock):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                # Сигнал завершения нужен и остальным потокам этапа; последний поток передаёт его дальше
+                inbox.put(_DONE)
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        outbox.put(_DONE)
+                return
+            if not isinstance(item.value, Exception):
+                started = time.perf_counter()
+                try:
+                    value = stage.function(item.value)
+                except Exception as e:
+                    value = e
+                item.seconds[stage.name] = time.perf_counter() - started
+                item = item._replace(value=value)
+            outbox.put(item)
+
+    threads = [threading.Thread(target=feed, daemon=True)]
+    for stage, inbox, outbox in zip(stages, queues, queues[1:]):
+        remaining, lock = [stage.workers], threading.Lock()
+        threads += [threading.Thread(target=work, args=(stage, inbox, outbox, remaining, lock), daemon=True)
+                    for _ in range(stage.workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while (item := queues[-1].get()) is not _DONE:
+            yield item
+    finally:
+        # При досрочном закрытии генератора новые элементы не читаются, а уже прочитанные
+        # дообрабатываются (их не больше суммарной длины очередей), чтобы этапы освободили ресурсы
+        stop.set()
+        while item is not _DONE:
+            item = queues[-1].get()
+        for thread in threads:
+            thread.join()
+    if source_error:
+        raise source_error[0]
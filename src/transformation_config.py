@@ -18,9 +18,15 @@ class TransformationConfig(NamedTuple):
         world (Rect): Прямоугольник, определяющий область, в которой будут размещаться точки.
         samples (int): Количество выборок (точек), которые будут преобразованы.
         symmetry (int, по умолчанию 1): Число симметричных повторений каждой трансформированной точки.
+        tolerance (float | None, по умолчанию None): Допуск сходимости адаптивного режима. Если задан,
+            рендеринг идёт пакетами до сходимости изображения, а `samples` задаёт верхнюю границу сэмплов.
+        sampling (str, по умолчанию "uniform"): Выбор начальных точек орбит: случайный ("uniform")
+            или по перемешанной последовательности Соболя ("sobol") либо Холтона ("halton"), см. src.sampling.
     """
     transformation: Transformation
     iterations: int
     world: Rect
     samples: int
     symmetry: int = 1
+    tolerance: float | None = None
+    sampling: str = "uniform"
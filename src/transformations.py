@@ -1,5 +1,6 @@
 import numpy as np
 from src.domain import Point
+from src.expressions import compile_variation
 
 
 class Transformation:
@@ -9,15 +10,32 @@ class Transformation:
     Все подклассы должны реализовать метод __call__, который будет преобразовывать точку.
 
     Атрибуты:
-        None
+        jitter (float): Амплитуда случайного отклонения, которое рендерер добавляет к каждой координате
+                        результата: равномерно распределённое число из [-jitter, jitter] (0 — без отклонений).
+                        Методы __call__ и batch отклонений не добавляют.
 
     Методы:
         __call__(point: Point) -> Point:
             Преобразует точку. Этот метод должен быть переопределен в подклассах.
+        batch(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+            Преобразует массивы координат точек целиком.
     """
+    jitter = 0.0
+
     def __call__(self, point: Point) -> Point:
         raise NotImplementedError("Subclasses must implement this method")
 
+    def batch(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Преобразует массивы координат точек целиком, сохраняя их тип (float32 или float64).
+
+        Реализация по умолчанию вызывает __call__ для каждой точки; подклассы переопределяют
+        метод векторизованной версией.
+        """
+        points = [self(Point(px, py)) for px, py in zip(x.tolist(), y.tolist())]
+        return (np.array([p.x for p in points], dtype=x.dtype),
+                np.array([p.y for p in points], dtype=y.dtype))
+
 
 class SinusoidalTransformation(Transformation):  # Variation 1
     """
@@ -35,12 +53,20 @@ class SinusoidalTransformation(Transformation):  # Variation 1
             np.sin(self.scale_y * point.y),
         )
 
+    def batch(self, x, y):
+        return np.sin(self.scale_x * x), np.sin(self.scale_y * y)
+
 
 class SphericalTransformation(Transformation):  # Variation 2
     def __call__(self, point: Point) -> Point:
         r2 = point.x ** 2 + point.y ** 2
         return Point(point.x / r2, point.y / r2) if r2 != 0 else Point(0, 0)
 
+    def batch(self, x, y):
+        r2 = x ** 2 + y ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(r2 != 0, x / r2, 0), np.where(r2 != 0, y / r2, 0)
+
 
 class SwirlTransformation(Transformation):  # Variation 3
     def __call__(self, point: Point) -> Point:
@@ -50,6 +76,11 @@ class SwirlTransformation(Transformation):  # Variation 3
             point.x * np.cos(r2) + point.y * np.sin(r2),
         )
 
+    def batch(self, x, y):
+        r2 = x ** 2 + y ** 2
+        sin_r2, cos_r2 = np.sin(r2), np.cos(r2)
+        return x * sin_r2 - y * cos_r2, x * cos_r2 + y * sin_r2
+
 
 class PolarTransformation(Transformation):  # Variation 5
     """
@@ -66,6 +97,9 @@ class PolarTransformation(Transformation):  # Variation 5
         theta = np.arctan2(point.y, point.x)
         return Point(theta / np.pi, r - 1)
 
+    def batch(self, x, y):
+        return np.arctan2(y, x) / np.pi, np.sqrt(x ** 2 + y ** 2) - 1
+
 
 class HandkerchiefTransformation(Transformation):  # Variation 6
     def __call__(self, point: Point) -> Point:
@@ -73,6 +107,11 @@ class HandkerchiefTransformation(Transformation):  # Variation 6
         theta = np.arctan2(point.y, point.x)
         return Point(r * np.sin(theta + r), r * np.cos(theta - r))
 
+    def batch(self, x, y):
+        r = np.sqrt(x ** 2 + y ** 2)
+        theta = np.arctan2(y, x)
+        return r * np.sin(theta + r), r * np.cos(theta - r)
+
 
 class HeartTransformation(Transformation):  # Variation 7
     def __call__(self, point: Point) -> Point:
@@ -80,6 +119,11 @@ class HeartTransformation(Transformation):  # Variation 7
         theta = np.arctan2(point.y, point.x)
         return Point(r * np.sin(theta * r), -r * np.cos(theta * r))
 
+    def batch(self, x, y):
+        r = np.sqrt(x ** 2 + y ** 2)
+        theta_r = np.arctan2(y, x) * r
+        return r * np.sin(theta_r), -r * np.cos(theta_r)
+
 
 class DiscTransformation(Transformation):  # Variation 8
     def __call__(self, point: Point) -> Point:
@@ -87,6 +131,11 @@ class DiscTransformation(Transformation):  # Variation 8
         theta = np.arctan2(point.y, point.x)
         return Point(theta / np.pi * np.sin(np.pi * r), theta / np.pi * np.cos(np.pi * r))
 
+    def batch(self, x, y):
+        r = np.sqrt(x ** 2 + y ** 2)
+        theta = np.arctan2(y, x) / np.pi
+        return theta * np.sin(np.pi * r), theta * np.cos(np.pi * r)
+
 
 class SpiralTransformation(Transformation):  # Variation 9
     def __call__(self, point: Point) -> Point:
@@ -97,12 +146,19 @@ class SpiralTransformation(Transformation):  # Variation 9
             (np.sin(theta) - np.cos(r)) / r if r != 0 else 0,
         )
 
+    def batch(self, x, y):
+        r = np.sqrt(x ** 2 + y ** 2)
+        theta = np.arctan2(y, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (np.where(r != 0, (np.cos(theta) + np.sin(r)) / r, 0),
+                    np.where(r != 0, (np.sin(theta) - np.cos(r)) / r, 0))
+
 
 class HyperbolicTransformation(Transformation):  # Variation 10
     """
     Атрибуты:
         scale (float): Масштаб.
-        jitter (float): Параметр для случайных отклонений.
+        jitter (float): Амплитуда случайных отклонений результата (см. Transformation).
     """
     def __init__(self, scale=1.0, jitter=0.01):
         self.scale = scale
@@ -116,12 +172,18 @@ class HyperbolicTransformation(Transformation):  # Variation 10
             np.cos(theta) * r,
         )
 
+    def batch(self, x, y):
+        r = np.sqrt(x ** 2 + y ** 2)
+        theta = np.arctan2(y, x)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(r != 0, np.sin(theta) / r, 0), np.cos(theta) * r
+
 
 class DiamondTransformation(Transformation):  # Variation 11
     """
     Атрибуты:
         scale (float): Масштаб.
-        jitter (float): Параметр для случайных отклонений.
+        jitter (float): Амплитуда случайных отклонений результата (см. Transformation).
     """
     def __init__(self, scale=1.0, jitter=0.07):
         self.scale = scale
@@ -134,6 +196,11 @@ class DiamondTransformation(Transformation):  # Variation 11
         y = self.scale * np.cos(theta) * np.sin(r)
         return Point(x, y)
 
+    def batch(self, x, y):
+        r = np.sqrt(x ** 2 + y ** 2)
+        theta = np.arctan2(y, x)
+        return self.scale * np.sin(theta) * np.cos(r), self.scale * np.cos(theta) * np.sin(r)
+
 
 # === Interesting section ===
 class PopcornTransformation(Transformation):  # Variation 17
@@ -151,6 +218,9 @@ class PopcornTransformation(Transformation):  # Variation 17
         new_y = point.y + self.d * np.sin(np.tan(3 * point.x))
         return Point(new_x, new_y)
 
+    def batch(self, x, y):
+        return x + self.c * np.sin(np.tan(3 * y)), y + self.d * np.sin(np.tan(3 * x))
+
 
 class PDJTransformation(Transformation):  # Variation 24
     """
@@ -168,6 +238,9 @@ class PDJTransformation(Transformation):  # Variation 24
         new_y = np.sin(self.c * point.x) - np.cos(self.d * point.y)
         return Point(new_x, new_y)
 
+    def batch(self, x, y):
+        return np.sin(self.a * y) - np.cos(self.b * x), np.sin(self.c * x) - np.cos(self.d * y)
+
 
 class CurlTransformation(Transformation):  # Variation 39
     """
@@ -184,3 +257,50 @@ class CurlTransformation(Transformation):  # Variation 39
         new_x = (point.x + self.p * point.y) / denom
         new_y = (point.y - self.q * point.x) / denom
         return Point(new_x, new_y)
+
+    def batch(self, x, y):
+        denom = x ** 2 + y ** 2 + 1e-6  # Защита от деления на ноль
+        return (x + self.p * y) / denom, (y - self.q * x) / denom
+
+
+class ExpressionTransformation(Transformation):
+    """
+    Трансформация, заданная формулами новых координат (см. src.expressions).
+
+    Формулы разбираются и компилируются в функцию NumPy один раз на процесс; сама трансформация
+    хранит только текст формул и значения параметров, поэтому сохраняется в конфигурацию
+    и передаётся рабочим процессам как обычная трансформация.
+
+    Атрибуты:
+        x (str): Формула новой координаты X от x, y, r, theta и параметров.
+        y (str): Формула новой координаты Y.
+        params (dict): Значения параметров формул.
+        jitter (float): Амплитуда случайных отклонений результата (см. Transformation).
+    """
+    def __init__(self, x="x", y="y", params=None, jitter=0.0):
+        self.x = x
+        self.y = y
+        self.params = {name: float(value) for name, value in (params or {}).items()}
+        self.jitter = jitter
+        self._compiled()
+
+    def _compiled(self):
+        return compile_variation(self.x, self.y, tuple(sorted(self.params)))
+
+    def __call__(self, point: Point) -> Point:
+        new_x, new_y = self.batch(np.array([point.x], dtype=np.float64), np.array([point.y], dtype=np.float64))
+        return Point(float(new_x[0]), float(new_y[0]))
+
+    def batch(self, x, y):
+        with np.errstate(all="ignore"):
+            new_x, new_y = self._compiled().function(x, y, **self.params)
+        if new_y is new_x:
+            new_y = new_y.copy()
+        return self._result(new_x, x, y), self._result(new_y, x, y)
+
+    @staticmethod
+    def _result(values, x, y):
+        # Формула может не зависеть от координат (скаляр) или совпадать с одной из них (входной массив)
+        if not isinstance(values, np.ndarray) or values.shape != x.shape or values is x or values is y:
+            return np.array(np.broadcast_to(values, x.shape), dtype=x.dtype)
+        return values.astype(x.dtype, copy=False)
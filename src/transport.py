@@ -0,0 +1,99 @@
+"""
+Модуль упаковки массивов попаданий для передачи между процессами и узлами.
+
+Массив передаётся в более компактной из двух форм:
+- разреженной: плоские индексы ненулевых пикселей и их значения;
+- плотной: весь массив, сжатый быстрым кодеком zlib.
+
+Значения приводятся к наименьшему беззнаковому типу, вмещающему максимум. Разреженная форма
+сливается в плотный накопитель напрямую, без восстановления промежуточного массива.
+"""
+import zlib
+
+import numpy as np
+
+# Уровень сжатия zlib: минимальный, так как важна скорость, а не степень сжатия
+COMPRESSION_LEVEL = 1
+
+# Если разреженная форма меньше плотной несжатой во столько раз, плотная форма даже не сжимается
+SPARSE_SHORTCUT_RATIO = 8
+
+
+def pack_hits(hits: np.ndarray) -> tuple:
+    """
+    Упаковывает массив попаданий в разреженную или сжатую плотную форму — какая окажется меньше.
+
+    Параметры:
+        hits (np.ndarray): Массив формы (height, width) с неотрицательным числом попаданий.
+
+    Returns:
+        tuple: ("sparse", форма, индексы, значения) или ("dense", форма, тип элементов, сжатые байты).
+    """
+    flat = np.ascontiguousarray(hits).reshape(-1)
+    indices = np.flatnonzero(flat)
+    value_type = np.min_scalar_type(int(flat[indices].max())) if indices.size else np.dtype(np.uint8)
+    index_type = np.uint32 if flat.size <= np.iinfo(np.uint32).max else np.uint64
+
+    sparse = ("sparse", hits.shape, indices.astype(index_type), flat[indices].astype(value_type))
+    sparse_size = sparse[2].nbytes + sparse[3].nbytes
+    dense_raw_size = flat.size * value_type.itemsize
+    if sparse_size * SPARSE_SHORTCUT_RATIO <= dense_raw_size:
+        return sparse
+
+    data = zlib.compress(flat.astype(value_type).tobytes(), COMPRESSION_LEVEL)
+    if sparse_size <= len(data):
+        return sparse
+    return "dense", hits.shape, value_type.str, data
+
+
+def payload_size(payload: tuple) -> int:
+    """
+    Возвращает размер данных упакованного массива в байтах.
+    """
+    if payload[0] == "sparse":
+        return payload[2].nbytes + payload[3].nbytes
+    return len(payload[3])
+
+
+def unpack_hits(payload: tuple) -> np.ndarray:
+    """
+    Распаковывает массив попаданий, упакованный функцией pack_hits.
+
+    Параметры:
+        payload (tuple): Упакованный массив.
+
+    Returns:
+        np.ndarray: Плотный массив попаданий.
+    """
+    shape = payload[1]
+    hits = np.zeros(shape, dtype=np.int64)
+    merge_hits(hits, payload)
+    return hits
+
+
+def merge_hits(accumulator: np.ndarray, payload: tuple):
+    """
+    Добавляет упакованный массив попаданий в плотный накопитель.
+
+    Для разреженной формы изменяются только ненулевые пиксели.
+
+    Параметры:
+        accumulator (np.ndarray): Непрерывный плотный массив формы (height, width).
+        payload (tuple): Упакованный массив той же формы.
+
+    Returns:
+        None. Изменяет накопитель напрямую.
+
+    Exceptions:
+        ValueError: Если формы накопителя и упакованного массива не совпадают или накопитель не непрерывен.
+    """
+    kind, shape = payload[0], tuple(payload[1])
+    if shape != accumulator.shape:
+        raise ValueError(f"Форма массива {shape} не совпадает с формой накопителя {accumulator.shape}")
+    if not accumulator.flags.c_contiguous:
+        raise ValueError("Накопитель должен быть непрерывным массивом.")
+    flat = accumulator.reshape(-1)
+    if kind == "sparse":
+        flat[payload[2]] += payload[3].astype(flat.dtype, copy=False)
+    else:
+        flat += np.frombuffer(zlib.decompress(payload[3]), dtype=payload[2]).astype(flat.dtype, copy=False)
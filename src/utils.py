@@ -1,3 +1,6 @@
+import io
+
+import numpy as np
 from PIL import Image
 from pathlib import Path
 from src.domain import FractalImage
@@ -12,13 +15,40 @@ class ImageUtils:
     в различные форматы и для применения обработки изображений перед сохранением.
 
     Методы:
+        to_pil(image: FractalImage):
+            Создаёт изображение PIL из цветов пикселей фрактала.
+
         save(image: FractalImage, filename: Path, format: str = "PNG"):
             Сохраняет изображение фрактала в файл с указанным именем и форматом.
 
         save_with_processing(image: FractalImage, processor: ImageProcessor, filename: Path, format: str = "PNG"):
             Применяет обработку изображения с помощью указанного процессора и сохраняет результат.
+
+        to_bytes(image: FractalImage, format: str = "PNG"):
+            Кодирует изображение фрактала в байты указанного формата.
+
+        save_array(rgb: np.ndarray, filename: Path, format: str = "PNG"):
+            Сохраняет массив RGB в файл.
+
+        array_to_bytes(rgb: np.ndarray, format: str = "PNG"):
+            Кодирует массив RGB в байты указанного формата.
     """
 
+    @staticmethod
+    def to_pil(image: FractalImage) -> Image.Image:
+        """
+        Создаёт изображение PIL из цветов пикселей фрактала.
+
+        Параметры:
+            image (FractalImage): Изображение фрактала.
+
+        Returns:
+            Image.Image: RGB-изображение PIL.
+        """
+        img = Image.new("RGB", (image.width, image.height))
+        img.putdata([(pixel.r, pixel.g, pixel.b) for row in image.data for pixel in row])
+        return img
+
     @staticmethod
     def save(image: FractalImage, filename: Path, format: str = "PNG"):
         """
@@ -32,12 +62,23 @@ class ImageUtils:
         Примечание:
             Каждый пиксель в изображении сохраняется с использованием цветовых значений RGB.
         """
-        img = Image.new("RGB", (image.width, image.height))
-        for y in range(image.height):
-            for x in range(image.width):
-                pixel = image.pixel(x, y)
-                img.putpixel((x, y), (pixel.r, pixel.g, pixel.b))
-        img.save(filename, format=format)
+        ImageUtils.to_pil(image).save(filename, format=format)
+
+    @staticmethod
+    def to_bytes(image: FractalImage, format: str = "PNG") -> bytes:
+        """
+        Кодирует изображение фрактала в байты указанного формата.
+
+        Параметры:
+            image (FractalImage): Изображение фрактала.
+            format (str, по умолчанию "PNG"): Формат изображения.
+
+        Returns:
+            bytes: Закодированное изображение.
+        """
+        buffer = io.BytesIO()
+        ImageUtils.to_pil(image).save(buffer, format=format)
+        return buffer.getvalue()
 
     @staticmethod
     def save_with_processing(image: FractalImage, processor: ImageProcessor, filename: Path, format: str = "PNG"):
@@ -52,3 +93,31 @@ class ImageUtils:
         """
         processor.process(image)
         ImageUtils.save(image, filename, format)
+
+    @staticmethod
+    def save_array(rgb: np.ndarray, filename: Path, format: str = "PNG"):
+        """
+        Сохраняет массив RGB в файл.
+
+        Параметры:
+            rgb (np.ndarray): Массив формы (height, width, 3) типа uint8.
+            filename (Path): Путь к файлу, в который будет сохранено изображение.
+            format (str, по умолчанию "PNG"): Формат изображения.
+        """
+        Image.fromarray(rgb).save(filename, format=format)
+
+    @staticmethod
+    def array_to_bytes(rgb: np.ndarray, format: str = "PNG") -> bytes:
+        """
+        Кодирует массив RGB в байты указанного формата.
+
+        Параметры:
+            rgb (np.ndarray): Массив формы (height, width, 3) типа uint8.
+            format (str, по умолчанию "PNG"): Формат изображения.
+
+        Returns:
+            bytes: Закодированное изображение.
+        """
+        buffer = io.BytesIO()
+        Image.fromarray(rgb).save(buffer, format=format)
+        return buffer.getvalue()
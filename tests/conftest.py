@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_profile(tmp_path, monkeypatch):
+    # Профиль машины из домашнего каталога не должен влиять на тесты
+    monkeypatch.setenv("FRACTAL_PROFILE", str(tmp_path / "profile.json"))
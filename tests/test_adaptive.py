@@ -0,0 +1,51 @@
+"""
+Тест адаптивного и прогрессивного рендеринга.
+
+Описание:
+Проверяется, что адаптивный режим останавливается после сходимости изображения, не исчерпав
+бюджет сэмплов, и сообщает использованное количество сэмплов и оценку ошибки, а прогрессивный
+режим выдаёт уменьшенные кадры предпросмотра, уточняя один и тот же холст.
+"""
+from src.domain import Rect, FractalImage
+from src.processors import LogGammaCorrectionProcessor
+from src.renderer import render_adaptive, render_progressive
+from src.transformations import SinusoidalTransformation
+
+
+def test_adaptive_render_stops_on_convergence():
+    canvas = FractalImage(60, 40)
+    max_samples = 100000
+
+    result = render_adaptive(canvas, Rect(-1, -1, 2, 2), [SinusoidalTransformation(3.0, 8.0)], max_samples, 8,
+                             seed=42, tolerance=2e-2, batch_samples=2000)
+
+    assert result.converged
+    assert result.samples < max_samples
+    assert result.error < 2e-2
+    assert sum(pixel.hit_count for row in canvas.data for pixel in row) > 0
+
+
+def test_progressive_render_refines_one_canvas():
+    canvas = FractalImage(64, 48)
+    processor = LogGammaCorrectionProcessor()
+
+    previews = list(render_progressive(canvas, Rect(-1, -1, 2, 2), [SinusoidalTransformation(3.0, 8.0)], 4000, 8,
+                                       seed=42, processor=processor, batch_samples=1000, preview_every=2))
+
+    assert [preview.samples for preview in previews] == [2000, 4000]
+    assert [preview.final for preview in previews] == [False, True]
+    assert previews[-1].image.shape == (12, 16, 3)
+    assert sum(pixel.hit_count for row in canvas.data for pixel in row) > 0
+
+
+def test_progressive_render_stops_on_convergence():
+    canvas = FractalImage(60, 40)
+    max_samples = 100000
+
+    previews = list(render_progressive(canvas, Rect(-1, -1, 2, 2), [SinusoidalTransformation(3.0, 8.0)], max_samples,
+                                       8, seed=42, processor=LogGammaCorrectionProcessor(), batch_samples=2000,
+                                       tolerance=2e-2))
+
+    assert previews[-1].final
+    assert previews[-1].samples < max_samples
+    assert previews[-1].error < 2e-2
@@ -0,0 +1,68 @@
+"""
+Тест размещения рабочих процессов по ядрам и узлам NUMA.
+
+Описание:
+Проверяется разбор списков процессоров и топологии узлов, поочерёдное распределение процессов
+по узлам, закрепление процессов пула за ядрами и совпадение суммирования результатов по узлам
+с прямым суммированием.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from src.affinity import allowed_cpus, numa_nodes, parse_cpulist, plan_placement
+from src.pool import RenderPool, _merge_results
+from src.transport import pack_hits
+from tests.test_pool import CONFIGS
+
+
+def _worker_cpus(_):
+    return os.sched_getaffinity(0)
+
+
+def test_parse_topology(tmp_path):
+    assert parse_cpulist("0-3,8-9,12\n") == {0, 1, 2, 3, 8, 9, 12}
+    cpus = sorted(allowed_cpus())
+    for node, cpulist in enumerate([f"{cpus[0]}", f"{cpus[-1] + 100}"]):
+        (tmp_path / f"node{node}").mkdir()
+        (tmp_path / f"node{node}" / "cpulist").write_text(cpulist)
+
+    # Узел без доступных процессоров пропускается, без топологии все процессоры — один узел
+    assert numa_nodes(tmp_path) == [frozenset([cpus[0]])]
+    assert numa_nodes(tmp_path / "missing") == [frozenset(cpus)]
+
+
+def test_plan_spreads_workers_over_nodes():
+    nodes = [frozenset({0, 1}), frozenset({2, 3})]
+
+    assert plan_placement(5, "core", nodes) == [
+        (0, {0}), (1, {2}), (0, {1}), (1, {3}), (0, {0})]
+    assert plan_placement(3, "node", nodes) == [(0, nodes[0]), (1, nodes[1]), (0, nodes[0])]
+    assert plan_placement(3, "none", nodes) == []
+    with pytest.raises(ValueError):
+        plan_placement(2, "socket", nodes)
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="нет os.sched_setaffinity")
+def test_pool_pins_workers():
+    with RenderPool(processes=2, affinity="core") as pool:
+        planned = [cpus for _, cpus in pool.placement]
+        assert all(cpus in planned for cpus in pool.imap_unordered(_worker_cpus, range(8)))
+        hits = pool.render_hits(CONFIGS, 40, 30)
+    with RenderPool(processes=2) as pool:
+        assert np.array_equal(hits, pool.render_hits(CONFIGS, 40, 30))
+
+
+def test_node_reduction_matches_direct_merge():
+    rng = np.random.default_rng(3)
+    arrays = [rng.integers(0, 5, (30, 40)) * (rng.random((30, 40)) < 0.2) for _ in range(6)]
+    results = [(index, pack_hits(hits), None, 1.0, index % 2) for index, hits in enumerate(arrays)]
+    cpus = frozenset(allowed_cpus())
+
+    direct, by_node = np.zeros((30, 40), dtype=np.int64), np.zeros((30, 40), dtype=np.int64)
+    _merge_results(direct, results)
+    _, seconds = _merge_results(by_node, results, [cpus, cpus])
+
+    assert np.array_equal(by_node, direct) and np.array_equal(direct, sum(arrays))
+    assert seconds == 6.0
@@ -0,0 +1,122 @@
+"""
+Тест рендеринга анимации по ключевым кадрам.
+
+Описание:
+Проверяется интерполяция параметров между ключевыми кадрами, то, что все кадры анимации
+сохраняются в виде пронумерованной последовательности PNG, что кадры приходят из пула по порядку
+и не зависят от числа процессов, что пул рендерит следующий кадр, пока полученный обрабатывается,
+и что поток rawvideo содержит те же кадры в порядке номеров.
+"""
+import io
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src import progress
+from src.animation import frame_spec, render_animation, rendered_frames, stream_animation
+from src.pool import RenderPool
+from src.rawvideo import RawVideoWriter
+from src.transport import unpack_hits
+
+
+def _config(a, world_width, samples):
+    return {
+        "transformation": "PDJTransformation",
+        "params": {"a": a, "b": 1.2, "c": 1.0, "d": 1.5},
+        "iterations": 8,
+        "world": {"x": -world_width / 2, "y": -1.5, "width": world_width, "height": 3},
+        "samples": samples,
+        "symmetry": 1,
+    }
+
+
+ANIMATION = {
+    "frames": 5,
+    "width": 40,
+    "height": 30,
+    "keyframes": [
+        {"frame": 0, "configs": [_config(1.0, 3.0, 500)], "processor": {"gamma": 2.0, "colormap": "inferno"}},
+        {"frame": 4, "configs": [_config(2.0, 4.0, 1000)], "processor": {"gamma": 3.0, "colormap": "plasma"}},
+    ],
+}
+
+
+def test_frame_spec_interpolation():
+    spec = frame_spec(ANIMATION["keyframes"], 1)
+    config = spec["configs"][0]
+
+    assert config["params"]["a"] == 1.25
+    assert config["world"]["width"] == 3.25
+    assert config["samples"] == 625
+    assert spec["processor"] == {"gamma": 2.25, "colormap": "inferno"}
+    assert frame_spec(ANIMATION["keyframes"], 4)["processor"]["colormap"] == "plasma"
+
+
+def test_render_animation(tmp_path):
+    with RenderPool(processes=2) as pool:
+        paths = render_animation(ANIMATION, tmp_path, pool, chains=2)
+
+    assert [path.name for path in paths] == [f"frame_{frame:04d}.png" for frame in range(5)]
+    assert all(path.exists() for path in paths)
+
+
+@pytest.mark.parametrize("chains, lookahead", [(1, None), (3, 1)])
+def test_frames_arrive_in_order_for_any_pool_size(chains, lookahead):
+    def render(processes):
+        with RenderPool(processes=processes) as pool:
+            return list(rendered_frames(ANIMATION, pool, chains, lookahead=lookahead))
+
+    single, parallel = render(1), render(2)
+
+    assert [frame for frame, _, _ in parallel] == list(range(5))
+    assert all(np.array_equal(unpack_hits(a[1]), unpack_hits(b[1])) for a, b in zip(single, parallel))
+
+
+def test_pool_renders_next_frames_while_frame_is_processed():
+    with RenderPool(processes=1) as pool:
+        frames = rendered_frames(ANIMATION, pool, chains=1)
+        next(frames)
+        # Пока полученный кадр обрабатывается, следующий кадр цепочки уже рендерится в пуле
+        time.sleep(0.5)
+        samples = pool.progress.snapshot()[:, progress.SAMPLES].sum()
+        frames.close()
+
+    first, second = (frame_spec(ANIMATION["keyframes"], frame)["configs"][0]["samples"] for frame in (0, 1))
+    assert samples == first + second
+
+
+def test_stream_animation_matches_png_frames(tmp_path):
+    stream = io.BytesIO()
+    # Кадры приходят по порядку, поэтому ни один кадр не ждёт записи предыдущих
+    writer = RawVideoWriter(stream, ANIMATION["width"], ANIMATION["height"], fps=12, max_pending=0)
+    with RenderPool(processes=2) as pool:
+        paths = render_animation(ANIMATION, tmp_path, pool, chains=3)
+        assert stream_animation(ANIMATION, writer, pool, chains=3) == 5
+
+    expected = b"".join(np.asarray(Image.open(path).convert("RGB")).tobytes() for path in paths)
+    assert stream.getvalue() == expected
+    assert writer.encoder_args("-")[:8] == ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", "40x30", "-r", "12"]
+
+
+def test_raw_writer_orders_frames_and_checks_shape():
+    frames = [np.full((2, 3, 3), frame, dtype=np.uint8) for frame in range(3)]
+    stream = io.BytesIO()
+    writer = RawVideoWriter(stream, 3, 2)
+
+    writer.write(1, frames[1])
+    assert stream.getvalue() == b""
+    writer.write(0, frames[0])
+    assert stream.getvalue() == frames[0].tobytes() + frames[1].tobytes()
+    with pytest.raises(ValueError):
+        writer.write(2, np.zeros((3, 2, 3), dtype=np.uint8))
+    writer.write(3, frames[2])
+    with pytest.raises(ValueError):
+        writer.close()
+
+    limited = RawVideoWriter(io.BytesIO(), 3, 2, max_pending=1)
+    limited.write(2, frames[2])
+    with pytest.raises(ValueError):
+        limited.write(1, frames[1])
+    limited.write(0, frames[0])
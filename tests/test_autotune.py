@@ -0,0 +1,51 @@
+"""
+Тест автоматической настройки параметров рендеринга.
+
+Описание:
+Проверяется сохранение профилей нескольких машин в одном файле, пропуск повреждённого файла
+и то, что калибровка выбирает параметры из проверенных значений и сохраняет профиль текущей машины.
+"""
+from src.autotune import (BATCH_SIZES, TILE_SIZES, Profile, _doubling, autotune, load_profile, machine_key,
+                          save_profile)
+from src.engine import TILE_BYTES
+
+
+def test_profiles_are_kept_per_machine(tmp_path):
+    path = tmp_path / "profiles.json"
+    fast = Profile("fast node", "numpy", 32, 16384, 4, 1 << 18, 1e7)
+    small = Profile("small node", "jit", 2)
+    save_profile(fast, path)
+    save_profile(small, path)
+    save_profile(fast._replace(workers=16), path)
+
+    assert load_profile(path, "fast node") == fast._replace(workers=16)
+    assert load_profile(path, "small node") == small
+    assert load_profile(path, "other node") is None
+    assert small.engine_options(precision="float32") == small.engine_options()._replace(precision="float32")
+
+
+def test_broken_profile_file_is_ignored(tmp_path, capsys):
+    path = tmp_path / "profiles.json"
+    path.write_text("{not json")
+
+    assert load_profile(path) is None
+    assert "не используется" in capsys.readouterr().out
+    assert load_profile(tmp_path / "missing.json") is None
+
+
+def test_doubling():
+    assert _doubling(1) == [1]
+    assert _doubling(6) == [1, 2, 4, 6]
+    assert _doubling(8) == [1, 2, 4, 8]
+
+
+def test_autotune_saves_profile_for_this_machine(tmp_path):
+    profile = autotune(samples=4000, width=40, height=30, max_workers=2, repeats=1)
+    save_profile(profile, tmp_path / "profiles.json")
+
+    assert profile.machine == machine_key()
+    assert profile.batch_size in BATCH_SIZES
+    assert profile.workers in (1, 2)
+    assert profile.tile_bytes in TILE_SIZES + (TILE_BYTES,)
+    assert profile.samples_per_second > 0
+    assert load_profile(tmp_path / "profiles.json") == profile
@@ -0,0 +1,53 @@
+"""
+Тест пакетного рендеринга по манифесту заданий.
+
+Описание:
+Манифест содержит задание с конфигурациями в файле, задание со встроенными конфигурациями
+и двумя выходами и некорректные задания. Проверяется, что корректные задания сохранены, а для каждого задания
+в файл результатов записан статус.
+"""
+import json
+
+import pytest
+
+from src.batch import run_batch
+
+CONFIG = {
+    "transformation": "PDJTransformation",
+    "params": {"a": 1.0, "b": 1.2, "c": 1.0, "d": 1.5},
+    "iterations": 8,
+    "world": {"x": -1.5, "y": -1.5, "width": 3, "height": 3},
+    "samples": 2000,
+    "symmetry": 1,
+}
+
+
+def test_run_batch(tmp_path):
+    (tmp_path / "config.json").write_text(json.dumps([CONFIG]))
+    jobs = [
+        {"id": "from-file", "config_file": "config.json", "width": 60, "height": 40, "output": "out/a.png"},
+        {"id": "inline", "configs": [CONFIG], "width": 50, "height": 50,
+         "processor": {"gamma": 2.2, "colormap": "plasma"}, "output": "out/b.png",
+         "outputs": [{"output": "out/b-small.webp", "width": 20}]},
+        {"id": "broken", "width": 50, "height": 50, "output": "out/c.png"},
+        {"id": "missing-file", "config_file": "missing.json", "width": 50, "height": 50, "output": "out/d.png"},
+    ]
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text("\n".join(json.dumps(job) for job in jobs))
+    results_path = tmp_path / "results.jsonl"
+
+    summary = run_batch(manifest, results_path, num_threads=2, max_in_flight=1)
+
+    records = {r["id"]: r for r in map(json.loads, results_path.read_text().splitlines())}
+    assert summary == {"ok": 2, "error": 2}
+    assert records["from-file"]["status"] == "ok"
+    assert records["inline"]["status"] == "ok"
+    assert records["broken"]["status"] == "error"
+    assert records["missing-file"]["error"].startswith("FileNotFoundError")
+    assert 0 < records["inline"]["render_seconds"] <= records["inline"]["wait_seconds"]
+    assert records["inline"]["save_seconds"] == pytest.approx(
+        records["inline"]["tone_map_seconds"] + records["inline"]["encode_seconds"], abs=1e-3)
+    assert (tmp_path / "out/a.png").exists()
+    assert (tmp_path / "out/b.png").exists()
+    assert records["inline"]["outputs"] == [str(tmp_path / "out/b.png"), str(tmp_path / "out/b-small.webp")]
+    assert (tmp_path / "out/b-small.webp").exists()
@@ -0,0 +1,42 @@
+"""
+Тест таблиц цветовых карт.
+
+Описание:
+Проверяется, что сохранённые таблицы окрашивают значения так же, как карты matplotlib,
+что файл таблиц соответствует текущей версии matplotlib и что запуск программы и рабочих
+процессов не импортирует matplotlib.
+"""
+import subprocess
+import sys
+
+import matplotlib
+import numpy as np
+import pytest
+
+from src.colormaps import LUT_FILE, NAMED_COLORMAPS, apply_lut, build_lut, get_lut
+
+
+@pytest.mark.parametrize("name", ["inferno", "plasma", "tab10"])
+def test_lut_matches_matplotlib(name):
+    values = np.concatenate([np.linspace(-0.5, 1.5, 2001), [0.0, 1.0, 0.999999]])
+    expected = np.minimum(255, matplotlib.colormaps.get_cmap(name)(values)[:, :3] * 255).astype(np.uint8)
+    assert np.array_equal(apply_lut(get_lut(name), values), expected)
+
+
+def test_lut_file_is_up_to_date():
+    with np.load(LUT_FILE) as data:
+        assert sorted(data.files) == sorted(NAMED_COLORMAPS)
+        for name in NAMED_COLORMAPS:
+            assert np.array_equal(data[name], build_lut(name))
+
+
+def test_startup_does_not_import_matplotlib():
+    code = (
+        "import sys\n"
+        "import numpy as np\n"
+        "import src.main, src.batch, src.server\n"
+        "from src.processors import LogGammaCorrectionProcessor\n"
+        "LogGammaCorrectionProcessor(colormap='plasma').tone_map(np.arange(12).reshape(3, 4))\n"
+        "assert 'matplotlib' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,53 @@
+"""
+Тест распределённого рендеринга.
+
+Описание:
+Координатор и рабочие запускаются в локальных процессах. Проверяется, что все сэмплы
+конфигураций обработаны, а результат совпадает с рендерингом тех же порций в одном процессе.
+Также проверяется, что координатор без рабочих завершается по таймауту, а сетевой адрес
+с ключом аутентификации по умолчанию отвергается.
+"""
+import pytest
+
+from src.distributed import Coordinator, render_distributed_local, split_chunks
+from src.config_utils import config_from_dict
+from src.domain import Rect, FractalImage
+from src.histogram import hit_counts
+from src.renderer import render_config
+from src.transformation_config import TransformationConfig
+from src.transformations import PDJTransformation, SpiralTransformation
+
+CONFIGS = [
+    TransformationConfig(PDJTransformation(1.0, 1.2, 1.0, 1.5), 8, Rect(-1.5, -1.5, 3, 3), 2500),
+    TransformationConfig(SpiralTransformation(), 4, Rect(-1.5, -1.5, 3, 3), 1500, 2),
+]
+
+
+def test_split_chunks_covers_all_samples():
+    chunks = split_chunks(CONFIGS, 40, 30, chunk_samples=1000)
+
+    assert sum(chunk["config"]["samples"] for chunk in chunks) == 4000
+    assert len({chunk["seed"] for chunk in chunks}) == len(chunks)
+
+
+def test_render_distributed_local():
+    width, height = 40, 30
+    expected = FractalImage(width, height)
+    for chunk in split_chunks(CONFIGS, width, height, chunk_samples=1000):
+        render_config(expected, config_from_dict(chunk["config"]), seed=chunk["seed"])
+
+    canvas = render_distributed_local(CONFIGS, width, height, num_workers=2, chunk_samples=1000)
+
+    assert (hit_counts(canvas) == hit_counts(expected)).all()
+
+
+def test_coordinator_times_out_without_workers():
+    coordinator = Coordinator(CONFIGS, 40, 30, chunk_samples=1000)
+
+    with pytest.raises(TimeoutError):
+        coordinator.run(timeout=0.5)
+
+
+def test_coordinator_requires_authkey_for_network_address():
+    with pytest.raises(ValueError):
+        Coordinator(CONFIGS, 40, 30, address=("0.0.0.0", 0))
@@ -0,0 +1,148 @@
+"""
+Тест векторизованного движка рендеринга.
+
+Описание:
+Проверяется, что пакетные трансформации совпадают с поточечными и сохраняют точность входных
+массивов, что движок с точностью float32 даёт изображение, близкое к float64, и что счётчики
+попаданий автоматически расширяются при угрозе переполнения, а несколько областей просмотра
+получают те же попадания, что и отдельный рендеринг. Для JIT-ядра проверяется совпадение
+с векторизованным движком и переход на движок NumPy, если Numba не установлен.
+"""
+import numpy as np
+import pytest
+
+from src.domain import Point, Rect
+from src import engine, jit
+from src.engine import (
+    ACCUMULATORS,
+    EngineOptions,
+    Histogram,
+    Viewport,
+    apply_variations,
+    pixel_indices,
+    render_batched,
+    render_config_batched,
+    render_viewports,
+)
+from src.histogram import log_density
+from src.transformation_config import TransformationConfig
+from src.transformations import (
+    DiamondTransformation,
+    ExpressionTransformation,
+    HyperbolicTransformation,
+    PolarTransformation,
+    SphericalTransformation,
+    SwirlTransformation,
+)
+
+
+@pytest.mark.parametrize("transformation", [
+    SwirlTransformation(), PolarTransformation(2.5, 1.0), SphericalTransformation(),
+    HyperbolicTransformation(0.8), DiamondTransformation(0.6),
+    ExpressionTransformation("a * x * sin(r * r) - y / (1 + r)", "cos(theta) ** 2 - y", {"a": 1.5}),
+])
+def test_batch_matches_pointwise(transformation):
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-1, 1, 50), rng.uniform(-1, 1, 50)
+
+    new_x, new_y = transformation.batch(x, y)
+    expected = [transformation(Point(xi, yi)) for xi, yi in zip(x.tolist(), y.tolist())]
+
+    assert np.allclose(new_x, [point.x for point in expected])
+    assert np.allclose(new_y, [point.y for point in expected])
+    assert transformation.batch(x.astype(np.float32), y.astype(np.float32))[0].dtype == np.float32
+
+
+def test_float32_render_matches_float64():
+    config = TransformationConfig(SwirlTransformation(), 5, Rect(-1, -1, 2, 2), 20000, 2)
+    densities = {}
+    for precision in ("float32", "float64"):
+        histogram = Histogram(120, 80, "uint32")
+        render_config_batched(histogram, config, options=EngineOptions(precision=precision))
+        densities[precision] = log_density(histogram.hits)
+
+    assert histogram.hits.sum() > 0
+    assert np.mean(np.abs(densities["float32"] - densities["float64"])) < 0.05
+
+
+@pytest.mark.parametrize("accumulator,limit,wider", [("uint32", 2 ** 32 - 1, np.uint64), ("float32", 2 ** 24, np.float64)])
+def test_histogram_promotes_before_overflow(accumulator, limit, wider):
+    histogram = Histogram(4, 2, accumulator)
+    counts = np.zeros(8, dtype=np.uint64)
+    counts[0] = limit - 1
+    histogram.add_counts(counts)
+    assert histogram.hits.dtype == ACCUMULATORS[accumulator]
+
+    histogram.add(np.zeros(3, dtype=np.int64))
+
+    assert histogram.hits.dtype == wider
+    assert histogram.hits[0, 0] == limit + 2
+
+
+def test_viewports_share_iterations():
+    full, inset = Rect(-1, -1, 2, 2), Rect(-0.25, -0.25, 0.5, 0.5)
+    variations = [SwirlTransformation(), PolarTransformation(2.5, 1.0)]
+    expected = Histogram(60, 40)
+    render_batched(expected, full, variations, 3000, 6, seed=9, symmetry=2)
+    alone = Histogram(30, 30)
+    render_viewports([Viewport(inset, alone)], variations, 3000, 6, seed=9, symmetry=2, start_world=full)
+
+    views = [Viewport(full, Histogram(60, 40)), Viewport(inset, Histogram(30, 30)), Viewport(full, Histogram(12, 8))]
+    render_viewports(views, variations, 3000, 6, seed=9, symmetry=2)
+
+    assert np.array_equal(views[0].histogram.hits, expected.hits)
+    assert np.array_equal(views[1].histogram.hits, alone.hits)
+    assert views[2].histogram.hits.sum() == expected.hits.sum()
+
+
+@pytest.mark.parametrize("tile_threads", [2, 3, 20])
+def test_tiled_accumulation_matches_direct(monkeypatch, tile_threads):
+    monkeypatch.setattr(engine, "TILED_MIN_PIXELS", 0)
+    monkeypatch.setattr(engine, "TILE_BYTES", 4 * 50 * 3)
+    rng = np.random.default_rng(2)
+    indices = np.concatenate([rng.integers(0, 50 * 40, 100), rng.integers(0, 50 * 5, 100)])
+    calls = []
+    add_tiled = Histogram._add_tiled
+    monkeypatch.setattr(Histogram, "_add_tiled", lambda self, *args: calls.append(add_tiled(self, *args)))
+
+    histogram = Histogram(50, 40, tile_threads=tile_threads)
+    histogram.add(indices)
+    histogram.add(indices[:100])
+
+    expected = np.bincount(np.concatenate([indices, indices[:100]]), minlength=50 * 40).reshape(40, 50)
+    assert len(calls) == 2
+    assert np.array_equal(histogram.hits, expected)
+
+
+def test_jit_kernel_matches_numpy_engine():
+    world, width, height = Rect(-1, -1, 2, 2), 40, 30
+    variations = [SwirlTransformation()]
+    rng = np.random.default_rng(1)
+    xs, ys = rng.uniform(-1, 1, 200), rng.uniform(-1, 1, 200)
+    angles = np.array([0.0, np.pi])
+
+    expected = Histogram(width, height, "uint64")
+    x, y = xs, ys
+    for _ in range(3):
+        x, y = apply_variations(variations, None, x, y)
+        for angle in angles:
+            xr, yr = x * np.cos(angle) - y * np.sin(angle), x * np.sin(angle) + y * np.cos(angle)
+            expected.add(pixel_indices(world, width, height, xr, yr))
+
+    kinds, params, jitters = jit.encode_variations(variations)
+    histograms = np.zeros((2, width * height), dtype=np.uint32)
+    jit.chaos_kernel(xs, ys, kinds, params, jitters, 3, np.cos(angles), np.sin(angles),
+                     np.array([world.x, world.y, world.width, world.height]), width, height, 0, histograms)
+
+    assert np.array_equal(histograms.sum(axis=0).reshape(height, width), expected.hits)
+
+
+def test_jit_backend_falls_back_to_numpy(monkeypatch):
+    monkeypatch.setattr(jit, "JIT_AVAILABLE", False)
+    results = {}
+    for backend in ("numpy", "jit"):
+        histogram = Histogram(60, 40)
+        render_batched(histogram, Rect(-1, -1, 2, 2), [SwirlTransformation()], 2000, 5, seed=3, backend=backend)
+        results[backend] = histogram.hits
+
+    assert np.array_equal(results["numpy"], results["jit"])
@@ -0,0 +1,71 @@
+"""
+Тест трансформаций, заданных формулами.
+
+Описание:
+Проверяется, что формула даёт те же координаты, что и встроенная трансформация, что общие
+подвыражения обеих формул вычисляются один раз, что недопустимые конструкции отклоняются
+при разборе, что трансформация сохраняется в конфигурацию и читается обратно и что
+интерактивный ввод параметров разбирается без выполнения кода.
+"""
+import numpy as np
+import pytest
+
+from src.config_utils import config_from_dict, config_to_dict, parse_keyword_arguments
+from src.domain import Rect
+from src.expressions import ExpressionError, compile_variation
+from src.transformation_config import TransformationConfig
+from src.transformations import ExpressionTransformation, HandkerchiefTransformation, PDJTransformation
+
+
+def test_expression_matches_builtin_variations():
+    rng = np.random.default_rng(1)
+    x, y = rng.uniform(-1, 1, 1000), rng.uniform(-1, 1, 1000)
+    handkerchief = ExpressionTransformation("r * sin(theta + r)", "r * cos(theta - r)")
+    pdj = ExpressionTransformation("sin(a * y) - cos(b * x)", "sin(c * x) - cos(d * y)",
+                                   {"a": 1, "b": 2, "c": 3, "d": 4})
+
+    assert np.allclose(handkerchief.batch(x, y), HandkerchiefTransformation().batch(x, y))
+    assert np.allclose(pdj.batch(x, y), PDJTransformation(1, 2, 3, 4).batch(x, y))
+
+
+def test_common_subexpressions_are_computed_once():
+    compiled = compile_variation("x * sin(x * x + y * y)", "y * sin(y * y + x * x)")
+
+    # x*x, y*y, сумма, sin и два произведения
+    assert compiled.operations == 6
+    assert compile_variation("r * cos(theta)", "r * sin(theta)").source.count("np.sqrt") == 1
+
+
+def test_constant_and_identity_formulas_return_new_arrays():
+    x, y = np.linspace(-1, 1, 5, dtype=np.float32), np.zeros(5, dtype=np.float32)
+
+    new_x, new_y = ExpressionTransformation("x", "2 * pi").batch(x, y)
+
+    assert new_x is not x and np.array_equal(new_x, x)
+    assert new_y.dtype == np.float32 and np.allclose(new_y, 2 * np.pi)
+
+
+@pytest.mark.parametrize("formula", [
+    "__import__('os').system('true')", "x.real", "open", "(lambda: x)()", "x if y else 1", "'x'",
+    "sin(x, y)", "x +", "x * 1e400", pytest.param("x + " + "9" * 400, id="huge int"),
+])
+def test_unsafe_or_invalid_formulas_are_rejected(formula):
+    with pytest.raises(ExpressionError):
+        ExpressionTransformation(formula, "y")
+
+
+def test_expression_config_round_trip():
+    conf = TransformationConfig(ExpressionTransformation("a * x", "y / r", {"a": 0.5}), 8, Rect(-1, -1, 2, 2), 100)
+
+    restored = config_from_dict(config_to_dict(conf))
+
+    assert vars(restored.transformation) == vars(conf.transformation)
+
+
+def test_parse_keyword_arguments_does_not_execute_code():
+    assert parse_keyword_arguments('x="sin(x)", params={"a": 1.5}, jitter=-0.1') == {
+        "x": "sin(x)", "params": {"a": 1.5}, "jitter": -0.1}
+    with pytest.raises(ValueError):
+        parse_keyword_arguments("a=__import__('os').getcwd()")
+    with pytest.raises(ValueError):
+        parse_keyword_arguments("a=1) + (2")
@@ -0,0 +1,33 @@
+"""
+Тест фильтров гистограммы: оценки плотности и суперсэмплинга.
+
+Описание:
+Проверяется, что оценка плотности сохраняет суммарное число попаданий, сильно размывает
+одиночные попадания и почти не меняет плотные области, а суперсэмплированная гистограмма
+уменьшается до выходного размера.
+"""
+import numpy as np
+
+from src.filters import density_estimation, filter_hits
+
+
+def test_density_estimation_adapts_kernel_width():
+    hits = np.zeros((100, 120))
+    hits[50, 60] = 1
+    hits[20:30, 20:30] = 1000
+
+    filtered = density_estimation(hits, max_radius=5)
+
+    assert np.isclose(filtered.sum(), hits.sum())
+    assert filtered[50, 60] < 0.1
+    assert filtered[50, 57] > 0
+    assert np.isclose(filtered[25, 25], 1000)
+
+
+def test_filter_hits_downsamples_supersampled_histogram():
+    hits = np.ones((80, 120))
+
+    filtered = filter_hits(hits, supersample=2, de_radius=1.0)
+
+    assert filtered.shape == (40, 60)
+    assert np.isclose(filtered[20, 30], 1.0)
@@ -1,5 +1,6 @@
 from unittest.mock import patch
 import io
+from src.autotune import Profile, machine_key, save_profile
 from src.main import main
 
 
@@ -53,3 +54,43 @@ def test_main() -> None:
         assert "Многопроцессорная версия:" in output
         assert "Сохранено: fractal_multi.png" in output
         assert "Конфигурация успешно сохранена в файл: fractal_config_test.json"
+
+
+def test_main_multi_without_worker_processes(tmp_path, monkeypatch) -> None:
+    # 0 потоков — рендеринг движком python в основном процессе
+    monkeypatch.chdir(tmp_path)
+    test_args = ["main.py", "--mode", "multi", "--width", "80", "--height", "60", "--transformations", "1"]
+    user_input = "\n".join([
+        "SphericalTransformation", "8", "x=-1, y=-1, width=2, height=2", "2000", "1",
+        "0",  # Количество потоков
+        "", "", "", "",  # Параметры обработки по умолчанию
+        "n",
+    ])
+
+    with patch("sys.argv", test_args), \
+            patch("sys.stdin", io.StringIO(user_input)), \
+            patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+        main()
+
+    assert "Многопроцессорная версия:" in mock_stdout.getvalue()
+    assert (tmp_path / "fractal_multi.png").exists()
+
+
+def test_main_takes_engine_from_profile(tmp_path) -> None:
+    # Без --engine используется движок профиля машины; явный --engine python его заменяет
+    save_profile(Profile(machine_key(), "numpy", 2), tmp_path / "profile.json")
+    test_args = ["main.py", "--mode", "single", "--transformations", "1", "--preview_dir", str(tmp_path)]
+    user_input = "\n".join(["SphericalTransformation", "8", "x=-1, y=-1, width=2, height=2", "2000", "1"])
+
+    def run(args):
+        with patch("sys.argv", args), \
+                patch("sys.stdin", io.StringIO(user_input)), \
+                patch("sys.stdout", new_callable=io.StringIO) as mock_stdout:
+            try:
+                main()
+            except EOFError:
+                pass
+        return mock_stdout.getvalue()
+
+    assert "поддерживаются только движком python" in run(test_args)
+    assert "поддерживаются только движком python" not in run(test_args + ["--engine", "python"])
@@ -0,0 +1,34 @@
+"""
+Тест получения нескольких изображений из одной гистограммы.
+
+Описание:
+Из одной гистограммы сохраняются изображение полного размера, уменьшенная копия в формате WebP
+и вариант с другой цветовой картой. Проверяется, что гистограмма не изменяется, что выход полного
+размера совпадает с обычной обработкой и что размеры уменьшенных копий соответствуют заданной ширине.
+"""
+import numpy as np
+from PIL import Image
+
+from src.outputs import OutputSpec, output_spec_from_dict, render_outputs
+from src.processors import LogGammaCorrectionProcessor
+
+
+def test_render_outputs(tmp_path):
+    rng = np.random.default_rng(3)
+    hits = rng.integers(0, 30, size=(90, 160))
+    original = hits.copy()
+    specs = [
+        OutputSpec(tmp_path / "full.png"),
+        output_spec_from_dict({"output": "web.webp", "width": 50, "processor": {"gamma": 2.2}}, tmp_path),
+        OutputSpec(tmp_path / "thumbs" / "plasma.png", width=40, colormap="plasma"),
+    ]
+
+    paths = render_outputs(hits, specs)
+
+    assert paths == [spec.path for spec in specs]
+    assert np.array_equal(hits, original)
+    assert np.array_equal(np.asarray(Image.open(paths[0])), LogGammaCorrectionProcessor().tone_map(hits))
+    with Image.open(paths[1]) as web:
+        assert (web.format, web.size) == ("WEBP", (50, 28))
+    with Image.open(paths[2]) as thumb:
+        assert thumb.size == (40, 22)
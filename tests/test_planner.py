@@ -0,0 +1,61 @@
+"""
+Тест планировщика памяти рендеринга.
+
+Описание:
+Проверяется разбор размеров памяти, уменьшение числа процессов и замена типа счётчиков при
+нехватке памяти, переход к общей гистограмме для движка numpy и отказ, если рендеринг
+не помещается в лимит.
+"""
+import pytest
+
+from src.planner import (
+    MemoryBudgetError,
+    estimate_main_bytes,
+    estimate_worker_bytes,
+    parse_size,
+    plan_render,
+)
+
+WIDTH, HEIGHT = 2000, 1000
+PIXELS = WIDTH * HEIGHT
+
+
+def test_parse_size():
+    assert parse_size("1048576") == 2 ** 20
+    assert parse_size("512M") == 512 * 2 ** 20
+    assert parse_size("1.5GiB") == 3 * 2 ** 29
+    with pytest.raises(ValueError):
+        parse_size("много")
+
+
+def test_plan_reduces_workers_to_fit():
+    limit = estimate_main_bytes(PIXELS, "python", "uint32") + 3 * estimate_worker_bytes(PIXELS, "python", "uint32")
+
+    plan = plan_render(WIDTH, HEIGHT, 32, "python", limit=limit)
+
+    assert plan.workers == 3
+    assert plan.total_bytes <= limit
+    assert plan_render(WIDTH, HEIGHT, 2, "python", limit=limit).workers == 2
+
+
+def test_plan_narrows_accumulator_before_dropping_workers():
+    limit = estimate_main_bytes(PIXELS, "numpy", "uint32") + 4 * estimate_worker_bytes(PIXELS, "numpy", "uint32")
+    wide = estimate_main_bytes(PIXELS, "numpy", "uint64") + 4 * estimate_worker_bytes(PIXELS, "numpy", "uint64")
+    assert wide > limit
+
+    plan = plan_render(WIDTH, HEIGHT, 4, "numpy", "uint64", limit=limit)
+
+    assert plan.accumulator == "uint32"
+    assert plan.workers == 4
+
+
+def test_plan_falls_back_to_shared_histogram_and_refuses():
+    limit = estimate_main_bytes(PIXELS, "numpy", "uint32", shared=True)
+
+    plan = plan_render(WIDTH, HEIGHT, 8, "numpy", limit=limit)
+
+    assert (plan.workers, plan.tile_threads) == (0, 8)
+    with pytest.raises(MemoryBudgetError):
+        plan_render(WIDTH, HEIGHT, 8, "python", limit=limit)
+    with pytest.raises(MemoryBudgetError):
+        plan_render(WIDTH, HEIGHT, 0, "numpy", limit=limit // 2)
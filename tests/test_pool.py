@@ -0,0 +1,46 @@
+"""
+Тест переиспользуемого пула процессов.
+
+Описание:
+Проверяется, что один и тот же пул обслуживает несколько заданий подряд, а результат совпадает
+с однопоточным рендерингом тех же конфигураций для каждого способа запуска процессов,
+а результаты адаптивного рендеринга возвращаются из рабочих процессов.
+"""
+import pytest
+
+from src.domain import Rect, FractalImage
+from src.histogram import hit_counts
+from src.pool import RenderPool
+from src.renderer import render_config
+from src.transformation_config import TransformationConfig
+from src.transformations import PDJTransformation, SwirlTransformation
+
+CONFIGS = [
+    TransformationConfig(PDJTransformation(1.0, 1.2, 1.0, 1.5), 8, Rect(-1.5, -1.5, 3, 3), 3000),
+    TransformationConfig(SwirlTransformation(), 4, Rect(-1, -1, 2, 2), 3000, 2),
+]
+
+
+@pytest.mark.parametrize("start_method", ["fork", "forkserver", "spawn"])
+def test_render_pool_matches_single_thread(start_method):
+    width, height = 80, 60
+    expected = FractalImage(width, height)
+    for config in CONFIGS:
+        render_config(expected, config)
+
+    with RenderPool(processes=2, start_method=start_method) as pool:
+        first = pool.render_hits(CONFIGS, width, height)
+        second = pool.render(CONFIGS, width, height)
+
+    assert (first == hit_counts(expected)).all()
+    assert (hit_counts(second) == hit_counts(expected)).all()
+
+
+def test_render_pool_returns_adaptive_results():
+    configs = [CONFIGS[0]._replace(tolerance=1e-9), CONFIGS[1]]
+
+    with RenderPool(processes=2) as pool:
+        _, results = pool.render_hits_with_results(configs, 40, 30)
+
+    assert results[0] is not None and results[0].samples == CONFIGS[0].samples
+    assert results[1] is None
@@ -0,0 +1,60 @@
+"""
+Тест производительности векторизованного движка при разной точности вычислений.
+
+Описание:
+Для каждого сочетания точности координат (float32, float64) и типа счётчиков попаданий
+(uint32, uint64, float32) измеряется пропускная способность движка в попаданиях в секунду
+и отличие изображения от эталона (float64 + uint64): среднее абсолютное отличие нормализованной
+логарифмической плотности. Если установлен Numba, те же измерения выполняются для JIT-ядра.
+
+Примечание:
+Для вывода результатов в консоли при запуске теста используйте опцию `-s`.
+"""
+import time
+
+import numpy as np
+import pytest
+
+from src.domain import Rect
+from src.engine import ACCUMULATORS, PRECISIONS, EngineOptions, Histogram, render_config_batched
+from src.jit import JIT_AVAILABLE
+from src.histogram import log_density
+from src.transformation_config import TransformationConfig
+from src.transformations import DiscTransformation, HeartTransformation, SwirlTransformation
+
+CONFIGS = [
+    TransformationConfig(SwirlTransformation(), 20, Rect(-1, -1, 2, 2), 200000),
+    TransformationConfig(HeartTransformation(), 20, Rect(-1.5, -1.5, 3, 3), 200000),
+    TransformationConfig(DiscTransformation(), 20, Rect(-1, -1, 2, 2), 200000, 8),
+]
+
+
+def _render(options: EngineOptions, width: int, height: int) -> tuple[np.ndarray, float]:
+    histogram = Histogram(width, height, options.accumulator)
+    start = time.perf_counter()
+    for config in CONFIGS:
+        render_config_batched(histogram, config, options=options)
+    return histogram.hits, time.perf_counter() - start
+
+
+@pytest.mark.performance
+def test_precision_throughput_and_difference():
+    width, height = 600, 400
+    reference, _ = _render(EngineOptions(precision="float64", accumulator="uint64"), width, height)
+    reference_density = log_density(reference)
+
+    backends = ["numpy", "jit"] if JIT_AVAILABLE else ["numpy"]
+    if JIT_AVAILABLE:
+        # Первый вызов для каждой точности компилирует ядро; компиляция не входит в измерения
+        for precision in PRECISIONS:
+            _render(EngineOptions(precision=precision, backend="jit"), 8, 8)
+
+    print(f"{'Backend':<9}{'Precision':<12}{'Accumulator':<13}{'Hits/s':<14}{'Difference':<12}")
+    for backend in backends:
+        for precision in PRECISIONS:
+            for accumulator in ACCUMULATORS:
+                options = EngineOptions(precision=precision, accumulator=accumulator, backend=backend)
+                hits, elapsed = _render(options, width, height)
+                difference = float(np.mean(np.abs(log_density(hits) - reference_density)))
+                print(f"{backend:<9}{precision:<12}{accumulator:<13}{hits.sum() / elapsed:<14.3g}{difference:<12.2e}")
+                assert difference < 0.05
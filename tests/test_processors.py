@@ -0,0 +1,51 @@
+"""
+Тест конвейера процессоров изображения.
+
+Описание:
+Проверяется, что конвейер из одного процессора совпадает с поточечной обработкой холста,
+что результат не зависит от числа потоков и размера полос, что процессоры конвейера
+применяются к цветам без промежуточного округления и что результат пишется в переданный массив.
+"""
+import numpy as np
+
+from src.colormaps import apply_lut
+from src.domain import FractalImage
+from src.histogram import add_hits, hit_counts
+from src.processors import GammaCorrectionProcessor, LogGammaCorrectionProcessor, ProcessorPipeline
+
+
+def _hits():
+    rng = np.random.default_rng(4)
+    return rng.integers(0, 50, size=(37, 23)) * (rng.random((37, 23)) < 0.7)
+
+
+def test_single_stage_matches_pointwise_process():
+    hits = _hits()
+    canvas = FractalImage(23, 37)
+    add_hits(canvas, hits)
+    LogGammaCorrectionProcessor(colormap="plasma").process(canvas)
+    expected = np.array([[(p.r, p.g, p.b) for p in row] for row in canvas.data], dtype=np.uint8)
+
+    pipeline_canvas = FractalImage(23, 37)
+    add_hits(pipeline_canvas, hits)
+    ProcessorPipeline([LogGammaCorrectionProcessor(colormap="plasma")], threads=3, chunk_pixels=50).process(
+        pipeline_canvas)
+
+    assert np.array_equal(ProcessorPipeline([LogGammaCorrectionProcessor(colormap="plasma")]).tone_map(hits), expected)
+    assert np.array_equal(hit_counts(pipeline_canvas), hits)
+    assert [(p.r, p.g, p.b) for p in pipeline_canvas.data[5]] == [tuple(c) for c in expected[5].tolist()]
+
+
+def test_fused_stages_do_not_depend_on_chunks_or_threads():
+    hits = _hits()
+    stages = [LogGammaCorrectionProcessor(gamma=2.2), GammaCorrectionProcessor(1.5)]
+    out = np.zeros(hits.shape + (3,), dtype=np.uint8)
+
+    result = ProcessorPipeline(stages, threads=4, chunk_pixels=23 * 3).tone_map(hits, out=out)
+
+    log_gamma = LogGammaCorrectionProcessor(gamma=2.2)
+    colors = apply_lut(log_gamma.lut, np.log1p(hits / hits.max()) ** (1 / 2.2) + 0.1)
+    expected = (np.clip((colors / 255) ** (1 / 1.5) * 255, 0, 255)).astype(np.uint8)
+    assert result is out
+    assert np.array_equal(result, expected)
+    assert np.array_equal(ProcessorPipeline(stages, threads=1).tone_map(hits), expected)
@@ -0,0 +1,87 @@
+"""
+Тест отчётов о ходе рендеринга.
+
+Описание:
+Проверяется накопление счётчиков текущего процесса, снимок метрик монитора с признаком
+зависшего процесса, запись метрик в JSON и формат Prometheus, а также то, что счётчики
+рабочих процессов пула после рендеринга совпадают с числом сэмплов и попаданий.
+"""
+import json
+import time
+
+import pytest
+
+from src import progress
+from src.engine import EngineOptions
+from src.pool import RenderPool
+from src.progress import ProgressCounters, ProgressMonitor
+from tests.test_pool import CONFIGS
+
+
+@pytest.fixture
+def counters():
+    counters = ProgressCounters(2)
+    progress.attach(counters, 1)
+    yield counters
+    progress.attach(None, 0)
+
+
+def test_report_accumulates_in_own_slot(counters):
+    progress.report(100, 800, 750)
+    progress.report(50, 400)
+    progress.set_active(True)
+
+    rows = counters.snapshot()
+    assert rows[0].sum() == 0
+    assert list(rows[1, [progress.SAMPLES, progress.ITERATIONS, progress.HITS, progress.ACTIVE]]) == [
+        150, 1200, 750, 1]
+
+    progress.attach(None, 0)
+    progress.report(10, 10, 10)
+    assert (counters.snapshot() == rows).all()
+
+
+def test_monitor_metrics_and_stall(counters):
+    progress.report(10, 80)
+    with ProgressMonitor(counters, 100, interval=10, show=False, stall_seconds=0.01) as monitor:
+        progress.set_active(True)
+        progress.report(40, 320, 300)
+        time.sleep(0.05)
+        metrics = monitor.metrics()
+
+    # Работа до входа в контекст не учитывается
+    assert metrics["samples_done"] == 40 and metrics["samples_total"] == 100
+    assert metrics["progress"] == pytest.approx(0.4)
+    assert metrics["eta_seconds"] is not None
+    assert [worker["stalled"] for worker in metrics["workers"]] == [False, True]
+    assert "40/100 сэмплов" in monitor.line(metrics)
+
+
+@pytest.mark.parametrize("name", ["metrics.json", "metrics.prom"])
+def test_monitor_writes_metrics_file(counters, tmp_path, name):
+    path = tmp_path / name
+    with ProgressMonitor(counters, 20, interval=10, metrics_file=path, show=False):
+        progress.report(20, 160, 100)
+
+    text = path.read_text()
+    if path.suffix == ".prom":
+        assert "fractal_render_samples_done 20" in text
+        assert 'fractal_worker_hits{worker="1"} 100.0' in text
+    else:
+        assert json.loads(text)["samples_done"] == 20
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.parametrize("options", [None, EngineOptions(batch_size=500)])
+def test_pool_counters_match_render(options):
+    width, height = 40, 30
+    with RenderPool(processes=2) as pool:
+        with ProgressMonitor(pool.progress, sum(config.samples for config in CONFIGS), show=False) as monitor:
+            hits = pool.render_hits(CONFIGS, width, height, options)
+        metrics = monitor.metrics()
+
+    assert metrics["samples_done"] == sum(config.samples for config in CONFIGS)
+    assert sum(worker["iterations"] for worker in metrics["workers"]) == sum(
+        config.samples * config.iterations for config in CONFIGS)
+    assert sum(worker["hits"] for worker in metrics["workers"]) == hits.sum()
+    assert not any(worker["active"] for worker in metrics["workers"])
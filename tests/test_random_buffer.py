@@ -0,0 +1,48 @@
+"""
+Тест буферизованного генератора случайных чисел и случайных отклонений трансформаций.
+
+Описание:
+Проверяется, что буфер выдаёт тот же поток чисел, что и генератор NumPy, при перезаполнении
+и при запросах больше буфера, что рендеринг детерминирован при одинаковом зерне и что
+отклонения (jitter) трансформаций применяются поточечным и векторизованным движками.
+"""
+import numpy as np
+
+from src.domain import FractalImage, Rect
+from src.engine import Histogram, render_batched
+from src.histogram import hit_counts
+from src.random_buffer import RandomBuffer
+from src.renderer import render
+from src.transformations import DiamondTransformation, HyperbolicTransformation
+
+
+def test_buffer_follows_generator_stream():
+    buffer = RandomBuffer(7, size=10)
+    values = np.concatenate([buffer.uniform(4).copy(), buffer.uniform(6).copy(), buffer.uniform(3).copy()])
+    expected = np.random.default_rng(7).random(20)
+    assert np.array_equal(values, expected[:13])
+    assert buffer.uniform(25).shape == (25,)
+
+
+def test_render_is_deterministic_and_applies_jitter():
+    world = Rect(-1, -1, 2, 2)
+
+    def hits(jitter, seed=5):
+        canvas = FractalImage(40, 40)
+        variations = [HyperbolicTransformation(0.8, jitter=jitter), DiamondTransformation(0.6, jitter=jitter)]
+        render(canvas, world, variations, 500, 6, seed=seed)
+        return hit_counts(canvas)
+
+    assert np.array_equal(hits(0.05), hits(0.05))
+    assert not np.array_equal(hits(0.05), hits(0.0))
+    assert hits(0.05).sum() > 0
+
+
+def test_batched_engine_applies_jitter():
+    world = Rect(-1, -1, 2, 2)
+    results = []
+    for jitter in (0.0, 0.05):
+        histogram = Histogram(40, 40)
+        render_batched(histogram, world, [DiamondTransformation(0.6, jitter=jitter)], 500, 6, seed=5)
+        results.append(histogram.hits)
+    assert not np.array_equal(*results)
@@ -0,0 +1,91 @@
+"""
+Тест сервера рендеринга.
+
+Описание:
+Сервер запускается в текущем процессе на свободном порту. Проверяется, что одновременные
+одинаковые запросы обслуживаются одним рендерингом, повторный запрос берётся из кэша,
+а некорректное задание и отмена неизвестного задания обрабатываются без падения сервера.
+Отменённое задание не попадает в кэш, а повторный идентификатор задания отвергается.
+"""
+import asyncio
+import json
+
+from src.pool import RenderPool
+from src.server import RenderServer
+
+CONFIG = {
+    "transformation": "HeartTransformation",
+    "params": {},
+    "iterations": 8,
+    "world": {"x": -1.5, "y": -1.5, "width": 3, "height": 3},
+    "samples": 2000,
+    "symmetry": 1,
+}
+
+
+async def _request(port, method, path, body=b""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, payload
+
+
+async def _scenario(pool):
+    server = RenderServer(pool)
+    port = (await server.start("127.0.0.1", 0)).sockets[0].getsockname()[1]
+    try:
+        body = json.dumps({"configs": [CONFIG], "width": 40, "height": 30}).encode()
+        first, second = await asyncio.gather(_request(port, "POST", "/render", body),
+                                             _request(port, "POST", "/render", body))
+        cached = await _request(port, "POST", "/render", body)
+        broken = await _request(port, "POST", "/render", b"{}")
+        missing = await _request(port, "DELETE", "/jobs/unknown")
+        return first, second, cached, broken, missing
+    finally:
+        await server.close()
+
+
+def test_render_server_cache():
+    with RenderPool(processes=1) as pool:
+        first, second, cached, broken, missing = asyncio.run(_scenario(pool))
+
+    assert first[0] == second[0] == cached[0] == 200
+    assert first[2].startswith(b"\x89PNG")
+    assert first[2] == second[2] == cached[2]
+    assert first[1]["X-Job-Id"] == second[1]["X-Job-Id"]
+    assert cached[1]["X-Cache"] == "hit"
+    assert broken[0] == 400
+    assert missing[0] == 404
+
+
+async def _cancel_scenario(pool):
+    server = RenderServer(pool)
+    port = (await server.start("127.0.0.1", 0)).sockets[0].getsockname()[1]
+    try:
+        body = json.dumps({"configs": [dict(CONFIG, samples=20000)], "job_id": "job-1"}).encode()
+        other = json.dumps({"configs": [CONFIG], "job_id": "job-1"}).encode()
+        running = asyncio.create_task(_request(port, "POST", "/render", body))
+        await asyncio.sleep(0.5)
+        duplicate = await _request(port, "POST", "/render", other)
+        cancelled = await _request(port, "DELETE", "/jobs/job-1")
+        rendered = await running
+        # Единственный обработчик очереди берёт следующее задание только после отменённого
+        await _request(port, "POST", "/render", json.dumps({"configs": [CONFIG]}).encode())
+        return duplicate, cancelled, rendered, len(server.cache)
+    finally:
+        await server.close()
+
+
+def test_render_server_cancel_and_duplicate_job_id():
+    with RenderPool(processes=1) as pool:
+        duplicate, cancelled, rendered, cached = asyncio.run(_cancel_scenario(pool))
+
+    assert duplicate[0] == 409
+    assert cancelled[0] == 200
+    assert rendered[0] == 409
+    assert cached == 1
@@ -0,0 +1,76 @@
+"""
+Тест конвейера этапов с ограниченными очередями.
+
+Описание:
+Проверяется, что элементы проходят все этапы с учётом времени каждого этапа, что ошибка этапа
+передаётся в результат без остановки конвейера, что заполненные очереди ограничивают число
+прочитанных, но не выданных элементов, и что этапы выполняются одновременно для разных элементов.
+"""
+import threading
+import time
+
+import pytest
+
+from src.stages import Stage, run_stages
+
+
+def test_items_pass_all_stages_and_errors_are_reported():
+    def halve(value):
+        if value % 2:
+            raise ValueError(f"нечётное {value}")
+        return value // 2
+
+    items = [(i, i) for i in range(6)] + [("broken", KeyError("config"))]
+    results = {key: (value, seconds) for key, value, seconds in
+               run_stages(items, [Stage("halve", halve), Stage("square", lambda v: v * v, workers=2)])}
+
+    assert {key: value for key, (value, _) in results.items() if isinstance(value, int)} == {0: 0, 2: 1, 4: 4}
+    assert isinstance(results[3][0], ValueError) and set(results[3][1]) == {"halve"}
+    assert set(results[4][1]) == {"halve", "square"}
+    assert isinstance(results["broken"][0], KeyError) and results["broken"][1] == {}
+
+
+def test_queues_bound_items_in_flight():
+    read, done = [], []
+
+    def source():
+        for i in range(20):
+            read.append(i)
+            yield i, i
+
+    for key, _, _ in run_stages(source(), [Stage("a", lambda v: v), Stage("b", lambda v: v)], capacity=1):
+        time.sleep(0.005)
+        done.append(key)
+        # Элементы в очередях (по одному перед каждым этапом и перед выдачей), в обработке и у читателя
+        assert len(read) - len(done) <= 7
+
+
+def test_stages_overlap():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def slow(value):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return value
+
+    started = time.perf_counter()
+    assert len(list(run_stages(((i, i) for i in range(8)), [Stage("a", slow), Stage("b", slow)]))) == 8
+
+    assert peak[0] == 2
+    assert time.perf_counter() - started < 8 * 2 * 0.02
+
+
+def test_source_error_is_raised_after_results():
+    def source():
+        yield 1, 1
+        raise OSError("манифест недоступен")
+
+    results = []
+    with pytest.raises(OSError):
+        for result in run_stages(source(), [Stage("a", lambda v: v)]):
+            results.append(result.key)
+    assert results == [1]
@@ -0,0 +1,31 @@
+"""
+Тест упаковки массивов попаданий.
+
+Описание:
+Проверяется, что для массива с малым покрытием выбирается разреженная форма, для плотного
+массива — сжатая плотная, и что обе формы без потерь сливаются в накопитель.
+"""
+import numpy as np
+
+from src.transport import merge_hits, pack_hits, payload_size, unpack_hits
+
+
+def test_sparse_and_dense_payloads():
+    rng = np.random.default_rng(42)
+    sparse_hits = np.zeros((400, 600), dtype=np.int64)
+    sparse_hits[rng.integers(0, 400, 500), rng.integers(0, 600, 500)] = rng.integers(1, 1000, 500)
+    dense_hits = rng.integers(0, 70000, (400, 600))
+
+    sparse_payload = pack_hits(sparse_hits)
+    dense_payload = pack_hits(dense_hits)
+
+    assert sparse_payload[0] == "sparse"
+    assert dense_payload[0] == "dense"
+    assert payload_size(sparse_payload) * 10 < sparse_hits.nbytes
+    assert (unpack_hits(sparse_payload) == sparse_hits).all()
+    assert (unpack_hits(dense_payload) == dense_hits).all()
+
+    accumulator = np.ones((400, 600), dtype=np.int64)
+    merge_hits(accumulator, sparse_payload)
+    merge_hits(accumulator, dense_payload)
+    assert (accumulator == sparse_hits + dense_hits + 1).all()